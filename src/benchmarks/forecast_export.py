@@ -0,0 +1,101 @@
+"""
+Benchmark: forecast export memory.
+
+Writes --locations forecasts of --hours hours for each --scale, then exports
+them through the streaming renderers of the export endpoint (NDJSON, CSV and,
+when pyarrow is installed, Arrow) and through ForecastDataSerializer with a
+materialized JSON body, the way a plain DRF response would build it. Prints
+rows, bytes, seconds and the peak Python memory (tracemalloc) of each export:
+the streaming peaks should stay flat as the scale grows, the serializer peak
+grows with it. Everything runs inside a transaction that is rolled back, so the
+benchmark leaves the database untouched.
+
+Usage (from the src directory):
+    python -m benchmarks.forecast_export [--locations 64] [--hours 168] [--scale 1 4]
+"""
+
+import argparse
+import json
+import os
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import django
+import numpy as np
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_api.settings')
+django.setup()
+
+from django.db import connection, transaction  # noqa: E402
+from home.models import ForecastData, ForecastMetaData  # noqa: E402
+from home.serializer import ForecastDataSerializer  # noqa: E402
+from home.utils.bulk_write_helper import ForecastDataWriter  # noqa: E402
+from home.utils.export_helper import RENDERERS, arrow_available, iter_forecast_rows  # noqa: E402
+
+
+def create_forecasts(locations, hours):
+    start = int(datetime(2024, 4, 1, tzinfo=timezone.utc).timestamp())
+    times = np.arange(start, start + hours * 3600, 3600, dtype=np.int64)
+    values = {
+        variable: (index * 10 + (np.arange(hours) % 24) / 2).astype(np.float32)
+        for index, variable in enumerate(ForecastData.HOURLY_VARIABLES)
+    }
+    writer = ForecastDataWriter(variables=ForecastData.HOURLY_VARIABLES)
+    for index in range(locations):
+        location = ForecastMetaData.objects.create(
+            latitude=str(20.0 + index / 10), longitude=str(90.0 + index / 10), location_name=f"benchmark-{index}")
+        writer.add(location, times, values)
+    writer.flush()
+
+
+def export_streaming(export_format):
+    size = 0
+    for chunk in RENDERERS[export_format](iter_forecast_rows(None, ForecastData.HOURLY_VARIABLES),
+                                          ForecastData.HOURLY_VARIABLES):
+        size += len(chunk)
+    return size
+
+
+def export_serializer():
+    data = ForecastDataSerializer(ForecastData.objects.order_by('forecast_meta_data_id', 'date'), many=True).data
+    return len(json.dumps(data).encode())
+
+
+def run(name, export, rows):
+    tracemalloc.start()
+    start = time.perf_counter()
+    size = export()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:<12} {rows:>8} rows  {size / 2 ** 20:8.1f} MiB  {elapsed:8.3f} s  peak {peak / 2 ** 20:8.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--locations', type=int, default=64)
+    parser.add_argument('--hours', type=int, default=7 * 24)
+    parser.add_argument('--scale', type=int, nargs='+', default=[1, 4])
+    args = parser.parse_args()
+
+    formats = ['ndjson', 'csv']
+    if arrow_available():
+        # Export a row up front, so loading pyarrow is not counted as export memory
+        row = ("warm-up", datetime.now(timezone.utc), *[0.0] * len(ForecastData.HOURLY_VARIABLES))
+        list(RENDERERS['arrow']([row], ForecastData.HOURLY_VARIABLES))
+        formats.append('arrow')
+    print(f"backend: {connection.vendor}")
+    for scale in args.scale:
+        with transaction.atomic():
+            ForecastData.objects.all().delete()
+            create_forecasts(args.locations * scale, args.hours)
+            rows = args.locations * scale * args.hours
+            for export_format in formats:
+                run(export_format, lambda: export_streaming(export_format), rows)
+            run('serializer', export_serializer, rows)
+            transaction.set_rollback(True)
+
+
+if __name__ == '__main__':
+    main()
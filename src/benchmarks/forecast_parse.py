@@ -0,0 +1,94 @@
+"""
+Benchmark: parsing Open-Meteo responses into writer rows.
+
+Compares the previous parse path, which built a pandas date_range and turned
+every timestamp and value into a Python object per location, with the current
+one, which keeps int64 epoch seconds and float32 values as NumPy arrays and
+converts each distinct forecast window to datetimes once in ForecastDataWriter.
+Responses are decoded from generated flatbuffer messages and no rows are
+written, so the benchmark does not touch the database.
+
+Usage (from the src directory):
+    python -m benchmarks.forecast_parse [--locations 64] [--hours 168] [--repeat 5]
+"""
+
+import argparse
+import os
+import time
+from types import SimpleNamespace
+
+import django
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_api.settings')
+django.setup()
+
+import pandas as pd  # noqa: E402
+from openmeteo_sdk.WeatherApiResponse import WeatherApiResponse  # noqa: E402
+from home.tests import FakeOpenMeteoClient, build_forecast_message  # noqa: E402
+from home.utils.bulk_write_helper import ForecastDataWriter  # noqa: E402
+from home.utils.weather_data_helper import OpenMeteoApiClient  # noqa: E402
+
+
+def build_responses(locations, hours):
+    responses = []
+    for index in range(locations):
+        temperatures = [20.0 + index / 10 + hour % 24 for hour in range(hours)]
+        message = build_forecast_message(20.0 + index / 10, 90.0 + index / 10,
+                                         FakeOpenMeteoClient.start, 3600, [temperatures])
+        responses.append(WeatherApiResponse.GetRootAs(message, 4))
+    return responses
+
+
+def parse_with_pandas(responses, locations):
+    rows = []
+    for response, location in zip(responses, locations):
+        hourly = response.Hourly()
+        dates = pd.date_range(
+            start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
+            end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
+            freq=pd.Timedelta(seconds=hourly.Interval()),
+            inclusive="left"
+        ).to_pydatetime().tolist()
+        temperatures = hourly.Variables(0).ValuesAsNumpy().tolist()
+        rows.extend((location.pk, date, float(temperature)) for date, temperature in zip(dates, temperatures))
+    return rows
+
+
+def parse_with_numpy(responses, locations):
+    # Only temperature_2m, which is all the previous path parsed
+    client = OpenMeteoApiClient(session=None, variables=['temperature_2m'])
+    writer = ForecastDataWriter(batch_size=float('inf'), variables=['temperature_2m'])
+    for response, location in zip(responses, locations):
+        weather_data = client._build_hourly_data(response, 0.0, 0.0, "benchmark")
+        writer.add(location, weather_data["time"], weather_data)
+    return writer._rows
+
+
+def run(name, parse, responses, locations, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = parse(responses, locations)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f"{name:<8} {len(rows):>8} rows  {best * 1000:8.2f} ms  {len(rows) / best:>12.0f} rows/s")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--locations', type=int, default=64)
+    parser.add_argument('--hours', type=int, default=7 * 24)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    responses = build_responses(args.locations, args.hours)
+    locations = [SimpleNamespace(pk=index) for index in range(args.locations)]
+
+    expected = run('pandas', parse_with_pandas, responses, locations, args.repeat)
+    rows = run('numpy', parse_with_numpy, responses, locations, args.repeat)
+    assert rows == expected, "parse paths disagree"
+
+
+if __name__ == '__main__':
+    main()
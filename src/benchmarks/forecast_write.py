@@ -0,0 +1,94 @@
+"""
+Benchmark: hourly ForecastData writes.
+
+Compares the original one-INSERT-per-row path with ForecastDataWriter
+(bulk_create, or COPY FROM STDIN on PostgreSQL with psycopg2) and prints
+rows/sec for each. Everything runs inside a transaction that is rolled back,
+so the benchmark leaves the database untouched. The statement count covers
+statements run through cursor.execute(), so a COPY is not included in it.
+
+Usage (from the src directory):
+    python -m benchmarks.forecast_write [--locations 64] [--hours 168]
+"""
+
+import argparse
+import os
+import time
+from datetime import datetime, timezone
+
+import django
+import numpy as np
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'django_api.settings')
+django.setup()
+
+from django.conf import settings  # noqa: E402
+from django.db import connection, transaction  # noqa: E402
+from home.models import ForecastData, ForecastMetaData  # noqa: E402
+from home.utils.bulk_write_helper import ForecastDataWriter  # noqa: E402
+
+
+def create_locations(count):
+    return [
+        ForecastMetaData.objects.create(
+            latitude=str(20.0 + index / 10), longitude=str(90.0 + index / 10),
+            location_name=f"benchmark-{index}")
+        for index in range(count)
+    ]
+
+
+def write_row_by_row(locations, times, values):
+    for location in locations:
+        for index, epoch in enumerate(times.tolist()):
+            ForecastData.objects.create(
+                forecast_meta_data=location, date=datetime.fromtimestamp(epoch, tz=timezone.utc),
+                **{variable: float(variable_values[index]) for variable, variable_values in values.items()})
+
+
+def write_bulk(locations, times, values):
+    writer = ForecastDataWriter(variables=list(values))
+    for location in locations:
+        writer.add(location, times, values)
+    writer.flush()
+
+
+def run(name, write, locations, times, values):
+    statements = []
+
+    def count_statements(execute, sql, params, many, context):
+        statements.append(sql)
+        return execute(sql, params, many, context)
+
+    with transaction.atomic():
+        fixtures = create_locations(locations)
+        start = time.perf_counter()
+        with connection.execute_wrapper(count_statements):
+            write(fixtures, times, values)
+        elapsed = time.perf_counter() - start
+        transaction.set_rollback(True)
+
+    rows = locations * len(times)
+    print(f"{name:<12} {rows:>8} rows  {elapsed:8.3f} s  {rows / elapsed:>10.0f} rows/s  {len(statements):>6} statements")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--locations', type=int, default=64)
+    parser.add_argument('--hours', type=int, default=7 * 24)
+    args = parser.parse_args()
+
+    start = int(datetime(2024, 4, 1, tzinfo=timezone.utc).timestamp())
+    times = np.arange(start, start + args.hours * 3600, 3600, dtype=np.int64)
+    values = {
+        variable: (index * 10 + (np.arange(args.hours) % 24) / 2).astype(np.float32)
+        for index, variable in enumerate(settings.FORECAST_HOURLY_VARIABLES)
+    }
+
+    print(f"backend: {connection.vendor}")
+    print(f"variables: {', '.join(values)}")
+    run('row-by-row', write_row_by_row, args.locations, times, values)
+    run('bulk', write_bulk, args.locations, times, values)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,147 @@
+"""
+Benchmark: read endpoints under concurrent load, WSGI versus ASGI.
+
+Opens --concurrency keep-alive connections to each server and sends requests
+on all of them for --duration seconds, then prints requests/s, p50 and p99
+latency and the number of failed requests per server and endpoint. The same
+requests go to the synchronous views of the WSGI server (paths under /api/)
+and to the async views of the ASGI server (paths under /api/async/). Both
+servers must already be running against the same database and cache, e.g.
+the api (WSGI, port 8700) and asgi (uvicorn, port 8701) services of
+docker-compose.
+
+The client is a minimal HTTP/1.1 implementation on asyncio streams, so it
+needs no third-party packages and does not itself become the bottleneck.
+
+Usage (from the src directory):
+    python -m benchmarks.http_load [--wsgi http://127.0.0.1:8700] [--asgi http://127.0.0.1:8701]
+                                   [--concurrency 256] [--duration 10]
+                                   [--present Dhaka] [--destination Gopalganj] [--date 2024-04-01]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from urllib.parse import urlsplit
+
+
+def build_requests(args):
+    """
+    Builds the (name, method, path, body) of every benchmarked endpoint, relative to /api/.
+    """
+    comparison = json.dumps({
+        "present_location": args.present,
+        "destination_location": args.destination,
+        "travel_date": args.date,
+    }).encode()
+    return [
+        ('leaderboard', 'GET', 'get_average_temperature/?metric=mean&order=asc&limit=10', None),
+        ('compare', 'POST', 'compare_temperature/', comparison),
+    ]
+
+
+async def send(reader, writer, host, method, path, body):
+    """
+    Sends one request on a keep-alive connection and reads the whole response.
+
+    Returns:
+    - int: HTTP status code.
+    """
+    head = f'{method} {path} HTTP/1.1\r\nHost: {host}\r\nConnection: keep-alive\r\n'
+    if body is not None:
+        head += f'Content-Type: application/json\r\nContent-Length: {len(body)}\r\n'
+    writer.write(head.encode() + b'\r\n' + (body or b''))
+    await writer.drain()
+
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError('connection closed by the server')
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        while True:
+            size = int((await reader.readline()).split(b';')[0], 16)
+            await reader.readexactly(size + 2)
+            if size == 0:
+                break
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return int(status_line.split()[1])
+
+
+async def worker(base_url, prefix, request, deadline, latencies, errors):
+    """
+    Sends the request back to back on one connection until the deadline, reconnecting after failures.
+    """
+    url = urlsplit(base_url)
+    _, method, path, body = request
+    path = f'{url.path.rstrip("/")}{prefix}{path}'
+    writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(url.hostname, url.port or 80)
+            start = time.perf_counter()
+            status = await send(reader, writer, url.netloc, method, path, body)
+            latencies.append(time.perf_counter() - start)
+            if status != 200:
+                errors.append(status)
+        except (OSError, ConnectionError, asyncio.IncompleteReadError, ValueError) as error:
+            errors.append(type(error).__name__)
+            if writer is not None:
+                writer.close()
+            writer = None
+            await asyncio.sleep(0.01)
+    if writer is not None:
+        writer.close()
+
+
+async def run(base_url, prefix, request, concurrency, duration):
+    """
+    Loads one endpoint of one server and returns its latencies and errors.
+    """
+    latencies, errors = [], []
+    deadline = time.perf_counter() + duration
+    await asyncio.gather(*(
+        worker(base_url, prefix, request, deadline, latencies, errors) for _ in range(concurrency)
+    ))
+    return latencies, errors
+
+
+def percentile(sorted_values, fraction):
+    if not sorted_values:
+        return float('nan')
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--wsgi', default='http://127.0.0.1:8700')
+    parser.add_argument('--asgi', default='http://127.0.0.1:8701')
+    parser.add_argument('--concurrency', type=int, default=256)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--present', default='Dhaka')
+    parser.add_argument('--destination', default='Gopalganj')
+    parser.add_argument('--date', default=time.strftime('%Y-%m-%d'))
+    args = parser.parse_args()
+
+    print(f"{args.concurrency} connections, {args.duration:g} s per run")
+    print(f"{'server':<6} {'endpoint':<12} {'requests':>9} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for request in build_requests(args):
+        for server, base_url, prefix in (('wsgi', args.wsgi, '/api/'), ('asgi', args.asgi, '/api/async/')):
+            latencies, errors = asyncio.run(run(base_url, prefix, request, args.concurrency, args.duration))
+            latencies.sort()
+            print(f"{server:<6} {request[0]:<12} {len(latencies):>9} {len(latencies) / args.duration:>9.0f} "
+                  f"{percentile(latencies, 0.50) * 1000:>8.1f} {percentile(latencies, 0.99) * 1000:>8.1f} "
+                  f"{len(errors):>7}")
+
+
+if __name__ == '__main__':
+    main()
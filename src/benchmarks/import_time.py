@@ -0,0 +1,70 @@
+"""
+Benchmark: web process startup.
+
+Starts a fresh interpreter with `python -X importtime` that sets Django up and
+imports the URL configuration, as a web worker does on boot, then prints the
+total import time, the peak RSS of that process, the slowest top-level imports
+of the project and whether the fetch and parse stack was loaded. Only the
+Celery worker needs that stack, so it should be reported as not loaded.
+
+Usage (from the src directory):
+    python -m benchmarks.import_time [--top 15] [--repeat 3]
+"""
+
+import argparse
+import os
+import re
+import resource
+import subprocess
+import sys
+
+BOOT = "import django; django.setup(); import django_api.urls"
+WORKER_ONLY_MODULES = ('openmeteo_requests', 'requests_cache', 'pandas', 'home.utils.forecast_update_helper')
+IMPORT_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def boot():
+    """
+    Boots a web process and returns its import timings and peak RSS in KiB.
+    """
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'django_api.settings')
+    before = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', BOOT],
+        env=env, capture_output=True, text=True, check=True,
+    )
+    rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    imports = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            imports.append((module, len(indent) // 2, int(self_us), int(cumulative_us)))
+    # ru_maxrss of children is the maximum over every child, so it only grows between runs
+    return imports, max(rss, before)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    runs = [boot() for _ in range(args.repeat)]
+    imports, rss = min(runs, key=lambda run: sum(self_us for _, _, self_us, _ in run[0]))
+    total_ms = sum(self_us for _, _, self_us, _ in imports) / 1000
+    loaded = {module for module, _, _, _ in imports}
+
+    print(f"import time: {total_ms:8.1f} ms (best of {args.repeat})")
+    print(f"peak RSS:    {rss / 1024:8.1f} MiB")
+    print("slowest project and third-party imports (cumulative):")
+    top_level = [entry for entry in imports if entry[1] <= 1]
+    for module, _, _, cumulative_us in sorted(top_level, key=lambda entry: -entry[3])[:args.top]:
+        print(f"  {cumulative_us / 1000:8.1f} ms  {module}")
+    for module in WORKER_ONLY_MODULES:
+        print(f"{module:<36} {'loaded' if module in loaded else 'not loaded'}")
+
+
+if __name__ == '__main__':
+    main()
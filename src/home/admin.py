@@ -1,7 +1,8 @@
 from django.contrib import admin
 
 
-from .models import District, ForecastData, ForecastMetaData
+from .models import (District, ForecastArchive, ForecastArchiveRun, ForecastData, ForecastLeaderboard,
+                     ForecastMetaData, ForecastRefreshJob, ForecastSeries)
 
 
 @admin.register(District)
@@ -11,10 +12,36 @@ class DistrictAdmin(admin.ModelAdmin):
 
 @admin.register(ForecastData)
 class ForecastDataAdmin(admin.ModelAdmin):
-    list_display = ['id', 'forecast_meta_data', 'date', 'temperature_2m']
+    list_display = ['id', 'forecast_meta_data', 'date', *ForecastData.HOURLY_VARIABLES]
 
 
 @admin.register(ForecastMetaData)
 class ForecastMetaDataAdmin(admin.ModelAdmin):
     list_display = ['id', 'average_temperature',
                     'latitude', 'longitude', 'location_name']
+
+
+@admin.register(ForecastSeries)
+class ForecastSeriesAdmin(admin.ModelAdmin):
+    list_display = ['id', 'forecast_meta_data', 'start', 'interval', 'variables', 'updated_at']
+
+
+@admin.register(ForecastLeaderboard)
+class ForecastLeaderboardAdmin(admin.ModelAdmin):
+    list_display = ['id', 'metric', 'order', 'updated_at']
+
+
+@admin.register(ForecastRefreshJob)
+class ForecastRefreshJobAdmin(admin.ModelAdmin):
+    list_display = ['id', 'forecast_url', 'state', 'districts_done', 'districts_total',
+                    'rows_written', 'created_at', 'finished_at']
+
+
+@admin.register(ForecastArchiveRun)
+class ForecastArchiveRunAdmin(admin.ModelAdmin):
+    list_display = ['id', 'forecast_url', 'run_date', 'created_at']
+
+
+@admin.register(ForecastArchive)
+class ForecastArchiveAdmin(admin.ModelAdmin):
+    list_display = ['id', 'run_id', 'run_date', 'location_name', 'date', *ForecastData.HOURLY_VARIABLES]
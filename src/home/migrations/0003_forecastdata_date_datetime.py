@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:30
+
+from datetime import timezone
+
+from django.db import migrations, models
+from django.utils.dateparse import parse_datetime
+
+
+def convert_date_strings(apps, schema_editor):
+    """
+    Copies the string dates into the new timestamp column.
+
+    Stored strings are UTC wall-clock times in "%Y-%m-%d %H:%M:%S" format.
+    """
+    ForecastData = apps.get_model('home', 'ForecastData')
+    batch = []
+    for forecast_data in ForecastData.objects.exclude(date=None).only('id', 'date').iterator(chunk_size=5000):
+        date = parse_datetime(forecast_data.date)
+        if date is not None and date.tzinfo is None:
+            date = date.replace(tzinfo=timezone.utc)
+        forecast_data.date_timestamp = date
+        batch.append(forecast_data)
+        if len(batch) >= 5000:
+            ForecastData.objects.bulk_update(batch, ['date_timestamp'])
+            batch = []
+    ForecastData.objects.bulk_update(batch, ['date_timestamp'])
+
+
+def convert_date_timestamps(apps, schema_editor):
+    """
+    Copies the timestamps back into the string column.
+    """
+    ForecastData = apps.get_model('home', 'ForecastData')
+    batch = []
+    for forecast_data in ForecastData.objects.exclude(date_timestamp=None).only('id', 'date_timestamp').iterator(chunk_size=5000):
+        forecast_data.date = forecast_data.date_timestamp.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        batch.append(forecast_data)
+        if len(batch) >= 5000:
+            ForecastData.objects.bulk_update(batch, ['date'])
+            batch = []
+    ForecastData.objects.bulk_update(batch, ['date'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0002_district_forecastdata_forecastmetadata_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forecastdata',
+            name='date_timestamp',
+            field=models.DateTimeField(null=True),
+        ),
+        migrations.RunPython(convert_date_strings, convert_date_timestamps),
+        migrations.AlterUniqueTogether(
+            name='forecastdata',
+            unique_together=set(),
+        ),
+        migrations.RemoveField(
+            model_name='forecastdata',
+            name='date',
+        ),
+        migrations.RenameField(
+            model_name='forecastdata',
+            old_name='date_timestamp',
+            new_name='date',
+        ),
+        # The unique constraint's index doubles as the composite
+        # (forecast_meta_data_id, date) index used by date-window lookups
+        migrations.AlterUniqueTogether(
+            name='forecastdata',
+            unique_together={('forecast_meta_data', 'date')},
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0003_forecastdata_date_datetime'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='district',
+            name='lat',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='district',
+            name='long',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='forecastmetadata',
+            name='latitude',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AlterField(
+            model_name='forecastmetadata',
+            name='longitude',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddIndex(
+            model_name='district',
+            index=models.Index(fields=['lat', 'long'], name='home_district_lat_long_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0004_coordinates_float'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastLeaderboard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('metric', models.CharField(max_length=20)),
+                ('order', models.CharField(max_length=4)),
+                ('payload', models.BinaryField()),
+                ('offsets', models.JSONField(default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'ForecastLeaderboards',
+                'unique_together': {('metric', 'order')},
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:54
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0005_forecastleaderboard'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastRefreshJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('forecast_url', models.URLField(max_length=500)),
+                ('state', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('succeeded', 'Succeeded'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('task_id', models.CharField(blank=True, max_length=255, null=True)),
+                ('districts_total', models.PositiveIntegerField(default=0)),
+                ('districts_done', models.PositiveIntegerField(default=0)),
+                ('districts_failed', models.PositiveIntegerField(default=0)),
+                ('rows_written', models.PositiveBigIntegerField(default=0)),
+                ('prepare_seconds', models.FloatField(default=0)),
+                ('fetch_seconds', models.FloatField(default=0)),
+                ('parse_seconds', models.FloatField(default=0)),
+                ('write_seconds', models.FloatField(default=0)),
+                ('statistics_seconds', models.FloatField(default=0)),
+                ('cache_warm_seconds', models.FloatField(default=0)),
+                ('failed_locations', models.JSONField(default=dict)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'ForecastRefreshJobs',
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0006_forecastrefreshjob'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='forecastdata',
+            name='apparent_temperature',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='forecastdata',
+            name='precipitation',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='forecastdata',
+            name='relative_humidity_2m',
+            field=models.FloatField(null=True),
+        ),
+        migrations.AddField(
+            model_name='forecastdata',
+            name='wind_speed_10m',
+            field=models.FloatField(null=True),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:04
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0007_forecastdata_hourly_variables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastSeries',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.BigIntegerField()),
+                ('interval', models.PositiveIntegerField()),
+                ('variables', models.JSONField(default=list)),
+                ('values', models.BinaryField()),
+                ('created_at', models.DateTimeField(auto_now_add=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True, null=True)),
+                ('forecast_meta_data', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='forecast_series', to='home.forecastmetadata')),
+            ],
+            options={
+                'verbose_name_plural': 'ForecastSeries',
+            },
+        ),
+    ]
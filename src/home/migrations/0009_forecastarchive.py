@@ -0,0 +1,86 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:06
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_archive_table(apps, schema_editor):
+    """
+    Creates the archive table, partitioned by run_date on PostgreSQL.
+
+    Partitions are created per run date by archive_helper when a run starts, and
+    dropped as a whole once they are older than the retention period. Other
+    databases get a plain table.
+    """
+    model = apps.get_model('home', 'ForecastArchive')
+    if schema_editor.connection.vendor != 'postgresql':
+        schema_editor.create_model(model)
+        return
+
+    quote_name = schema_editor.quote_name
+    # The partition key has to be part of the primary key of a partitioned table
+    columns = [f'{quote_name("id")} bigint NOT NULL GENERATED BY DEFAULT AS IDENTITY']
+    for field in model._meta.local_fields:
+        if not field.primary_key:
+            definition, _ = schema_editor.column_sql(model, field)
+            columns.append(f'{quote_name(field.column)} {definition}')
+    columns.append(f'PRIMARY KEY ({quote_name("id")}, {quote_name("run_date")})')
+    schema_editor.execute(
+        f'CREATE TABLE {quote_name(model._meta.db_table)} ({", ".join(columns)}) PARTITION BY RANGE ({quote_name("run_date")})')
+    # Indexes created on the partitioned table are created on every partition as well
+    for index in model._meta.indexes:
+        schema_editor.add_index(model, index)
+
+
+def drop_archive_table(apps, schema_editor):
+    """
+    Drops the archive table, together with its partitions on PostgreSQL.
+    """
+    schema_editor.delete_model(apps.get_model('home', 'ForecastArchive'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0008_forecastseries'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastArchiveRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('forecast_url', models.URLField(max_length=500)),
+                ('run_date', models.DateField()),
+                ('created_at', models.DateTimeField(auto_now_add=True, null=True)),
+            ],
+            options={
+                'verbose_name_plural': 'ForecastArchiveRuns',
+                'indexes': [models.Index(fields=['run_date'], name='home_archiverun_run_date_idx')],
+            },
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.CreateModel(
+                    name='ForecastArchive',
+                    fields=[
+                        ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                        ('run_date', models.DateField()),
+                        ('location_name', models.CharField(max_length=40)),
+                        ('date', models.DateTimeField()),
+                        ('temperature_2m', models.FloatField(null=True)),
+                        ('relative_humidity_2m', models.FloatField(null=True)),
+                        ('precipitation', models.FloatField(null=True)),
+                        ('wind_speed_10m', models.FloatField(null=True)),
+                        ('apparent_temperature', models.FloatField(null=True)),
+                        ('run', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='home.forecastarchiverun')),
+                    ],
+                    options={
+                        'verbose_name_plural': 'ForecastArchive',
+                        'indexes': [models.Index(fields=['run', 'location_name'], name='home_archive_run_location_idx'), models.Index(fields=['location_name', 'date'], name='home_archive_location_date_idx')],
+                    },
+                ),
+            ],
+        ),
+        migrations.RunPython(create_archive_table, drop_archive_table),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 16:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0009_forecastarchive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ForecastDatasetVersion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.BigIntegerField()),
+                ('updated_at', models.DateTimeField(auto_now=True, null=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:05
+
+import time
+
+from django.db import migrations
+
+
+def create_dataset_version(apps, schema_editor):
+    # Created here rather than on first read, so API processes and workers starting at
+    # the same time do not race to insert it
+    ForecastDatasetVersion = apps.get_model('home', 'ForecastDatasetVersion')
+    ForecastDatasetVersion.objects.get_or_create(pk=1, defaults={'version': time.time_ns()})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('home', '0010_forecastdatasetversion'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_dataset_version, migrations.RunPython.noop),
+    ]
@@ -5,18 +5,21 @@ class District(models.Model):
     division_id = models.CharField(max_length=10, null=True)
     name = models.CharField(max_length=20, null=True)
     bn_name = models.CharField(max_length=20, null=True)
-    lat = models.CharField(max_length=20, null=True)
-    long = models.CharField(max_length=40, null=True)
+    lat = models.FloatField(null=True)
+    long = models.FloatField(null=True)
     created_at = models.DateTimeField(auto_now_add=True, null=True)
     updated_at = models.DateTimeField(auto_now=True, null=True)
 
+    class Meta:
+        indexes = [models.Index(fields=['lat', 'long'], name='home_district_lat_long_idx')]
+
     def __str__(self):
         return self.name
 
 
 class ForecastMetaData(models.Model):
-    latitude = models.CharField(max_length=20, null=True)
-    longitude = models.CharField(max_length=20, null=True)
+    latitude = models.FloatField(null=True)
+    longitude = models.FloatField(null=True)
     location_name = models.CharField(max_length=40, null=True, unique=True)
     average_temperature = models.FloatField(null=True)
     created_at = models.DateTimeField(auto_now_add=True, null=True)
@@ -24,6 +27,7 @@ class ForecastMetaData(models.Model):
 
     class Meta:
         verbose_name_plural = 'ForecastMetaData'
+        # Also serves as the (latitude, longitude) index for coordinate lookups
         unique_together = [['latitude', 'longitude', 'location_name']]
 
     def __str__(self):
@@ -31,10 +35,23 @@ class ForecastMetaData(models.Model):
 
 
 class ForecastData(models.Model):
+    # Open-Meteo hourly variables stored side by side, one row per location and hour
+    HOURLY_VARIABLES = [
+        'temperature_2m',
+        'relative_humidity_2m',
+        'precipitation',
+        'wind_speed_10m',
+        'apparent_temperature',
+    ]
+
     forecast_meta_data = models.ForeignKey(
         ForecastMetaData, on_delete=models.CASCADE, related_name="forecast_meta_data", null=True)
-    date = models.CharField(max_length=20, null=True)
+    date = models.DateTimeField(null=True)
     temperature_2m = models.FloatField(null=True)
+    relative_humidity_2m = models.FloatField(null=True)
+    precipitation = models.FloatField(null=True)
+    wind_speed_10m = models.FloatField(null=True)
+    apparent_temperature = models.FloatField(null=True)
     created_at = models.DateTimeField(auto_now_add=True, null=True)
     updated_at = models.DateTimeField(auto_now=True, null=True)
 
@@ -44,3 +61,129 @@ class ForecastData(models.Model):
 
     def __str__(self):
         return f'{self.date} - {self.forecast_meta_data.location_name}'
+
+
+class ForecastSeries(models.Model):
+    forecast_meta_data = models.OneToOneField(
+        ForecastMetaData, on_delete=models.CASCADE, related_name="forecast_series")
+    # Epoch seconds of the first value and seconds between two values
+    start = models.BigIntegerField()
+    interval = models.PositiveIntegerField()
+    variables = models.JSONField(default=list)
+    # Little-endian float32 matrix of shape (len(variables), hours), in C order
+    values = models.BinaryField()
+    created_at = models.DateTimeField(auto_now_add=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True)
+
+    class Meta:
+        verbose_name_plural = 'ForecastSeries'
+
+    def __str__(self):
+        return f'{self.forecast_meta_data.location_name} - {self.start}'
+
+
+class ForecastArchiveRun(models.Model):
+    forecast_url = models.URLField(max_length=500)
+    # UTC date of the run, the partition its archived forecast is stored in
+    run_date = models.DateField()
+    created_at = models.DateTimeField(auto_now_add=True, null=True)
+
+    class Meta:
+        verbose_name_plural = 'ForecastArchiveRuns'
+        indexes = [models.Index(fields=['run_date'], name='home_archiverun_run_date_idx')]
+
+    def __str__(self):
+        return f'{self.pk} - {self.run_date}'
+
+
+class ForecastArchive(models.Model):
+    # Append-only copy of the hourly forecast of every refresh run. On PostgreSQL the
+    # table is partitioned by run_date (see migration 0009), with (id, run_date) as its
+    # primary key. Rows keep the location name, so they outlive the forecast metadata
+    run = models.ForeignKey(
+        ForecastArchiveRun, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, related_name='+')
+    run_date = models.DateField()
+    location_name = models.CharField(max_length=40)
+    date = models.DateTimeField()
+    temperature_2m = models.FloatField(null=True)
+    relative_humidity_2m = models.FloatField(null=True)
+    precipitation = models.FloatField(null=True)
+    wind_speed_10m = models.FloatField(null=True)
+    apparent_temperature = models.FloatField(null=True)
+
+    class Meta:
+        verbose_name_plural = 'ForecastArchive'
+        indexes = [
+            models.Index(fields=['run', 'location_name'], name='home_archive_run_location_idx'),
+            models.Index(fields=['location_name', 'date'], name='home_archive_location_date_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.run_id} - {self.location_name} - {self.date}'
+
+
+class ForecastLeaderboard(models.Model):
+    metric = models.CharField(max_length=20)
+    order = models.CharField(max_length=4)
+    payload = models.BinaryField()
+    offsets = models.JSONField(default=list)
+    created_at = models.DateTimeField(auto_now_add=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True)
+
+    class Meta:
+        verbose_name_plural = 'ForecastLeaderboards'
+        unique_together = [['metric', 'order']]
+
+    def __str__(self):
+        return f'{self.metric} - {self.order}'
+
+
+class ForecastDatasetVersion(models.Model):
+    # Single row holding the version stamp of the forecast dataset, readable by every
+    # process whether or not they share a cache
+    version = models.BigIntegerField()
+    updated_at = models.DateTimeField(auto_now=True, null=True)
+
+    def __str__(self):
+        return str(self.version)
+
+
+class ForecastRefreshJob(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATES = [
+        (PENDING, 'Pending'),
+        (RUNNING, 'Running'),
+        (SUCCEEDED, 'Succeeded'),
+        (FAILED, 'Failed'),
+    ]
+    PHASES = ['prepare', 'fetch', 'parse', 'write', 'statistics', 'cache_warm']
+
+    forecast_url = models.URLField(max_length=500)
+    state = models.CharField(max_length=10, choices=STATES, default=PENDING)
+    task_id = models.CharField(max_length=255, null=True, blank=True)
+    districts_total = models.PositiveIntegerField(default=0)
+    districts_done = models.PositiveIntegerField(default=0)
+    districts_failed = models.PositiveIntegerField(default=0)
+    rows_written = models.PositiveBigIntegerField(default=0)
+    # Seconds spent per phase, summed over every shard and worker thread
+    prepare_seconds = models.FloatField(default=0)
+    fetch_seconds = models.FloatField(default=0)
+    parse_seconds = models.FloatField(default=0)
+    write_seconds = models.FloatField(default=0)
+    statistics_seconds = models.FloatField(default=0)
+    cache_warm_seconds = models.FloatField(default=0)
+    failed_locations = models.JSONField(default=dict)
+    error = models.TextField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True, null=True)
+
+    class Meta:
+        verbose_name_plural = 'ForecastRefreshJobs'
+
+    def __str__(self):
+        return f'{self.forecast_url} - {self.state}'
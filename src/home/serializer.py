@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import District, ForecastData, ForecastMetaData
+from .models import District, ForecastData, ForecastMetaData, ForecastRefreshJob
 
 
 class DistrictSerializer(serializers.ModelSerializer):
@@ -21,3 +21,19 @@ class ForecastMetaDataSerializer(serializers.ModelSerializer):
     class Meta:
         model = ForecastMetaData
         fields = '__all__'
+
+
+class ForecastRefreshJobSerializer(serializers.ModelSerializer):
+    districts = serializers.SerializerMethodField()
+    durations = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ForecastRefreshJob
+        fields = ['id', 'forecast_url', 'state', 'task_id', 'districts', 'rows_written', 'durations',
+                  'failed_locations', 'error', 'created_at', 'started_at', 'finished_at']
+
+    def get_districts(self, job):
+        return {"done": job.districts_done, "failed": job.districts_failed, "total": job.districts_total}
+
+    def get_durations(self, job):
+        return {phase: round(getattr(job, f'{phase}_seconds'), 3) for phase in ForecastRefreshJob.PHASES}
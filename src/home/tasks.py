@@ -1,30 +1,225 @@
-from celery import shared_task
+import logging
+
+from celery import chord, shared_task
+from celery.backends.base import DisabledBackend
+from celery.exceptions import WorkerTerminate
+from celery.signals import worker_init
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
 from django.db import transaction
-from home.utils.forecast_update_helper import ForecastUpdateCommand
+from home.models import ForecastMetaData
 from home.utils.districts_data_helper import DistrictDataRetriever
+from home.utils.http_cache_stats_helper import get_http_cache_stats
+from home.utils.refresh_job_helper import (
+    acquire_refresh_job, fail_refresh_job, finish_refresh_job, record_refresh_shard, start_refresh_job,
+)
+
+logger = logging.getLogger(__name__)
+
+NO_RESULT_BACKEND_ERROR = (
+    "Forecast refreshes are coordinated with a chord, which needs a result backend. "
+    "Set REDIS_URL or CELERY_RESULT_BACKEND."
+)
+
+
+def _forecast_update_command(*args, **kwargs):
+    """
+    Builds a ForecastUpdateCommand, importing the fetch and parse stack on first use.
+
+    Web processes import this module only to enqueue tasks, so they never load
+    openmeteo_requests and requests_cache.
+
+    Returns:
+    - ForecastUpdateCommand: The command.
+    """
+    from home.utils.forecast_update_helper import ForecastUpdateCommand
+
+    return ForecastUpdateCommand(*args, **kwargs)
+
+
+@worker_init.connect
+def preload_forecast_update_stack(**kwargs):
+    """
+    Imports the fetch and parse stack when a Celery worker starts.
+
+    The worker imports it before forking its pool processes, so they share the
+    loaded modules and the first refresh does not pay for the import.
+    """
+    import home.utils.forecast_update_helper  # noqa: F401
+
+
+@worker_init.connect
+def check_result_backend(sender, **kwargs):
+    """
+    Stops a Celery worker started without a result backend.
+
+    Without one, every refresh would fail when its chord is dispatched, so the
+    worker refuses to start instead of accepting refreshes it cannot run.
+    """
+    if not _chords_supported(sender.app):
+        raise WorkerTerminate(NO_RESULT_BACKEND_ERROR)
+
+
+def _chords_supported(app):
+    """
+    Checks whether a chord can be dispatched, i.e. tasks run eagerly or a result backend is configured.
+
+    Args:
+    - app (Celery): The Celery application.
+
+    Returns:
+    - bool: True if refreshes can be dispatched.
+    """
+    return app.conf.task_always_eager or not isinstance(app.backend, DisabledBackend)
+
 
 @shared_task(bind=True)
-def run_forecast_update(self, forecast_url):
+def run_forecast_update(self, forecast_url, job_id=None):
     """
     Task to update forecast data.
-    
+
+    Stale data is removed and metadata is created for every district, then the
+    districts are split into shards of FORECAST_SHARD_SIZE that are refreshed by
+    refresh_forecast_shard tasks in parallel. A chord runs
+    finalize_forecast_update once every shard has finished. Progress and timings
+    are recorded on a ForecastRefreshJob.
+
     Args:
     - forecast_url (str): The URL from which to fetch the forecast data.
-    
+    - job_id (int, optional): ID of the ForecastRefreshJob tracking the refresh.
+      A job is acquired when it is not given, e.g. for scheduled refreshes, and the
+      refresh is skipped when another one of the same URL is already tracked.
+
     Returns:
     - str: A message indicating the status of the forecast data update.
     """
-    with transaction.atomic():
-        print("==============Initiated forecast data update process===================")
-        
+    logger.info("Initiated forecast data update process for %s", forecast_url)
+    if job_id is None:
+        job, created = acquire_refresh_job(forecast_url)
+        if not created:
+            return f"Forecast data update skipped, refresh job {job.pk} is already tracking it"
+        job_id = job.pk
+
+    try:
+        # Check before prepare(), which deletes all forecast data in full mode
+        if not _chords_supported(self.app):
+            raise ImproperlyConfigured(NO_RESULT_BACKEND_ERROR)
+
         # Retrieve district data
         district_retriever = DistrictDataRetriever()
         districts_data = district_retriever.get_districts_data()
-        
-        # Execute forecast update command
-        forecast_update_command = ForecastUpdateCommand(districts_data, forecast_url)
-        forecast_update_command.execute()
-        
-        print("=================Forecast data update process completed=================")
-        
-        return "Forecast data updated successfully"
+
+        forecast_update_command = _forecast_update_command(districts_data, forecast_url)
+        with transaction.atomic():
+            forecast_meta_data_list = forecast_update_command.prepare()
+    except Exception as e:
+        fail_refresh_job(job_id, str(e))
+        raise
+    start_refresh_job(job_id, self.request.id, len(forecast_meta_data_list), forecast_update_command.timer.durations)
+
+    forecast_meta_data_ids = [forecast_meta_data.pk for forecast_meta_data in forecast_meta_data_list]
+    shard_size = settings.FORECAST_SHARD_SIZE
+    shards = [
+        forecast_meta_data_ids[start:start + shard_size]
+        for start in range(0, len(forecast_meta_data_ids), shard_size)
+    ]
+    refresh_mode = forecast_update_command.refresh_mode
+    archive_run_id = forecast_update_command.archive_run_id
+    try:
+        chord(
+            refresh_forecast_shard.s(forecast_url, shard, refresh_mode, job_id, archive_run_id) for shard in shards
+        )(finalize_forecast_update.s(forecast_url, refresh_mode, job_id).on_error(
+            fail_forecast_update.si(job_id, "A forecast shard failed after all of its retries.")))
+    except Exception as e:
+        fail_refresh_job(job_id, str(e))
+        raise
+
+    return f"Forecast data update started in {len(shards)} shards"
+
+
+@shared_task(bind=True, autoretry_for=(Exception,), retry_backoff=True,
+             max_retries=settings.FORECAST_SHARD_MAX_RETRIES)
+def refresh_forecast_shard(self, forecast_url, forecast_meta_data_ids, refresh_mode, job_id=None,
+                           archive_run_id=None):
+    """
+    Task to refresh the forecast of one shard of districts.
+
+    Each shard is saved in its own transaction. When some of its districts could
+    not be fetched, the shard is rolled back and retried on its own; after the
+    last retry whatever was fetched is kept and the failures are reported.
+
+    Args:
+    - forecast_url (str): The URL from which to fetch the forecast data.
+    - forecast_meta_data_ids (list): IDs of the forecast metadata in the shard.
+    - refresh_mode (str): 'incremental' or 'full'.
+    - job_id (int, optional): ID of the ForecastRefreshJob the progress is added to.
+    - archive_run_id (int, optional): ID of the ForecastArchiveRun the forecast is appended to.
+
+    Returns:
+    - dict: rows_written and failed_locations of the shard.
+    """
+    forecast_update_command = _forecast_update_command(
+        [], forecast_url, refresh_mode=refresh_mode, archive_run_id=archive_run_id)
+    forecast_meta_data = ForecastMetaData.objects.in_bulk(forecast_meta_data_ids)
+    forecast_meta_data_list = [forecast_meta_data[pk] for pk in forecast_meta_data_ids if pk in forecast_meta_data]
+
+    with transaction.atomic():
+        forecast_update_command.refresh(forecast_meta_data_list)
+        incomplete = bool(forecast_update_command.failed_locations) and self.request.retries < self.max_retries
+        if incomplete:
+            transaction.set_rollback(True)
+
+    # Retry outside the transaction, so an eagerly executed retry is not rolled back with it
+    if incomplete:
+        raise self.retry(countdown=2 ** self.request.retries)
+
+    if job_id is not None:
+        record_refresh_shard(job_id, len(forecast_meta_data_list), forecast_update_command.rows_written,
+                             forecast_update_command.failed_locations, forecast_update_command.timer.durations)
+    return {
+        "rows_written": forecast_update_command.rows_written,
+        "failed_locations": forecast_update_command.failed_locations,
+    }
+
+
+@shared_task
+def finalize_forecast_update(shard_results, forecast_url, refresh_mode, job_id=None):
+    """
+    Task to recompute aggregates and publish the dataset once every shard is saved.
+
+    Args:
+    - shard_results (list): Results of the refresh_forecast_shard tasks.
+    - forecast_url (str): The URL from which the forecast data was fetched.
+    - refresh_mode (str): 'incremental' or 'full'.
+    - job_id (int, optional): ID of the ForecastRefreshJob to complete.
+
+    Returns:
+    - str: A message indicating the status of the forecast data update.
+    """
+    forecast_update_command = _forecast_update_command([], forecast_url, refresh_mode=refresh_mode)
+    with transaction.atomic():
+        forecast_update_command.finalize()
+
+    failed_locations = {}
+    for shard_result in shard_results:
+        failed_locations.update(shard_result["failed_locations"])
+    for location_name, error in failed_locations.items():
+        logger.warning("Failed to update forecast data for %s: %s", location_name, error)
+    if job_id is not None:
+        finish_refresh_job(job_id, failed_locations, forecast_update_command.timer.durations)
+    logger.info("Upstream HTTP cache: %s", get_http_cache_stats())
+    logger.info("Forecast data update process completed for %s", forecast_url)
+
+    return "Forecast data updated successfully"
+
+
+@shared_task
+def fail_forecast_update(job_id, error):
+    """
+    Task marking a refresh job as failed when its chord cannot complete.
+
+    Args:
+    - job_id (int): ID of the ForecastRefreshJob.
+    - error (str): Description of the failure.
+    """
+    fail_refresh_job(job_id, error)
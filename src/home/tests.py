@@ -1,26 +1,195 @@
-from django.test import TestCase
+import csv
+import hashlib
+import io
+import json
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock, skipUnless
+from urllib.parse import parse_qs, urlparse
+
+import fakeredis
+import flatbuffers
+import numpy as np
+from celery import Celery
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.test import SimpleTestCase, TestCase, override_settings
+from openmeteo_sdk.WeatherApiResponse import WeatherApiResponse
 from rest_framework.test import APIClient
 from rest_framework import status
-from .models import ForecastMetaData, ForecastData
+from django_api.celery import app as celery_app
+from .models import (District, ForecastArchive, ForecastArchiveRun, ForecastLeaderboard, ForecastMetaData,
+                     ForecastData, ForecastRefreshJob, ForecastSeries)
+from .tasks import _chords_supported, run_forecast_update
+from .utils import cache_helper, leaderboard_helper
+from .utils.archive_helper import drop_expired_archive, get_location_history, get_run_forecast
+from .utils.bulk_write_helper import ForecastDataWriter
+from .utils.export_helper import arrow_available, iter_forecast_rows, render_ndjson
+from .utils.forecast_store_helper import ForecastStore
+from .utils.forecast_update_helper import ForecastUpdateCommand
+from .utils.http_cache_helper import LRUDictStorage
+from .utils.http_cache_stats_helper import get_http_cache_stats
+from .utils.refresh_job_helper import acquire_refresh_job, fail_refresh_job, finish_refresh_job
+from .utils.series_helper import pack_series, unpack_series
+from .utils.weather_data_helper import OpenMeteoApiClient, build_session
+
+
+def build_forecast_message(latitude, longitude, start, interval, values_list):
+    """
+    Builds a size-prefixed Open-Meteo flatbuffer message with hourly variables.
+
+    Args:
+    - latitude (float): Latitude of the location.
+    - longitude (float): Longitude of the location.
+    - start (int): Epoch seconds of the first hourly value.
+    - interval (int): Seconds between hourly values.
+    - values_list (list): One list of floats per hourly variable.
+
+    Returns:
+    - bytes: The message as returned by the Open-Meteo API.
+    """
+    builder = flatbuffers.Builder(1024)
+    variables = []
+    for values in values_list:
+        builder.StartVector(4, len(values), 4)
+        for value in reversed(values):
+            builder.PrependFloat32(value)
+        values_offset = builder.EndVector()
+        builder.StartObject(4)
+        builder.PrependUOffsetTRelativeSlot(3, values_offset, 0)
+        variables.append(builder.EndObject())
+
+    builder.StartVector(4, len(variables), 4)
+    for variable in reversed(variables):
+        builder.PrependUOffsetTRelative(variable)
+    variables_offset = builder.EndVector()
+
+    builder.StartObject(4)
+    builder.PrependInt64Slot(0, start, 0)
+    builder.PrependInt64Slot(1, start + interval * len(values_list[0]), 0)
+    builder.PrependInt32Slot(2, interval, 0)
+    builder.PrependUOffsetTRelativeSlot(3, variables_offset, 0)
+    hourly = builder.EndObject()
+
+    builder.StartObject(12)
+    builder.PrependFloat32Slot(0, latitude, 0.0)
+    builder.PrependFloat32Slot(1, longitude, 0.0)
+    builder.PrependUOffsetTRelativeSlot(11, hourly, 0)
+    builder.Finish(builder.EndObject())
+    message = bytes(builder.Output())
+    return len(message).to_bytes(4, byteorder="little") + message
+
+
+class FakeOpenMeteoClient:
+    """
+    Stand-in for openmeteo_requests.Client that answers from generated flatbuffers.
+    """
+
+    start = 1711929600  # 2024-04-01 00:00:00 UTC
+    hours = 48
+
+    def __init__(self, session=None, failing_latitudes=(), start=None, flaky_latitudes=(), empty_latitudes=()):
+        self.calls = []
+        self.start = start or self.start
+        self.failing_latitudes = {str(latitude) for latitude in failing_latitudes}
+        # Flaky latitudes fail only the first time they are requested
+        self.flaky_latitudes = {str(latitude) for latitude in flaky_latitudes}
+        # Empty latitudes get a forecast without any hours
+        self.empty_latitudes = {str(latitude) for latitude in empty_latitudes}
+
+    def weather_api(self, url, params):
+        self.calls.append(params)
+        latitudes = str(params["latitude"]).split(",")
+        longitudes = str(params["longitude"]).split(",")
+        if self.failing_latitudes.intersection(latitudes):
+            raise ConnectionError("Upstream request failed")
+        if self.flaky_latitudes.intersection(latitudes):
+            self.flaky_latitudes.difference_update(latitudes)
+            raise ConnectionError("Upstream request failed")
+        variables = params["hourly"].split(",")
+        responses = []
+        for latitude, longitude in zip(latitudes, longitudes):
+            # Temperatures follow the latitude, other variables their position in the request
+            values_list = [
+                [(float(latitude) if variable == "temperature_2m" else float(index)) + hour % 24
+                 for hour in range(0 if latitude in self.empty_latitudes else self.hours)]
+                for index, variable in enumerate(variables)
+            ]
+            message = build_forecast_message(
+                float(latitude), float(longitude), self.start, 3600, values_list)
+            responses.append(WeatherApiResponse.GetRootAs(message, 4))
+        return responses
+
+
+class ForecastRequestHandler(BaseHTTPRequestHandler):
+    """
+    Keep-alive HTTP handler answering forecast requests with generated flatbuffers.
+
+    One handler instance serves one TCP connection, so the number of instances is
+    the number of connections clients opened.
+    """
+
+    protocol_version = "HTTP/1.1"
+    connections = []
+    conditional_requests = []
+
+    def setup(self):
+        super().setup()
+        self.connections.append(self.client_address)
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        latitudes = query["latitude"][0].split(",")
+        longitudes = query["longitude"][0].split(",")
+        values_list = [[20.0] * 24 for _ in query["hourly"][0].split(",")]
+        body = b"".join(
+            build_forecast_message(float(latitude), float(longitude), FakeOpenMeteoClient.start, 3600, values_list)
+            for latitude, longitude in zip(latitudes, longitudes)
+        )
+        etag = '"{}"'.format(hashlib.sha1(body).hexdigest())
+        if self.headers.get("If-None-Match") == etag:
+            self.conditional_requests.append(self.path)
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/octet-stream")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
 
 
 class ForecastTestCase(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.create_forecast_data()
+        # Starts a new dataset version so in-process stores reload the test data
+        cache_helper.publish_dataset_version()
 
     def create_forecast_data(self):
         locations = [
-            {"name": "Dhaka", "latitude": "23.7115253", "longitude": "90.4111451", "temperature": 28.5},
-            {"name": "Satkhira", "latitude": "22.7185", "longitude": "89.0705", "temperature": 25.5},
-            {"name": "Gopalganj", "latitude": "23.0050857", "longitude": "89.8266059", "temperature": 24.5},
-            {"name": "Chattogram", "latitude": "22.335109", "longitude": "91.834073", "temperature": 26.8},
-            {"name": "Rajshahi", "latitude": "24.3745", "longitude": "88.6042", "temperature": 27.2},
-            {"name": "Barisal", "latitude": "22.702921", "longitude": "90.346597", "temperature": 25.0},
-            {"name": "Khulna", "latitude": "22.815774", "longitude": "89.551148", "temperature": 25.3},
-            {"name": "Mymensingh", "latitude": "24.7460", "longitude": "90.4028", "temperature": 26.1},
-            {"name": "Sylhet", "latitude": "24.8898", "longitude": "91.8710", "temperature": 24.9},
-            {"name": "Comilla", "latitude": "23.4682", "longitude": "91.1782", "temperature": 25.7}
+            {"name": "Dhaka", "latitude": 23.7115253, "longitude": 90.4111451, "temperature": 28.5},
+            {"name": "Satkhira", "latitude": 22.7185, "longitude": 89.0705, "temperature": 25.5},
+            {"name": "Gopalganj", "latitude": 23.0050857, "longitude": 89.8266059, "temperature": 24.5},
+            {"name": "Chattogram", "latitude": 22.335109, "longitude": 91.834073, "temperature": 26.8},
+            {"name": "Rajshahi", "latitude": 24.3745, "longitude": 88.6042, "temperature": 27.2},
+            {"name": "Barisal", "latitude": 22.702921, "longitude": 90.346597, "temperature": 25.0},
+            {"name": "Khulna", "latitude": 22.815774, "longitude": 89.551148, "temperature": 25.3},
+            {"name": "Mymensingh", "latitude": 24.7460, "longitude": 90.4028, "temperature": 26.1},
+            {"name": "Sylhet", "latitude": 24.8898, "longitude": 91.8710, "temperature": 24.9},
+            {"name": "Comilla", "latitude": 23.4682, "longitude": 91.1782, "temperature": 25.7}
         ]
 
         for location_data in locations:
@@ -32,7 +201,7 @@ class ForecastTestCase(TestCase):
             )
             ForecastData.objects.create(
                 forecast_meta_data=location_obj,
-                date="2024-04-01 14:00:00",
+                date=datetime(2024, 4, 1, 14, tzinfo=timezone.utc),
                 temperature_2m=location_data["temperature"]
             )
 
@@ -40,9 +209,31 @@ class ForecastTestCase(TestCase):
         url = '/api/get_average_temperature/'
         response = self.client.get(url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIn('source', response.data)
-        self.assertIn('data', response.data)
-        self.assertIn(response.data['source'], ['database', 'cache'])
+        self.assertIn('source', response.json())
+        self.assertIn('data', response.json())
+        self.assertIn(response.json()['source'], ['database', 'cache'])
+        self.assertEqual(response.json()['data'][0]['location_name'], "Gopalganj")
+        self.assertEqual(len(response.json()['data']), 10)
+
+    def test_get_average_temperature_leaderboards(self):
+        url = '/api/get_average_temperature/'
+        response = self.client.get(url, {"metric": "max", "order": "desc", "limit": 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['source'], 'database')
+        self.assertEqual([item['location_name'] for item in response.json()['data']],
+                         ["Dhaka", "Rajshahi", "Chattogram"])
+
+        response = self.client.get(url, {"metric": "hour_14", "limit": 1})
+        self.assertEqual(response.json()['source'], 'database')
+        self.assertEqual(response.json()['data'], [{
+            "id": ForecastMetaData.objects.get(location_name="Gopalganj").pk,
+            "location_name": "Gopalganj", "latitude": 23.0050857, "longitude": 89.8266059,
+            "average_temperature": 24.5, "value": 24.5,
+        }])
+        self.assertEqual(self.client.get(url, {"metric": "hour_14", "limit": 1}).json()['source'], 'cache')
+
+        self.assertEqual(self.client.get(url, {"metric": "median"}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(url, {"limit": "all"}).status_code, status.HTTP_400_BAD_REQUEST)
 
     def test_compare_temperature(self):
         request_data_list = [
@@ -52,4 +243,897 @@ class ForecastTestCase(TestCase):
         for request_data in request_data_list:
             response = self.client.post('/api/compare_temperature/', request_data, format='json')
             self.assertEqual(response.status_code, status.HTTP_200_OK)
-            self.assertIn(response.data['source'], ['database', 'cache'])
+            self.assertIn(response.data['source'], ['database', 'cache', 'memory'])
+            self.assertIn("has a cooler temperature (25.5°C)", response.data['Decision'])
+
+    def test_compare_temperature_cache_keys_are_normalized(self):
+        url = '/api/compare_temperature/'
+        response = self.client.post(url, {
+            "present_location": "Dhaka", "destination_location": "Satkhira", "travel_date": "2024-04-01"
+        }, format='json')
+        self.assertNotEqual(response.data['source'], 'cache')
+
+        response = self.client.post(url, {
+            "travel_date": "2024-04-01", "destination_location": "SATKHIRA ", "present_location": "dhaka"
+        }, format='json')
+        self.assertEqual(response.data['source'], 'cache')
+        self.assertIn("'Satkhira' has a cooler temperature (25.5°C)", response.data['Decision'])
+
+        response = self.client.post(url, {
+            "present_location": "Dhaka", "destination_location": "Satkhira", "travel_date": "2024-05-01"
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        response = self.client.get(url)
+        self.assertEqual(response.data, {"hits": 1, "misses": 2, "hit_rate": 0.3333})
+
+    def test_forecast_store_load_survives_a_refresh_between_queries(self):
+        reads = []
+
+        def values_list(*fields):
+            reads.append(fields)
+            queryset = ForecastMetaData.objects.all()
+            if len(reads) == 1:
+                # The first read misses Satkhira, as if a refresh created it right after
+                queryset = queryset.exclude(location_name="Satkhira")
+            return queryset.values_list(*fields)
+
+        with mock.patch.object(ForecastMetaData.objects, 'values_list', side_effect=values_list):
+            snapshot = ForecastStore()._load(cache_helper.get_dataset_version())
+
+        self.assertEqual(len(reads), 2)
+        self.assertEqual(snapshot.temperature_at("Satkhira", datetime(2024, 4, 1, 14, tzinfo=timezone.utc)), 25.5)
+
+    def test_compare_temperature_without_forecast_for_date(self):
+        response = self.client.post('/api/compare_temperature/', {
+            "present_location": "Dhaka", "destination_location": "Satkhira", "travel_date": "2024-05-01"
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_compare_temperature_over_date_range(self):
+        # 03:00 and 04:00 UTC fall within Dhaka daylight hours, 13:00 UTC does not
+        hourly_temperatures = {"Dhaka": {3: 30.0, 4: 32.0, 13: 40.0}, "Satkhira": {3: 26.0, 4: 27.0}}
+        for location_name, temperatures in hourly_temperatures.items():
+            for hour, temperature in temperatures.items():
+                ForecastData.objects.create(
+                    forecast_meta_data=ForecastMetaData.objects.get(location_name=location_name),
+                    date=datetime(2024, 4, 2, hour, tzinfo=timezone.utc),
+                    temperature_2m=temperature,
+                )
+
+        request_data = {"present_location": "Dhaka", "destination_location": "Satkhira",
+                        "start_date": "2024-04-01", "end_date": "2024-04-03"}
+        response = self.client.post('/api/compare_temperature/', request_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['aggregation'], 'mean')
+        self.assertEqual([day['date'] for day in response.data['days']], ["2024-04-01", "2024-04-02", "2024-04-03"])
+        self.assertIn('error', response.data['days'][0])
+        self.assertEqual(response.data['days'][1]['present_temperature'], 31.0)
+        self.assertEqual(response.data['days'][1]['destination_temperature'], 26.5)
+        self.assertIn("has a cooler temperature (26.5°C)", response.data['days'][1]['Decision'])
+
+        response = self.client.post('/api/compare_temperature/', dict(request_data, aggregation="max"), format='json')
+        self.assertEqual(response.data['days'][1]['present_temperature'], 32.0)
+
+        for invalid in ({"aggregation": "median"}, {"aggregation": ["max"]}, {"aggregation": {"max": 1}},
+                        {"end_date": "2024-03-31"}, {"end_date": "2024-05-01"}):
+            response = self.client.post('/api/compare_temperature/', dict(request_data, **invalid), format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+            response = self.client.post('/api/async/compare_temperature/', dict(request_data, **invalid), format='json')
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_compare_temperature_batch(self):
+        response = self.client.post('/api/compare_temperature/batch/', {"items": [
+            {"present_location": "Dhaka", "destination_location": "Satkhira", "travel_date": "2024-04-01"},
+            {"present_location": "Dhaka", "destination_location": "Atlantis", "travel_date": "2024-04-01"},
+            {"present_location": "Sylhet", "destination_location": "Dhaka", "travel_date": "01/04/2024"},
+            {"present_location": "Sylhet", "destination_location": "Dhaka", "travel_date": "2024-05-01"},
+            {"present_location": "Sylhet", "destination_location": "Dhaka", "travel_date": "2024-04-01"},
+            {"present_location": ["Dhaka"], "destination_location": "Sylhet", "travel_date": "2024-04-01"},
+            {"present_location": "Dhaka", "destination_location": {"name": "Sylhet"}, "travel_date": "2024-04-01"},
+            {"present_location": " dhaka", "destination_location": "SATKHIRA ", "travel_date": "2024-04-01"},
+        ]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data['results']
+        self.assertIn("has a cooler temperature (25.5°C)", results[0]['Decision'])
+        self.assertEqual([result.get('status') for result in results[1:4]], [404, 400, 404])
+        self.assertIn("does not have a cooler temperature (28.5°C)", results[4]['Decision'])
+        self.assertEqual([result.get('status') for result in results[5:7]], [400, 400])
+        self.assertEqual(results[7], results[0])
+
+        response = self.client.post('/api/compare_temperature/batch/', {"items": []}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_nearest_location(self):
+        response = self.client.get('/api/nearest_location/', {"latitude": 22.75, "longitude": 89.1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['location_name'], "Satkhira")
+        self.assertLess(response.data['distance_km'], 5)
+
+        response = self.client.get('/api/nearest_location/', {"latitude": "north", "longitude": 89.1})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncViewsTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        ForecastTestCase.create_forecast_data(self)
+        # Noon in Asia/Dhaka, inside the daylight hours aggregated by date-range comparisons
+        for location_name, temperature in [("Dhaka", 30.0), ("Gopalganj", 26.0)]:
+            ForecastData.objects.create(forecast_meta_data=ForecastMetaData.objects.get(location_name=location_name),
+                                        date=datetime(2024, 4, 1, 6, tzinfo=timezone.utc), temperature_2m=temperature)
+        cache_helper.publish_dataset_version()
+
+    async def test_async_leaderboard_matches_sync_view(self):
+        url = '/api/async/get_average_temperature/'
+        response = await self.async_client.get(url, {"metric": "max", "order": "desc", "limit": 3})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['source'], 'database')
+        self.assertEqual([item['location_name'] for item in response.json()['data']],
+                         ["Dhaka", "Rajshahi", "Chattogram"])
+
+        response = await self.async_client.get(url, {"metric": "max", "order": "desc", "limit": 3})
+        self.assertEqual(response.json()['source'], 'cache')
+        sync_response = await self.async_client.get('/api/get_average_temperature/',
+                                                    {"metric": "max", "order": "desc", "limit": 3})
+        self.assertEqual(sync_response.content, response.content)
+
+        response = await self.async_client.get(url, {"limit": "all"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    async def assert_async_comparisons(self, source):
+        url = '/api/async/compare_temperature/'
+        request_data = {"present_location": " dhaka", "destination_location": "Satkhira", "travel_date": "2024-04-01"}
+
+        response = await self.async_client.post(url, request_data, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['source'], source)
+        self.assertIn("has a cooler temperature (25.5°C)", response.json()['Decision'])
+        self.assertIn("°C".encode(), response.content)
+
+        # The async and sync views share the comparison cache
+        response = await self.async_client.post('/api/compare_temperature/', request_data, content_type='application/json')
+        self.assertEqual(response.json()['source'], 'cache')
+
+        response = await self.async_client.post(url, {
+            "present_location": "Dhaka", "destination_location": "Gopalganj",
+            "start_date": "2024-04-01", "end_date": "2024-04-02", "aggregation": "max",
+        }, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['source'], source)
+        self.assertEqual(response.json()['days'][0]['present_temperature'], 30.0)
+        self.assertIn("has a cooler temperature (26.0°C)", response.json()['days'][0]['Decision'])
+        self.assertIn("error", response.json()['days'][1])
+
+        for body, status_code in [
+            ({"present_location": "Atlantis", "destination_location": "Dhaka", "travel_date": "2024-04-01"},
+             status.HTTP_404_NOT_FOUND),
+            ({"present_location": "Dhaka", "destination_location": "Satkhira", "travel_date": "2024-05-01"},
+             status.HTTP_404_NOT_FOUND),
+            ({"present_location": "Dhaka", "destination_location": "Satkhira", "travel_date": "01/04/2024"},
+             status.HTTP_400_BAD_REQUEST),
+            ([], status.HTTP_400_BAD_REQUEST),
+        ]:
+            response = await self.async_client.post(url, body, content_type='application/json')
+            self.assertEqual(response.status_code, status_code)
+
+    @override_settings(FORECAST_STORE_ENABLED=True)
+    async def test_async_compare_temperature_from_store(self):
+        await self.assert_async_comparisons('memory')
+
+    @override_settings(FORECAST_STORE_ENABLED=False)
+    async def test_async_compare_temperature_from_database(self):
+        await self.assert_async_comparisons('database')
+
+
+FAKE_REDIS_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': 'redis://fake-redis:6379/0',
+        'OPTIONS': {'connection_class': fakeredis.FakeConnection},
+    }
+}
+
+
+@override_settings(CACHES=FAKE_REDIS_CACHES, FORECAST_STORE_ENABLED=False)
+class SharedCacheTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        location = ForecastMetaData.objects.create(
+            latitude=23.7115253, longitude=90.4111451, location_name="Dhaka", average_temperature=28.5)
+        ForecastData.objects.create(
+            forecast_meta_data=location, date=datetime(2024, 4, 1, 14, tzinfo=timezone.utc), temperature_2m=28.5)
+
+    def test_processes_share_dataset_version(self):
+        api_process_cache = caches.create_connection('default')
+        worker_process_cache = caches.create_connection('default')
+
+        with mock.patch.object(cache_helper, 'cache', worker_process_cache):
+            version = cache_helper.publish_dataset_version()
+        with mock.patch.object(cache_helper, 'cache', api_process_cache):
+            self.assertEqual(cache_helper.get_dataset_version(), version)
+            self.assertEqual(cache_helper.versioned_key('lowest_average_temperatures'),
+                             f'lowest_average_temperatures:v{version}')
+
+    def test_processes_without_shared_cache_read_version_from_database(self):
+        api_process_cache = LocMemCache('api-process', {})
+        worker_process_cache = LocMemCache('worker-process', {})
+
+        with mock.patch.object(cache_helper, 'cache', worker_process_cache):
+            version = cache_helper.publish_dataset_version()
+        with mock.patch.object(cache_helper, 'cache', api_process_cache):
+            self.assertEqual(cache_helper.get_dataset_version(), version)
+
+        with mock.patch.object(cache_helper, 'cache', worker_process_cache):
+            new_version = cache_helper.publish_dataset_version()
+        with mock.patch.object(cache_helper, 'cache', api_process_cache):
+            # The cached copy is trusted until FORECAST_DATASET_VERSION_TIMEOUT expires it
+            self.assertEqual(cache_helper.get_dataset_version(), version)
+            api_process_cache.delete(cache_helper.DATASET_VERSION_KEY)
+            self.assertEqual(cache_helper.get_dataset_version(), new_version)
+
+    def test_database_comparison_queries_each_table_once(self):
+        location = ForecastMetaData.objects.create(
+            latitude=22.7185, longitude=89.0705, location_name="Satkhira", average_temperature=25.5)
+        ForecastData.objects.create(
+            forecast_meta_data=location, date=datetime(2024, 4, 1, 14, tzinfo=timezone.utc), temperature_2m=25.5)
+        cache_helper.get_dataset_version()
+
+        with self.assertNumQueries(2):
+            response = self.client.post('/api/compare_temperature/', {
+                "present_location": "dhaka", "destination_location": "Satkhira", "travel_date": "2024-04-01"
+            }, format='json')
+        self.assertEqual(response.data['source'], 'database')
+        self.assertIn("has a cooler temperature (25.5°C)", response.data['Decision'])
+
+    def test_new_dataset_version_invalidates_cached_responses(self):
+        url = '/api/get_average_temperature/'
+        self.assertEqual(self.client.get(url).json()['source'], 'database')
+        self.assertEqual(self.client.get(url).json()['source'], 'cache')
+
+        cache.set('unrelated', 'kept')
+        cache_helper.publish_dataset_version()
+
+        self.assertEqual(self.client.get(url).json()['source'], 'database')
+        self.assertEqual(cache.get('unrelated'), 'kept')
+
+
+class CacheStampedeTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_misses_compute_once(self):
+        calls = []
+        lock = threading.Lock()
+
+        def compute():
+            with lock:
+                calls.append(1)
+            time.sleep(0.2)
+            return "value"
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(
+                lambda _: cache_helper.get_or_compute("stampede", compute, 60), range(8)))
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual({value for value, _ in results}, {"value"})
+        self.assertEqual(sum(not from_cache for _, from_cache in results), 1)
+
+    def test_stale_value_served_while_another_request_refreshes(self):
+        cache.set("stale", {'value': "old", 'delta': 0.1, 'expires': time.time() - 1}, 60)
+        cache.add("stale:lock", True, 30)
+
+        value, from_cache = cache_helper.get_or_compute("stale", mock.Mock(side_effect=AssertionError), 60)
+
+        self.assertEqual((value, from_cache), ("old", True))
+
+    def test_expired_value_is_recomputed(self):
+        cache.set("expired", {'value': "old", 'delta': 0.1, 'expires': time.time() - 1}, 60)
+
+        value, from_cache = cache_helper.get_or_compute("expired", lambda: "new", 60)
+
+        self.assertEqual((value, from_cache), ("new", False))
+        self.assertEqual(cache_helper.get_or_compute("expired", lambda: "newer", 60, beta=0), ("new", True))
+
+    def test_concurrent_leaderboard_misses_load_once(self):
+        def load(metric, order):
+            time.sleep(0.2)
+            return b'[1,2]', [2, 4]
+
+        # Keeps the worker threads from reading the dataset version outside the test transaction
+        cache_helper.publish_dataset_version()
+        with mock.patch('home.utils.leaderboard_helper._load_leaderboard', side_effect=load) as load_leaderboard:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(
+                    lambda _: leaderboard_helper.get_leaderboard('mean', 'asc', 1), range(8)))
+
+        self.assertEqual(load_leaderboard.call_count, 1)
+        self.assertEqual({payload for payload, _ in results}, {b'[1]'})
+        self.assertEqual(sorted(source for _, source in results), ['cache'] * 7 + ['database'])
+
+class OpenMeteoApiClientTestCase(TestCase):
+    def test_get_weather_data_batch_chunks_locations(self):
+        fake_client = FakeOpenMeteoClient()
+        locations = [
+            {"latitude": 20.0 + index, "longitude": 90.0 + index, "location_name": f"District{index}"}
+            for index in range(5)
+        ]
+
+        with mock.patch('home.utils.weather_data_helper.openmeteo_requests.Client', return_value=fake_client):
+            weather_data = OpenMeteoApiClient(session=None, batch_size=2).get_weather_data_batch(
+                "https://api.open-meteo.com/v1/forecast", locations)
+
+        self.assertEqual(len(fake_client.calls), 3)
+        self.assertEqual(fake_client.calls[0]["latitude"], "20.0,21.0")
+        self.assertEqual([data["location_name"] for data in weather_data],
+                         [location["location_name"] for location in locations])
+        self.assertEqual(weather_data[3]["temperature_2m"][0], 23.0)
+        self.assertEqual(weather_data[3]["time"].dtype, np.int64)
+        self.assertEqual(weather_data[3]["temperature_2m"].dtype, np.float32)
+        self.assertEqual(int(weather_data[3]["time"][14]), FakeOpenMeteoClient.start + 14 * 3600)
+
+    def test_requests_every_hourly_variable_in_one_call(self):
+        fake_client = FakeOpenMeteoClient()
+        variables = ["temperature_2m", "precipitation", "wind_speed_10m"]
+
+        with mock.patch('home.utils.weather_data_helper.openmeteo_requests.Client', return_value=fake_client):
+            weather_data = OpenMeteoApiClient(session=None, variables=variables).get_weather_data(
+                "https://api.open-meteo.com/v1/forecast", 20.0, 90.0, "District0")
+
+        self.assertEqual(len(fake_client.calls), 1)
+        self.assertEqual(fake_client.calls[0]["hourly"], "temperature_2m,precipitation,wind_speed_10m")
+        self.assertEqual(weather_data["temperature_2m"][0], 20.0)
+        self.assertEqual(weather_data["precipitation"][0], 1.0)
+        self.assertEqual(weather_data["wind_speed_10m"][3], 5.0)
+        self.assertNotIn("relative_humidity_2m", weather_data)
+
+        with self.assertRaises(ValueError):
+            OpenMeteoApiClient(session=None, variables=["temperature_2m", "snowfall"])
+
+    def start_server(self):
+        ForecastRequestHandler.connections = []
+        ForecastRequestHandler.conditional_requests = []
+        server = ThreadingHTTPServer(("127.0.0.1", 0), ForecastRequestHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        return f"http://127.0.0.1:{server.server_port}/v1/forecast"
+
+    def test_shared_session_reuses_connections(self):
+        forecast_url = self.start_server()
+        locations = [
+            {"latitude": 20.0 + index, "longitude": 90.0 + index, "location_name": f"District{index}"}
+            for index in range(4)
+        ]
+
+        with build_session(pool_size=1, backend='memory') as session:
+            weather_data = OpenMeteoApiClient(session=session, batch_size=1).get_weather_data_batch(
+                forecast_url, locations)
+
+        self.assertEqual(len(weather_data), 4)
+        self.assertEqual(weather_data[2]["temperature_2m"][0], 20.0)
+        self.assertEqual(len(ForecastRequestHandler.connections), 1)
+
+    def test_http_cache_revalidates_expired_responses(self):
+        cache.clear()
+        forecast_url = self.start_server()
+
+        # Responses expire at once, so every repeated request is revalidated with its ETag
+        with build_session(pool_size=1, backend='memory', expire_after=0) as session:
+            client = OpenMeteoApiClient(session=session)
+            first = client.get_weather_data(forecast_url, 20.0, 90.0, "District0")
+            second = client.get_weather_data(forecast_url, 20.0, 90.0, "District0")
+
+        self.assertEqual(first["temperature_2m"].tolist(), second["temperature_2m"].tolist())
+        self.assertEqual(len(ForecastRequestHandler.conditional_requests), 1)
+        stats = get_http_cache_stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["revalidated"]), (0, 1, 1))
+        self.assertEqual(APIClient().get('/api/http_cache_stats/').json(), {"http_cache": stats})
+
+    def test_memory_http_cache_evicts_least_recently_used(self):
+        storage = LRUDictStorage(max_entries=2)
+        storage["a"], storage["b"] = "first", "second"
+        storage["a"]
+        storage["c"] = "third"
+        self.assertEqual(sorted(storage.data), ["a", "c"])
+
+
+class ForecastUpdateCommandTestCase(TestCase):
+    def setUp(self):
+        self.districts_data = [
+            {"name": f"District{index}", "lat": str(20.0 + index), "long": str(90.0 + index)}
+            for index in range(6)
+        ]
+
+    def run_command(self, fake_client, **kwargs):
+        command = ForecastUpdateCommand(
+            self.districts_data, "https://api.open-meteo.com/v1/forecast", **kwargs)
+        with mock.patch('home.utils.weather_data_helper.openmeteo_requests.Client', return_value=fake_client):
+            command.execute()
+        return command
+
+    def test_execute_fetches_batches_concurrently(self):
+        fake_client = FakeOpenMeteoClient()
+        command = self.run_command(fake_client, batch_size=2, concurrency=3)
+
+        self.assertEqual(len(fake_client.calls), 3)
+        self.assertEqual(command.failed_locations, {})
+        self.assertEqual(ForecastData.objects.count(), 6 * FakeOpenMeteoClient.hours)
+        district = ForecastMetaData.objects.get(location_name="District2")
+        self.assertEqual(district.average_temperature, 22.0 + 11.5)
+        self.assertEqual(ForecastLeaderboard.objects.count(), 8)
+
+    def test_execute_stores_hourly_variables_in_one_row(self):
+        self.run_command(FakeOpenMeteoClient(), batch_size=6)
+
+        self.assertEqual(ForecastData.objects.count(), 6 * FakeOpenMeteoClient.hours)
+        row = ForecastData.objects.get(forecast_meta_data__location_name="District2",
+                                       date=datetime(2024, 4, 1, 3, tzinfo=timezone.utc))
+        self.assertEqual(
+            [row.temperature_2m, row.relative_humidity_2m, row.precipitation, row.wind_speed_10m,
+             row.apparent_temperature],
+            [25.0, 4.0, 5.0, 6.0, 7.0])
+
+    @override_settings(FORECAST_HOURLY_VARIABLES=['temperature_2m', 'precipitation'])
+    def test_execute_stores_configured_variables_only(self):
+        fake_client = FakeOpenMeteoClient()
+        self.run_command(fake_client, batch_size=6)
+
+        self.assertEqual(fake_client.calls[0]["hourly"], "temperature_2m,precipitation")
+        row = ForecastData.objects.filter(forecast_meta_data__location_name="District0").first()
+        self.assertIsNotNone(row.precipitation)
+        self.assertIsNone(row.wind_speed_10m)
+
+    def test_writer_stores_missing_values_as_null(self):
+        forecast_meta_data = ForecastMetaData.objects.create(latitude=20.0, longitude=90.0, location_name="District0")
+        times = np.array([FakeOpenMeteoClient.start, FakeOpenMeteoClient.start + 3600], dtype=np.int64)
+        writer = ForecastDataWriter(variables=['temperature_2m', 'precipitation'])
+        writer.add(forecast_meta_data, times, {
+            'temperature_2m': np.array([20.0, 21.0], dtype=np.float32),
+            'precipitation': np.array([np.nan, 0.5], dtype=np.float32),
+        })
+        writer.flush()
+
+        self.assertEqual(list(ForecastData.objects.order_by('date').values_list('precipitation', flat=True)),
+                         [None, 0.5])
+
+    def test_execute_keeps_data_when_a_forecast_has_no_hours(self):
+        self.run_command(FakeOpenMeteoClient(), batch_size=6)
+
+        for storage_mode in ('rows', 'series'):
+            with self.subTest(storage_mode=storage_mode), override_settings(FORECAST_STORAGE_MODE=storage_mode):
+                command = self.run_command(FakeOpenMeteoClient(empty_latitudes=[22.0]), batch_size=6)
+
+                self.assertEqual(command.failed_locations, {})
+                self.assertEqual(ForecastData.objects.count(), 6 * FakeOpenMeteoClient.hours)
+                self.assertEqual(ForecastMetaData.objects.get(location_name="District3").average_temperature,
+                                 23.0 + 11.5)
+
+    def test_execute_tracks_failed_locations(self):
+        fake_client = FakeOpenMeteoClient(failing_latitudes=[22.0])
+        command = self.run_command(fake_client, batch_size=2, concurrency=2)
+
+        self.assertEqual(sorted(command.failed_locations), ["District2", "District3"])
+        self.assertFalse(ForecastData.objects.filter(
+            forecast_meta_data__location_name__in=command.failed_locations).exists())
+        self.assertEqual(ForecastData.objects.count(), 4 * FakeOpenMeteoClient.hours)
+
+    def test_incremental_refresh_keeps_ids_and_prunes_old_window(self):
+        self.run_command(FakeOpenMeteoClient(), batch_size=4)
+        meta_data_ids = set(ForecastMetaData.objects.values_list('id', flat=True))
+
+        next_day = FakeOpenMeteoClient.start + 24 * 3600
+        command = self.run_command(FakeOpenMeteoClient(start=next_day), batch_size=4)
+
+        self.assertEqual(command.refresh_mode, ForecastUpdateCommand.INCREMENTAL)
+        self.assertEqual(set(ForecastMetaData.objects.values_list('id', flat=True)), meta_data_ids)
+        self.assertEqual(ForecastData.objects.count(), 6 * FakeOpenMeteoClient.hours)
+        self.assertFalse(ForecastData.objects.filter(
+            date__lt=datetime(2024, 4, 2, tzinfo=timezone.utc)).exists())
+
+    def test_full_refresh_replaces_all_rows(self):
+        self.run_command(FakeOpenMeteoClient(), batch_size=4)
+        meta_data_ids = set(ForecastMetaData.objects.values_list('id', flat=True))
+
+        self.run_command(FakeOpenMeteoClient(), batch_size=4, refresh_mode=ForecastUpdateCommand.FULL)
+
+        self.assertTrue(meta_data_ids.isdisjoint(ForecastMetaData.objects.values_list('id', flat=True)))
+        self.assertEqual(ForecastData.objects.count(), 6 * FakeOpenMeteoClient.hours)
+
+
+@override_settings(FORECAST_STORAGE_MODE='series', FORECAST_STORE_ENABLED=False)
+class SeriesStorageTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.districts_data = [
+            {"name": f"District{index}", "lat": str(20.0 + index), "long": str(90.0 + index)}
+            for index in range(6)
+        ]
+
+    def run_command(self, fake_client):
+        command = ForecastUpdateCommand(self.districts_data, "https://api.open-meteo.com/v1/forecast", batch_size=3)
+        with mock.patch('home.utils.weather_data_helper.openmeteo_requests.Client', return_value=fake_client), \
+                self.captureOnCommitCallbacks(execute=True):
+            command.execute()
+        return command
+
+    def test_refresh_stores_one_series_per_location(self):
+        command = self.run_command(FakeOpenMeteoClient())
+
+        self.assertEqual(command.rows_written, 6)
+        self.assertEqual(ForecastSeries.objects.count(), 6)
+        self.assertFalse(ForecastData.objects.exists())
+        series = ForecastSeries.objects.get(forecast_meta_data__location_name="District2")
+        values = unpack_series(series.values, len(series.variables))
+        self.assertEqual((series.start, series.interval), (FakeOpenMeteoClient.start, 3600))
+        self.assertEqual(values.shape, (5, FakeOpenMeteoClient.hours))
+        self.assertFalse(values.flags.owndata)
+        self.assertEqual(values[series.variables.index("temperature_2m"), 3], 25.0)
+        self.assertEqual(ForecastMetaData.objects.get(location_name="District2").average_temperature, 22.0 + 11.5)
+        self.assertEqual(ForecastLeaderboard.objects.count(), 8)
+
+    def test_refresh_replaces_series_in_place(self):
+        self.run_command(FakeOpenMeteoClient())
+        next_day = FakeOpenMeteoClient.start + 24 * 3600
+        self.run_command(FakeOpenMeteoClient(start=next_day))
+
+        self.assertEqual(ForecastSeries.objects.count(), 6)
+        self.assertEqual(set(ForecastSeries.objects.values_list('start', flat=True)), {next_day})
+
+    def test_comparisons_are_read_from_series(self):
+        self.run_command(FakeOpenMeteoClient())
+
+        response = APIClient().post('/api/compare_temperature/', {
+            "present_location": "District0", "destination_location": "District1", "travel_date": "2024-04-01"
+        }, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['source'], 'memory')
+        self.assertIn("(34.0°C)", response.data['Decision'])
+
+    def test_pack_series_rejects_irregular_timestamps(self):
+        times = np.array([0, 3600, 10800], dtype=np.int64)
+        with self.assertRaises(ValueError):
+            pack_series(times, {"temperature_2m": np.zeros(3)}, ["temperature_2m"])
+
+    def test_pack_series_accepts_empty_forecast(self):
+        variables = ["temperature_2m", "precipitation"]
+        start, interval, packed = pack_series(
+            np.array([], dtype=np.int64), {variable: np.array([]) for variable in variables}, variables)
+
+        self.assertEqual((start, interval, packed), (0, 3600, b''))
+        self.assertEqual(unpack_series(packed, len(variables)).shape, (2, 0))
+
+
+class ForecastArchiveTestCase(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.districts_data = [
+            {"name": f"District{index}", "lat": str(20.0 + index), "long": str(90.0 + index)}
+            for index in range(3)
+        ]
+
+    def run_command(self, fake_client):
+        command = ForecastUpdateCommand(self.districts_data, "https://api.open-meteo.com/v1/forecast")
+        with mock.patch('home.utils.weather_data_helper.openmeteo_requests.Client', return_value=fake_client), \
+                self.captureOnCommitCallbacks(execute=True):
+            command.execute()
+        return command
+
+    def test_every_run_is_appended(self):
+        first = self.run_command(FakeOpenMeteoClient())
+        second = self.run_command(FakeOpenMeteoClient(start=FakeOpenMeteoClient.start + 3600))
+
+        self.assertNotEqual(first.archive_run_id, second.archive_run_id)
+        self.assertEqual(ForecastArchive.objects.count(), 2 * 3 * FakeOpenMeteoClient.hours)
+        first_run = ForecastArchiveRun.objects.get(pk=first.archive_run_id)
+        rows = get_run_forecast(first_run)
+        self.assertEqual(rows.count(), 3 * FakeOpenMeteoClient.hours)
+        row = rows.get(location_name="District2", date=datetime.fromtimestamp(FakeOpenMeteoClient.start + 3 * 3600,
+                                                                              timezone.utc))
+        self.assertEqual(row.temperature_2m, 25.0)
+
+        history = get_location_history("District2", first_run.run_date, first_run.run_date)
+        self.assertEqual(history.count(), 2 * FakeOpenMeteoClient.hours)
+        self.assertEqual(set(history.values_list('run_id', flat=True)), {first.archive_run_id, second.archive_run_id})
+
+    def test_expired_runs_are_dropped(self):
+        self.run_command(FakeOpenMeteoClient())
+        old_date = datetime.now(timezone.utc).date() - timedelta(days=40)
+        old_run = ForecastArchiveRun.objects.create(forecast_url="https://api.open-meteo.com/v1/forecast",
+                                                    run_date=old_date)
+        ForecastArchive.objects.create(run=old_run, run_date=old_date, location_name="District0",
+                                       date=datetime(2024, 1, 1, tzinfo=timezone.utc), temperature_2m=1.0)
+
+        self.assertEqual(drop_expired_archive(retention_days=30), 1)
+        self.assertFalse(ForecastArchiveRun.objects.filter(pk=old_run.pk).exists())
+        self.assertFalse(ForecastArchive.objects.filter(run_date=old_date).exists())
+        self.assertEqual(ForecastArchive.objects.count(), 3 * FakeOpenMeteoClient.hours)
+
+    @override_settings(FORECAST_ARCHIVE_ENABLED=False)
+    def test_archive_can_be_disabled(self):
+        command = self.run_command(FakeOpenMeteoClient())
+
+        self.assertIsNone(command.archive_run_id)
+        self.assertFalse(ForecastArchiveRun.objects.exists())
+        self.assertFalse(ForecastArchive.objects.exists())
+
+
+@override_settings(FORECAST_EXPORT_CHUNK_SIZE=7)
+class ForecastExportTestCase(TestCase):
+    url = '/api/export_forecast/{}/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.districts_data = [
+            {"name": f"District{index}", "lat": str(20.0 + index), "long": str(90.0 + index)}
+            for index in range(3)
+        ]
+
+    def run_command(self):
+        command = ForecastUpdateCommand(self.districts_data, "https://api.open-meteo.com/v1/forecast")
+        with mock.patch('home.utils.weather_data_helper.openmeteo_requests.Client',
+                        return_value=FakeOpenMeteoClient()), self.captureOnCommitCallbacks(execute=True):
+            command.execute()
+
+    def export(self, export_format, **params):
+        response = self.client.get(self.url.format(export_format), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def export_ndjson(self, **params):
+        return [json.loads(line) for line in self.export('ndjson', **params).decode().splitlines()]
+
+    def test_ndjson_export_streams_every_row(self):
+        self.run_command()
+
+        rows = self.export_ndjson()
+        self.assertEqual(len(rows), 3 * FakeOpenMeteoClient.hours)
+        self.assertEqual(rows[3], {
+            "location_name": "District0", "date": "2024-04-01T03:00:00+00:00", "temperature_2m": 23.0,
+            "relative_humidity_2m": 4.0, "precipitation": 5.0, "wind_speed_10m": 6.0, "apparent_temperature": 7.0,
+        })
+
+    def test_export_filters(self):
+        self.run_command()
+
+        # 2024-04-01 in Asia/Dhaka ends at 18:00 UTC
+        rows = self.export_ndjson(location=" district1,DISTRICT2", start_date="2024-04-01", end_date="2024-04-01",
+                                  variables="temperature_2m")
+        self.assertEqual(len(rows), 2 * 18)
+        self.assertEqual({row["location_name"] for row in rows}, {"District1", "District2"})
+        self.assertEqual(list(rows[0]), ["location_name", "date", "temperature_2m"])
+        self.assertEqual(rows[-1]["date"], "2024-04-01T17:00:00+00:00")
+
+        for export_format, params, status_code in [
+            ('ndjson', {"location": "Atlantis"}, status.HTTP_404_NOT_FOUND),
+            ('ndjson', {"variables": "snowfall"}, status.HTTP_400_BAD_REQUEST),
+            ('ndjson', {"start_date": "01/04/2024"}, status.HTTP_400_BAD_REQUEST),
+            ('ndjson', {"start_date": "2024-04-02", "end_date": "2024-04-01"}, status.HTTP_400_BAD_REQUEST),
+            ('xml', {}, status.HTTP_404_NOT_FOUND),
+        ]:
+            response = self.client.get(self.url.format(export_format), params)
+            self.assertEqual(response.status_code, status_code)
+
+    def test_ndjson_export_writes_nan_as_null(self):
+        row = ("District0", datetime(2024, 4, 1, tzinfo=timezone.utc), float('nan'), 1.0)
+        with mock.patch('django.db.models.query.QuerySet.iterator', return_value=iter([row])):
+            body = b''.join(render_ndjson(iter_forecast_rows(None, ["temperature_2m", "precipitation"]),
+                                          ["temperature_2m", "precipitation"]))
+
+        self.assertNotIn(b'NaN', body)
+        self.assertEqual(json.loads(body)["temperature_2m"], None)
+
+    def test_csv_export(self):
+        self.run_command()
+
+        rows = list(csv.reader(io.StringIO(self.export('csv', location="District2").decode())))
+        self.assertEqual(rows[0], ["location_name", "date", *ForecastData.HOURLY_VARIABLES])
+        self.assertEqual(len(rows), 1 + FakeOpenMeteoClient.hours)
+        self.assertEqual(rows[4][:3], ["District2", "2024-04-01T03:00:00+00:00", "25.0"])
+
+    @skipUnless(arrow_available(), "pyarrow is not installed")
+    def test_arrow_export(self):
+        import pyarrow as pa
+
+        self.run_command()
+
+        table = pa.ipc.open_stream(self.export('arrow', variables="temperature_2m,precipitation")).read_all()
+        self.assertEqual(table.num_rows, 3 * FakeOpenMeteoClient.hours)
+        self.assertEqual(table.column_names, ["location_name", "date", "temperature_2m", "precipitation"])
+        self.assertEqual(table.column("temperature_2m")[3].as_py(), 23.0)
+
+    def test_series_export_matches_rows_export(self):
+        self.run_command()
+        expected = self.export_ndjson(start_date="2024-04-02")
+
+        with override_settings(FORECAST_STORAGE_MODE='series'):
+            self.run_command()
+            rows = self.export_ndjson(start_date="2024-04-02")
+        self.assertEqual(len(rows), 3 * 30)
+        self.assertEqual(rows, expected)
+
+
+@override_settings(FORECAST_SHARD_SIZE=2, FORECAST_FETCH_BATCH_SIZE=2)
+class ShardedForecastUpdateTestCase(TestCase):
+    forecast_url = "https://api.open-meteo.com/v1/forecast"
+
+    def setUp(self):
+        cache.clear()
+        for index in range(6):
+            District.objects.create(name=f"District{index}", lat=20.0 + index, long=90.0 + index)
+
+        eager_settings = {'task_always_eager': True, 'task_eager_propagates': False}
+        previous_settings = {name: celery_app.conf[name] for name in eager_settings}
+        celery_app.conf.update(eager_settings)
+        self.addCleanup(celery_app.conf.update, previous_settings)
+
+    def run_update(self, fake_client):
+        with mock.patch('home.utils.weather_data_helper.openmeteo_requests.Client', return_value=fake_client):
+            with self.captureOnCommitCallbacks(execute=True):
+                return run_forecast_update.delay(self.forecast_url)
+
+    def test_refresh_runs_shards_and_publishes_once(self):
+        version = cache_helper.get_dataset_version()
+        fake_client = FakeOpenMeteoClient()
+
+        result = self.run_update(fake_client)
+
+        self.assertEqual(result.get(), "Forecast data update started in 3 shards")
+        self.assertEqual(len(fake_client.calls), 3)
+        self.assertEqual(ForecastData.objects.count(), 6 * FakeOpenMeteoClient.hours)
+        self.assertEqual(ForecastMetaData.objects.get(location_name="District2").average_temperature, 22.0 + 11.5)
+        self.assertEqual(ForecastLeaderboard.objects.count(), 8)
+        self.assertNotEqual(cache_helper.get_dataset_version(), version)
+
+    def test_failed_shard_is_retried_alone(self):
+        fake_client = FakeOpenMeteoClient(flaky_latitudes=[22.0])
+
+        self.run_update(fake_client)
+
+        requested_latitudes = [call["latitude"] for call in fake_client.calls]
+        self.assertEqual(sorted(requested_latitudes), ["20.0,21.0", "22.0,23.0", "22.0,23.0", "24.0,25.0"])
+        self.assertEqual(ForecastData.objects.count(), 6 * FakeOpenMeteoClient.hours)
+        # The rolled back attempt is not archived twice
+        self.assertEqual(ForecastArchiveRun.objects.count(), 1)
+        self.assertEqual(ForecastArchive.objects.count(), 6 * FakeOpenMeteoClient.hours)
+
+    @override_settings(FORECAST_REFRESH_MODE='full')
+    def test_refresh_without_result_backend_fails_before_deleting_data(self):
+        self.run_update(FakeOpenMeteoClient())
+        ForecastRefreshJob.objects.all().delete()
+        cache.clear()
+        job, _ = acquire_refresh_job(self.forecast_url)
+
+        with mock.patch('home.tasks._chords_supported', return_value=False):
+            run_forecast_update.apply((self.forecast_url, job.pk))
+
+        job.refresh_from_db()
+        self.assertEqual(job.state, ForecastRefreshJob.FAILED)
+        self.assertIn("result backend", job.error)
+        self.assertEqual(ForecastData.objects.count(), 6 * FakeOpenMeteoClient.hours)
+        self.assertTrue(acquire_refresh_job(self.forecast_url)[1])
+
+    def test_chords_need_a_result_backend_unless_eager(self):
+        self.assertFalse(_chords_supported(Celery(set_as_current=False)))
+        self.assertTrue(_chords_supported(Celery(set_as_current=False, backend='cache+memory://')))
+        self.assertTrue(_chords_supported(Celery(set_as_current=False, config_source={'task_always_eager': True})))
+
+    def test_failed_chord_dispatch_fails_the_job(self):
+        job, _ = acquire_refresh_job(self.forecast_url)
+
+        with mock.patch('home.tasks.chord', side_effect=ConnectionError("Broker unavailable")):
+            run_forecast_update.apply((self.forecast_url, job.pk))
+
+        job.refresh_from_db()
+        self.assertEqual((job.state, job.error), (ForecastRefreshJob.FAILED, "Broker unavailable"))
+        self.assertTrue(acquire_refresh_job(self.forecast_url)[1])
+
+    def test_refresh_job_reports_progress_and_timings(self):
+        client = APIClient()
+        with mock.patch('home.utils.weather_data_helper.openmeteo_requests.Client',
+                        return_value=FakeOpenMeteoClient(failing_latitudes=[22.0])), \
+                self.assertLogs('home.tasks', level='WARNING') as logs, self.captureOnCommitCallbacks(execute=True):
+            response = client.post('/api/update_forcast_data/', {
+                "forecast_url": "https://api.open-meteo.com/v1/forecast"}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        response = client.get(response.data['status_url'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        job = response.data
+        self.assertEqual(job['state'], 'succeeded')
+        self.assertEqual(job['districts'], {"done": 4, "failed": 2, "total": 6})
+        self.assertEqual(job['rows_written'], 4 * FakeOpenMeteoClient.hours)
+        self.assertEqual(sorted(job['failed_locations']), ["District2", "District3"])
+        self.assertEqual(len(logs.records), 2)
+        self.assertEqual(list(job['durations']), ['prepare', 'fetch', 'parse', 'write', 'statistics', 'cache_warm'])
+        self.assertGreater(job['durations']['write'], 0)
+        self.assertIsNotNone(job['finished_at'])
+
+        self.assertEqual(client.get('/api/forecast_refresh_jobs/999/').status_code, status.HTTP_404_NOT_FOUND)
+
+
+class RefreshDeduplicationTestCase(TestCase):
+    forecast_url = "https://api.open-meteo.com/v1/forecast"
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+
+    def post_refresh(self):
+        return self.client.post('/api/update_forcast_data/', {"forecast_url": self.forecast_url}, format='json')
+
+    @mock.patch('home.views.update_forcast_data.run_forecast_update')
+    def test_duplicate_request_returns_running_job(self, task):
+        first = self.post_refresh()
+        second = self.post_refresh()
+
+        self.assertEqual(task.delay.call_count, 1)
+        self.assertFalse(first.data['deduplicated'])
+        self.assertTrue(second.data['deduplicated'])
+        self.assertEqual(second.data['job_id'], first.data['job_id'])
+        self.assertEqual(ForecastRefreshJob.objects.count(), 1)
+
+    def test_lock_is_honoured_without_database_match(self):
+        job, created = acquire_refresh_job(self.forecast_url)
+        self.assertTrue(created)
+
+        # A job already taken by another request still holds the lock
+        ForecastRefreshJob.objects.filter(pk=job.pk).update(created_at=datetime(2000, 1, 1, tzinfo=timezone.utc))
+        self.assertEqual(acquire_refresh_job(self.forecast_url), (job, False))
+        self.assertTrue(acquire_refresh_job("https://example.com/v1/forecast")[1])
+
+    def test_lock_of_a_deleted_job_is_taken_over(self):
+        job, _ = acquire_refresh_job(self.forecast_url)
+        job.delete()
+
+        new_job, created = acquire_refresh_job(self.forecast_url)
+        self.assertTrue(created)
+        self.assertEqual(acquire_refresh_job(self.forecast_url), (new_job, False))
+
+    @mock.patch('home.views.update_forcast_data.run_forecast_update')
+    def test_refresh_that_cannot_be_queued_is_failed(self, task):
+        task.delay.side_effect = ConnectionError("Broker unavailable")
+        response = self.post_refresh()
+
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        job = ForecastRefreshJob.objects.get(pk=response.data['job_id'])
+        self.assertEqual(job.state, ForecastRefreshJob.FAILED)
+
+        task.delay.side_effect = None
+        response = self.post_refresh()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.data['deduplicated'])
+
+    def test_minimum_interval_after_success(self):
+        job, _ = acquire_refresh_job(self.forecast_url)
+        finish_refresh_job(job.pk, {}, {})
+        self.assertEqual(acquire_refresh_job(self.forecast_url), (job, False))
+
+        with override_settings(FORECAST_REFRESH_MIN_INTERVAL=0):
+            cache.clear()
+            new_job, created = acquire_refresh_job(self.forecast_url)
+        self.assertTrue(created)
+        self.assertNotEqual(new_job.pk, job.pk)
+
+    def test_failed_job_can_be_retried_at_once(self):
+        job, _ = acquire_refresh_job(self.forecast_url)
+        fail_refresh_job(job.pk, "Upstream unavailable")
+
+        new_job, created = acquire_refresh_job(self.forecast_url)
+        self.assertTrue(created)
+        self.assertNotEqual(new_job.pk, job.pk)
+
+
+class WebProcessImportTestCase(SimpleTestCase):
+    def test_url_configuration_does_not_load_fetch_stack(self):
+        # A fresh interpreter, as this test process has already imported everything
+        script = (
+            "import sys, django; django.setup(); import django_api.urls; "
+            "print(','.join(m for m in ('openmeteo_requests', 'requests_cache') if m in sys.modules))"
+        )
+        result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+        self.assertEqual(result.stdout.strip(), '')
@@ -9,5 +9,19 @@ urlpatterns = [
          name='get_average_temperature'),
     path('compare_temperature/', views.CompareTemperature.as_view(),
          name='compare_temperature'),
+    path('compare_temperature/batch/', views.CompareTemperatureBatch.as_view(),
+         name='compare_temperature_batch'),
+    path('nearest_location/', views.NearestLocation.as_view(),
+         name='nearest_location'),
+    path('forecast_refresh_jobs/<int:job_id>/', views.ForecastRefreshJobStatus.as_view(),
+         name='forecast_refresh_job'),
+    path('export_forecast/<str:export_format>/', views.ExportForecast.as_view(),
+         name='export_forecast'),
+    path('http_cache_stats/', views.HttpCacheStats.as_view(),
+         name='http_cache_stats'),
+    path('async/get_average_temperature/', views.AsyncGetLowestAverageTemperatures.as_view(),
+         name='async_get_average_temperature'),
+    path('async/compare_temperature/', views.AsyncCompareTemperature.as_view(),
+         name='async_compare_temperature'),
 
 ]
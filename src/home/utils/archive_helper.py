@@ -0,0 +1,179 @@
+import re
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from home.models import ForecastArchive, ForecastArchiveRun
+from home.utils.bulk_write_helper import ForecastDataWriter
+
+PARTITION_SUFFIX = re.compile(r'_p(\d{8})$')
+
+def _partition_name(run_date):
+    """
+    Builds the table name of the archive partition of a run date.
+
+    Args:
+    - run_date (date): Date of the run.
+
+    Returns:
+    - str: Unquoted partition table name.
+    """
+    return f'{ForecastArchive._meta.db_table}_p{run_date:%Y%m%d}'
+
+
+def ensure_archive_partition(run_date):
+    """
+    Creates the archive partition of a run date on PostgreSQL, if it does not exist.
+
+    Other databases store the archive in a plain table and need no partitions. The
+    DDL is issued for every run rather than remembered per process, as it runs in
+    the refresh transaction and is undone if that transaction rolls back.
+
+    Args:
+    - run_date (date): Date of the run.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    quote_name = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TABLE IF NOT EXISTS {quote_name(_partition_name(run_date))} '
+            f'PARTITION OF {quote_name(ForecastArchive._meta.db_table)} FOR VALUES FROM (%s) TO (%s)',
+            [run_date, run_date + timedelta(days=1)],
+        )
+
+
+def start_archive_run(forecast_url):
+    """
+    Registers a refresh run whose forecast is archived, and prepares its partition.
+
+    Args:
+    - forecast_url (str): URL the forecast is fetched from.
+
+    Returns:
+    - ForecastArchiveRun: The run, or None when FORECAST_ARCHIVE_ENABLED is off.
+    """
+    if not settings.FORECAST_ARCHIVE_ENABLED:
+        return None
+    run = ForecastArchiveRun.objects.create(forecast_url=forecast_url, run_date=timezone.now().date())
+    ensure_archive_partition(run.run_date)
+    return run
+
+
+def drop_expired_archive(retention_days=None):
+    """
+    Removes archived runs older than the retention period.
+
+    On PostgreSQL whole partitions are dropped, which frees their space at once
+    without deleting rows one by one; elsewhere a single DELETE removes them.
+
+    Args:
+    - retention_days (int, optional): Days runs are kept for. Defaults to the
+      FORECAST_ARCHIVE_RETENTION_DAYS setting.
+
+    Returns:
+    - int: Number of runs removed.
+    """
+    if retention_days is None:
+        retention_days = settings.FORECAST_ARCHIVE_RETENTION_DAYS
+    cutoff = timezone.now().date() - timedelta(days=retention_days)
+
+    if connection.vendor == 'postgresql':
+        quote_name = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT child.relname FROM pg_inherits '
+                'JOIN pg_class parent ON pg_inherits.inhparent = parent.oid '
+                'JOIN pg_class child ON pg_inherits.inhrelid = child.oid '
+                'WHERE parent.relname = %s',
+                [ForecastArchive._meta.db_table],
+            )
+            for (partition,) in cursor.fetchall():
+                match = PARTITION_SUFFIX.search(partition)
+                if match and match.group(1) < f'{cutoff:%Y%m%d}':
+                    cursor.execute(f'DROP TABLE {quote_name(partition)}')
+    else:
+        ForecastArchive.objects.filter(run_date__lt=cutoff).delete()
+
+    removed, _ = ForecastArchiveRun.objects.filter(run_date__lt=cutoff).delete()
+    return removed
+
+
+def get_run_forecast(run):
+    """
+    Returns the archived forecast of a run.
+
+    The run date is part of the filter, so only its partition is scanned.
+
+    Args:
+    - run (ForecastArchiveRun): The run.
+
+    Returns:
+    - QuerySet: ForecastArchive rows of the run.
+    """
+    return ForecastArchive.objects.filter(run_date=run.run_date, run=run)
+
+
+def get_location_history(location_name, first_run_date, last_run_date):
+    """
+    Returns what every run between two dates forecast for a location.
+
+    Args:
+    - location_name (str): Name of the location.
+    - first_run_date (date): Date of the first run, inclusive.
+    - last_run_date (date): Date of the last run, inclusive.
+
+    Returns:
+    - QuerySet: ForecastArchive rows, scanning only the partitions of those run dates.
+    """
+    return ForecastArchive.objects.filter(
+        run_date__gte=first_run_date, run_date__lte=last_run_date, location_name=location_name)
+
+
+class ForecastArchiveWriter(ForecastDataWriter):
+    """
+    Buffers the hourly forecast of a run and appends it to the archive in bulk.
+
+    Rows are only ever inserted; a run's rows are removed with its partition.
+
+    Attributes:
+    - run (ForecastArchiveRun): Run the rows are archived under.
+    """
+
+    def __init__(self, run, batch_size=None, variables=None):
+        """
+        Initializes the ForecastArchiveWriter with an empty buffer.
+
+        Args:
+        - run (ForecastArchiveRun): Run the rows are archived under.
+        - batch_size (int, optional): Number of buffered rows that triggers a flush.
+          Defaults to the FORECAST_WRITE_BATCH_SIZE setting.
+        - variables (list, optional): Hourly variables written with every row.
+          Defaults to the FORECAST_HOURLY_VARIABLES setting.
+        """
+        super().__init__(batch_size=batch_size, variables=variables)
+        self.run = run
+
+    def _row_key(self, forecast_meta_data):
+        """
+        Identifies archived rows by location name, as the metadata may later be deleted.
+        """
+        return forecast_meta_data.location_name
+
+    def flush(self):
+        """
+        Appends all buffered rows to the archive.
+        """
+        if not self._rows:
+            return
+        ForecastArchive.objects.bulk_create(
+            [
+                ForecastArchive(run=self.run, run_date=self.run.run_date, location_name=row[0], date=row[1],
+                                **dict(zip(self.variables, row[2:])))
+                for row in self._rows
+            ],
+            batch_size=self.batch_size,
+        )
+        self.rows_written += len(self._rows)
+        self._rows = []
@@ -0,0 +1,237 @@
+import csv
+import io
+from datetime import datetime, timezone as dt_timezone
+
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+from home.models import ForecastData
+
+
+class ForecastDataWriter:
+    """
+    Buffers hourly forecast rows and writes them to the database in bulk.
+
+    Rows are written with a PostgreSQL COPY FROM STDIN when the connection uses
+    psycopg2, and with batched bulk_create on every other backend, so a full
+    refresh issues a handful of statements instead of one INSERT per row.
+
+    In upsert mode rows that already exist for the same (forecast_meta_data, date)
+    are updated in place instead of raising an integrity error.
+
+    Timestamps are given as epoch seconds. Every location of a refresh shares the
+    same forecast window, so each distinct window is converted to datetimes once
+    and reused for every location.
+
+    Every hourly variable is a column of the same row, so storing another
+    variable adds a few bytes per row instead of another row per hour.
+
+    Attributes:
+    - batch_size (int): Number of buffered rows that triggers a flush.
+    - upsert (bool): Whether existing rows are updated on conflict.
+    - variables (list): Hourly variables written with every row.
+    - rows_written (int): Total number of rows written so far.
+    """
+
+    UNIQUE_COLUMNS = ('forecast_meta_data_id', 'date')
+
+    def __init__(self, batch_size=None, upsert=False, variables=None):
+        """
+        Initializes the ForecastDataWriter with an empty buffer.
+
+        Args:
+        - batch_size (int, optional): Number of buffered rows that triggers a flush.
+          Defaults to the FORECAST_WRITE_BATCH_SIZE setting.
+        - upsert (bool, optional): Whether existing rows are updated on conflict.
+        - variables (list, optional): Hourly variables written with every row.
+          Defaults to the FORECAST_HOURLY_VARIABLES setting.
+        """
+        self.batch_size = batch_size or settings.FORECAST_WRITE_BATCH_SIZE
+        self.upsert = upsert
+        self.variables = list(variables or settings.FORECAST_HOURLY_VARIABLES)
+        self.columns = ('forecast_meta_data_id', 'date', *self.variables, 'created_at', 'updated_at')
+        self.update_columns = (*self.variables, 'updated_at')
+        self.rows_written = 0
+        self._rows = []
+        self._dates_by_window = {}
+
+    def add(self, forecast_meta_data, times, values):
+        """
+        Buffers the hourly forecast of a location, flushing when the buffer is full.
+
+        Args:
+        - forecast_meta_data (ForecastMetaData): Forecast metadata instance.
+        - times (numpy.ndarray): Hourly timestamps of the forecast, in epoch seconds.
+        - values (dict): Variable names mapped to hourly values aligned with times.
+          Every variable of the writer must be present.
+        """
+        dates = self.to_datetimes(times)
+        self._rows.extend(zip(
+            [self._row_key(forecast_meta_data)] * len(dates), dates,
+            *(self._column_values(values[variable]) for variable in self.variables)))
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def _row_key(self, forecast_meta_data):
+        """
+        Returns the value identifying the location in each buffered row.
+
+        Args:
+        - forecast_meta_data (ForecastMetaData): Forecast metadata instance.
+
+        Returns:
+        - int: ID of the forecast metadata.
+        """
+        return forecast_meta_data.pk
+
+    def _column_values(self, values):
+        """
+        Converts an array of hourly values to Python floats, with NaN as None.
+
+        Args:
+        - values (numpy.ndarray): Hourly values; Open-Meteo reports missing ones as NaN.
+
+        Returns:
+        - list: Floats or None.
+        """
+        values = np.asarray(values)
+        missing = np.isnan(values)
+        if not missing.any():
+            return values.tolist()
+        return [None if is_missing else value for value, is_missing in zip(values.tolist(), missing.tolist())]
+
+    def to_datetimes(self, times):
+        """
+        Converts epoch seconds to UTC datetimes, once per distinct forecast window.
+
+        Args:
+        - times (numpy.ndarray): Timestamps in epoch seconds.
+
+        Returns:
+        - list: Timezone-aware datetimes, aligned with times.
+        """
+        times = np.asarray(times, dtype=np.int64)
+        key = times.tobytes()
+        dates = self._dates_by_window.get(key)
+        if dates is None:
+            dates = [datetime.fromtimestamp(time, tz=dt_timezone.utc) for time in times.tolist()]
+            self._dates_by_window[key] = dates
+        return dates
+
+    def flush(self):
+        """
+        Writes all buffered rows to the database.
+        """
+        if not self._rows:
+            return
+        if self._supports_copy():
+            if self.upsert:
+                self._copy_upsert_rows(self._rows)
+            else:
+                self._copy_rows(self._rows)
+        else:
+            self._bulk_create_rows(self._rows)
+        self.rows_written += len(self._rows)
+        self._rows = []
+
+    def _supports_copy(self):
+        """
+        Checks whether the default connection can stream rows with COPY.
+
+        Returns:
+        - bool: True for PostgreSQL connections backed by psycopg2.
+        """
+        if connection.vendor != 'postgresql':
+            return False
+        connection.ensure_connection()
+        return connection.connection.__class__.__module__.startswith('psycopg2')
+
+    def _bulk_create_rows(self, rows):
+        """
+        Writes rows with batched multi-row INSERT statements.
+
+        Args:
+        - rows (list): Tuples of (forecast_meta_data_id, date, *variables).
+        """
+        conflict_options = {}
+        if self.upsert:
+            conflict_options = {
+                'update_conflicts': True,
+                'unique_fields': ['forecast_meta_data', 'date'],
+                'update_fields': list(self.update_columns),
+            }
+        ForecastData.objects.bulk_create(
+            [
+                ForecastData(forecast_meta_data_id=row[0], date=row[1], **dict(zip(self.variables, row[2:])))
+                for row in rows
+            ],
+            batch_size=self.batch_size,
+            **conflict_options,
+        )
+
+    def _copy_rows(self, rows, table=None):
+        """
+        Streams rows into a table with a single COPY FROM STDIN statement.
+
+        Args:
+        - rows (list): Tuples of (forecast_meta_data_id, date, *variables).
+        - table (str, optional): Target table. Defaults to the ForecastData table.
+        """
+        now = timezone.now().isoformat()
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in rows:
+            # csv writes None as an empty field, which COPY reads as NULL
+            writer.writerow((*row, now, now))
+        buffer.seek(0)
+
+        sql = 'COPY {} ({}) FROM STDIN WITH (FORMAT csv)'.format(
+            connection.ops.quote_name(table or ForecastData._meta.db_table),
+            self._column_list(self.columns),
+        )
+        with connection.cursor() as cursor:
+            cursor.copy_expert(sql, buffer)
+
+    def _copy_upsert_rows(self, rows):
+        """
+        Upserts rows by copying them into a temporary table and merging from there.
+
+        Rows whose values did not change are left untouched, which keeps write
+        amplification down on refreshes that mostly repeat the last one.
+
+        Args:
+        - rows (list): Tuples of (forecast_meta_data_id, date, *variables).
+        """
+        quote_name = connection.ops.quote_name
+        table = quote_name(ForecastData._meta.db_table)
+        staging_table = 'forecast_data_staging'
+        columns = self._column_list(self.columns)
+        updates = ', '.join(
+            f'{quote_name(column)} = EXCLUDED.{quote_name(column)}' for column in self.update_columns)
+        current_values = ', '.join(f'{table}.{quote_name(variable)}' for variable in self.variables)
+        new_values = ', '.join(f'EXCLUDED.{quote_name(variable)}' for variable in self.variables)
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'CREATE TEMPORARY TABLE {staging_table} AS SELECT {columns} FROM {table} WITH NO DATA')
+        self._copy_rows(rows, table=staging_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging_table} '
+                f'ON CONFLICT ({self._column_list(self.UNIQUE_COLUMNS)}) DO UPDATE SET {updates} '
+                f'WHERE ROW({current_values}) IS DISTINCT FROM ROW({new_values})'
+            )
+            cursor.execute(f'DROP TABLE {staging_table}')
+
+    def _column_list(self, columns):
+        """
+        Quotes and joins column names for use in raw SQL.
+
+        Args:
+        - columns (tuple): Column names.
+
+        Returns:
+        - str: Comma-separated quoted column names.
+        """
+        return ', '.join(connection.ops.quote_name(column) for column in columns)
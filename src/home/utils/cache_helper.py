@@ -0,0 +1,267 @@
+import math
+import random
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from home.models import ForecastDatasetVersion
+
+DATASET_VERSION_KEY = 'forecast_dataset_version'
+
+
+def get_dataset_version():
+    """
+    Returns the version stamp of the forecast dataset currently in the database.
+
+    The stamp is stored in the ForecastDatasetVersion row, so every process reads
+    the same value even when they do not share a cache. Processes keep a cached
+    copy for FORECAST_DATASET_VERSION_TIMEOUT seconds, which bounds how long a
+    process without a shared cache may serve data older than a new publish.
+    The row is created by a migration; get_or_create() only covers a database
+    where it was removed since.
+
+    Returns:
+    - int: Dataset version stamp.
+    """
+    version = cache.get(DATASET_VERSION_KEY)
+    if version is None:
+        version, _ = ForecastDatasetVersion.objects.get_or_create(pk=1, defaults={'version': time.time_ns()})
+        version = version.version
+        cache.set(DATASET_VERSION_KEY, version, settings.FORECAST_DATASET_VERSION_TIMEOUT)
+    return version
+
+
+async def aget_dataset_version():
+    """
+    Async version of get_dataset_version(), for async views.
+
+    Returns:
+    - int: Dataset version stamp.
+    """
+    version = await cache.aget(DATASET_VERSION_KEY)
+    if version is None:
+        version, _ = await ForecastDatasetVersion.objects.aget_or_create(pk=1, defaults={'version': time.time_ns()})
+        version = version.version
+        await cache.aset(DATASET_VERSION_KEY, version, settings.FORECAST_DATASET_VERSION_TIMEOUT)
+    return version
+
+
+def publish_dataset_version():
+    """
+    Publishes a new dataset version stamp after the forecast data changed.
+
+    Returns:
+    - int: The new dataset version stamp.
+    """
+    version = time.time_ns()
+    ForecastDatasetVersion.objects.update_or_create(pk=1, defaults={'version': version})
+    cache.set(DATASET_VERSION_KEY, version, settings.FORECAST_DATASET_VERSION_TIMEOUT)
+    return version
+
+
+def versioned_key(name):
+    """
+    Builds a cache key bound to the current dataset version.
+
+    Publishing a new dataset version makes every versioned key miss at once, on
+    every process sharing the cache, without flushing unrelated entries. Stale
+    entries simply expire with their timeout.
+
+    Args:
+    - name (str): Cache key name.
+
+    Returns:
+    - str: Cache key including the dataset version.
+    """
+    return f"{name}:v{get_dataset_version()}"
+
+
+async def aversioned_key(name):
+    """
+    Async version of versioned_key(), for async views.
+
+    Args:
+    - name (str): Cache key name.
+
+    Returns:
+    - str: Cache key including the dataset version.
+    """
+    return f"{name}:v{await aget_dataset_version()}"
+
+
+def increment_counter(name):
+    """
+    Atomically increments a counter shared by every process using the cache.
+
+    Args:
+    - name (str): Cache key of the counter.
+
+    Returns:
+    - int: The new counter value.
+    """
+    try:
+        return cache.incr(name)
+    except ValueError:
+        # The counter does not exist yet; add() keeps a concurrent creator's count
+        cache.add(name, 0, timeout=None)
+        return cache.incr(name)
+
+
+async def aincrement_counter(name):
+    """
+    Async version of increment_counter(), for async views.
+
+    Args:
+    - name (str): Cache key of the counter.
+
+    Returns:
+    - int: The new counter value.
+    """
+    try:
+        return await cache.aincr(name)
+    except ValueError:
+        await cache.aadd(name, 0, timeout=None)
+        return await cache.aincr(name)
+
+
+def get_counters(*names):
+    """
+    Returns the current values of cache counters.
+
+    Args:
+    - names (str): Cache keys of the counters.
+
+    Returns:
+    - dict: Counter names mapped to their values, 0 for counters never incremented.
+    """
+    values = cache.get_many(names)
+    return {name: int(values.get(name, 0)) for name in names}
+
+
+def get_or_compute(key, compute, timeout, stale_timeout=None, lock_timeout=30, beta=1.0,
+                   poll_interval=0.05):
+    """
+    Returns a cached value, recomputing it at most once at a time across processes.
+
+    Entries are stored with the time the computation took. Each read may decide to
+    refresh early, with a probability that rises as the entry nears its expiry
+    (probabilistic early expiration), so recomputation is spread out instead of
+    happening on every node at the TTL boundary. Only the caller that wins the
+    recompute lock runs compute(); the others keep serving the stale value while
+    it is being refreshed, or wait for the winner when there is nothing to serve.
+
+    Args:
+    - key (str): Cache key.
+    - compute (callable): Function returning the value to cache.
+    - timeout (int): Seconds a computed value is considered fresh.
+    - stale_timeout (int, optional): Extra seconds a stale value may still be served
+      while it is being recomputed. Defaults to timeout.
+    - lock_timeout (int, optional): Seconds after which an abandoned recompute lock expires.
+    - beta (float, optional): Early refresh aggressiveness; 0 disables early refresh.
+    - poll_interval (float, optional): Seconds between checks while waiting for another
+      caller to compute a missing value.
+
+    Returns:
+    - tuple: (value, from_cache) where from_cache is False when this call computed the value.
+    """
+    stale_timeout = timeout if stale_timeout is None else stale_timeout
+    lock_key = f"{key}:lock"
+
+    entry = cache.get(key)
+    if entry is not None and not _should_refresh(entry, beta):
+        return entry['value'], True
+
+    if cache.add(lock_key, True, lock_timeout):
+        try:
+            return _compute_and_set(key, compute, timeout, stale_timeout), False
+        finally:
+            cache.delete(lock_key)
+
+    if entry is not None:
+        # Someone else is refreshing; serve the stale value meanwhile
+        return entry['value'], True
+
+    deadline = time.monotonic() + lock_timeout
+    while time.monotonic() < deadline:
+        time.sleep(poll_interval)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry['value'], True
+        if cache.add(lock_key, True, lock_timeout):
+            try:
+                return _compute_and_set(key, compute, timeout, stale_timeout), False
+            finally:
+                cache.delete(lock_key)
+    return _compute_and_set(key, compute, timeout, stale_timeout), False
+
+
+async def aget_computed(key, beta=1.0):
+    """
+    Async read of a value cached by get_or_compute(), for async views.
+
+    Args:
+    - key (str): Cache key.
+    - beta (float, optional): Early refresh aggressiveness, as in get_or_compute().
+
+    Returns:
+    - The cached value, or None when it is missing or due for refresh; callers then
+      go through get_or_compute(), which refreshes it once across processes.
+    """
+    entry = await cache.aget(key)
+    if entry is None or _should_refresh(entry, beta):
+        return None
+    return entry['value']
+
+
+def set_many_computed(values, timeout, stale_timeout=None):
+    """
+    Caches precomputed values in the format get_or_compute() reads.
+
+    Args:
+    - values (dict): Cache keys mapped to values.
+    - timeout (int): Seconds the values are considered fresh.
+    - stale_timeout (int, optional): Extra seconds a stale value may still be served
+      while it is being recomputed. Defaults to timeout.
+    """
+    stale_timeout = timeout if stale_timeout is None else stale_timeout
+    expires = time.time() + timeout
+    cache.set_many({
+        key: {'value': value, 'delta': 0.0, 'expires': expires}
+        for key, value in values.items()
+    }, timeout + stale_timeout)
+
+
+def _should_refresh(entry, beta):
+    """
+    Decides whether a cached entry should be recomputed now.
+
+    Args:
+    - entry (dict): Cached entry with value, delta and expires keys.
+    - beta (float): Early refresh aggressiveness.
+
+    Returns:
+    - bool: True when the entry is expired or chosen for early refresh.
+    """
+    # 1 - random() lies in (0, 1], which keeps the logarithm finite
+    early = -entry['delta'] * beta * math.log(1.0 - random.random())
+    return time.time() + early >= entry['expires']
+
+
+def _compute_and_set(key, compute, timeout, stale_timeout):
+    """
+    Computes a value and caches it together with its computation time.
+
+    Args:
+    - key (str): Cache key.
+    - compute (callable): Function returning the value to cache.
+    - timeout (int): Seconds the value is considered fresh.
+    - stale_timeout (int): Extra seconds the value may be served while stale.
+
+    Returns:
+    - The computed value.
+    """
+    start = time.time()
+    value = compute()
+    now = time.time()
+    cache.set(key, {'value': value, 'delta': now - start, 'expires': now + timeout}, timeout + stale_timeout)
+    return value
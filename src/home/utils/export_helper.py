@@ -0,0 +1,209 @@
+import csv
+import importlib.util
+import io
+import json
+from datetime import datetime, timezone as dt_timezone
+from itertools import islice
+
+import numpy as np
+from django.conf import settings
+from home.models import ForecastData, ForecastSeries
+from home.utils.series_helper import SERIES, get_storage_mode, series_times, unpack_series
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+ARROW = 'arrow'
+EXPORT_FORMATS = (NDJSON, CSV, ARROW)
+CONTENT_TYPES = {
+    NDJSON: 'application/x-ndjson',
+    CSV: 'text/csv',
+    ARROW: 'application/vnd.apache.arrow.stream',
+}
+
+
+def arrow_available():
+    """
+    Checks whether the optional pyarrow package, needed for Arrow exports, is installed.
+
+    Returns:
+    - bool: True if pyarrow can be imported.
+    """
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def iter_forecast_rows(forecast_meta_data_ids, variables, start=None, end=None, chunk_size=None):
+    """
+    Yields the hourly forecast of locations, ordered by location and date.
+
+    Rows are read with a server-side cursor (QuerySet.iterator()) and yielded
+    one at a time, so memory use does not grow with the size of the export.
+
+    Args:
+    - forecast_meta_data_ids (list): IDs of the forecast metadata to export, or None for all locations.
+    - variables (list): Hourly variables of every row.
+    - start (datetime, optional): First moment exported, inclusive.
+    - end (datetime, optional): Last moment exported, exclusive.
+    - chunk_size (int, optional): Rows fetched from the database at a time. Defaults
+      to the FORECAST_EXPORT_CHUNK_SIZE setting.
+
+    Yields:
+    - tuple: (location_name, date, *values) with None for missing values.
+    """
+    chunk_size = chunk_size or settings.FORECAST_EXPORT_CHUNK_SIZE
+    if get_storage_mode() == SERIES:
+        yield from _iter_series_rows(forecast_meta_data_ids, variables, start, end, chunk_size)
+        return
+
+    queryset = ForecastData.objects.exclude(date=None).exclude(forecast_meta_data=None)
+    if forecast_meta_data_ids is not None:
+        queryset = queryset.filter(forecast_meta_data_id__in=forecast_meta_data_ids)
+    if start is not None:
+        queryset = queryset.filter(date__gte=start)
+    if end is not None:
+        queryset = queryset.filter(date__lt=end)
+    rows = (
+        queryset.order_by('forecast_meta_data_id', 'date')
+        .values_list('forecast_meta_data__location_name', 'date', *variables)
+        .iterator(chunk_size=chunk_size)
+    )
+    # PostgreSQL keeps NaN in float columns, which JSON cannot represent
+    for location_name, date, *values in rows:
+        yield (location_name, date, *_nan_to_none(values))
+
+
+def _iter_series_rows(forecast_meta_data_ids, variables, start, end, chunk_size):
+    """
+    Yields the hourly forecast of locations from packed series, ordered by location and date.
+
+    Args:
+    - forecast_meta_data_ids (list): IDs of the forecast metadata to export, or None for all locations.
+    - variables (list): Hourly variables of every row.
+    - start (datetime): First moment exported, inclusive, or None.
+    - end (datetime): Last moment exported, exclusive, or None.
+    - chunk_size (int): Hourly values fetched from the database at a time.
+
+    Yields:
+    - tuple: (location_name, date, *values) with None for missing values.
+    """
+    queryset = ForecastSeries.objects.all()
+    if forecast_meta_data_ids is not None:
+        queryset = queryset.filter(forecast_meta_data_id__in=forecast_meta_data_ids)
+    rows = (
+        queryset.order_by('forecast_meta_data_id')
+        .values_list('forecast_meta_data__location_name', 'start', 'interval', 'variables', 'values')
+        # A series holds a week of hours, so fetch fewer of them at a time
+        .iterator(chunk_size=max(1, chunk_size // (7 * 24)))
+    )
+    for location_name, series_start, interval, stored_variables, values in rows:
+        matrix = unpack_series(values, len(stored_variables))
+        times = series_times(series_start, interval, matrix.shape[1])
+        window = np.ones(len(times), dtype=bool)
+        if start is not None:
+            window &= times >= int(start.timestamp())
+        if end is not None:
+            window &= times < int(end.timestamp())
+        columns = [
+            _nan_to_none(matrix[stored_variables.index(variable)][window].tolist())
+            if variable in stored_variables else [None] * int(window.sum())
+            for variable in variables
+        ]
+        for time, *hour_values in zip(times[window].tolist(), *columns):
+            yield (location_name, datetime.fromtimestamp(time, tz=dt_timezone.utc), *hour_values)
+
+
+def _nan_to_none(values):
+    return [None if value != value else value for value in values]
+
+
+def _batched(rows, batch_size):
+    rows = iter(rows)
+    while batch := list(islice(rows, batch_size)):
+        yield batch
+
+
+def render_ndjson(rows, variables, batch_size=None):
+    """
+    Renders forecast rows as newline-delimited JSON, one object per row.
+
+    Args:
+    - rows (iterable): Rows yielded by iter_forecast_rows().
+    - variables (list): Hourly variables of every row.
+    - batch_size (int, optional): Rows rendered per yielded chunk. Defaults to the
+      FORECAST_EXPORT_CHUNK_SIZE setting.
+
+    Yields:
+    - bytes: Chunks of the NDJSON body.
+    """
+    columns = ['location_name', 'date', *variables]
+    for batch in _batched(rows, batch_size or settings.FORECAST_EXPORT_CHUNK_SIZE):
+        yield ''.join(
+            json.dumps(dict(zip(columns, (location_name, date.isoformat(), *values)))) + '\n'
+            for location_name, date, *values in batch
+        ).encode()
+
+
+def render_csv(rows, variables, batch_size=None):
+    """
+    Renders forecast rows as CSV with a header line; missing values are empty.
+
+    Args:
+    - rows (iterable): Rows yielded by iter_forecast_rows().
+    - variables (list): Hourly variables of every row.
+    - batch_size (int, optional): Rows rendered per yielded chunk. Defaults to the
+      FORECAST_EXPORT_CHUNK_SIZE setting.
+
+    Yields:
+    - bytes: Chunks of the CSV body.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(['location_name', 'date', *variables])
+    for batch in _batched(rows, batch_size or settings.FORECAST_EXPORT_CHUNK_SIZE):
+        writer.writerows((location_name, date.isoformat(), *values) for location_name, date, *values in batch)
+        yield _drain(buffer).encode()
+    yield _drain(buffer).encode()
+
+
+def render_arrow(rows, variables, batch_size=None):
+    """
+    Renders forecast rows as an Arrow IPC stream, one record batch per chunk.
+
+    Requires the optional pyarrow package, which is only imported here; check
+    arrow_available() before starting a response.
+
+    Args:
+    - rows (iterable): Rows yielded by iter_forecast_rows().
+    - variables (list): Hourly variables of every row.
+    - batch_size (int, optional): Rows per record batch. Defaults to the
+      FORECAST_EXPORT_CHUNK_SIZE setting.
+
+    Yields:
+    - bytes: Chunks of the Arrow IPC stream.
+    """
+    import pyarrow as pa
+
+    schema = pa.schema([
+        ('location_name', pa.string()),
+        ('date', pa.timestamp('s', tz='UTC')),
+        *[(variable, pa.float64()) for variable in variables],
+    ])
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, schema) as writer:
+        for batch in _batched(rows, batch_size or settings.FORECAST_EXPORT_CHUNK_SIZE):
+            columns = [pa.array(column, type=field.type) for column, field in zip(zip(*batch), schema)]
+            writer.write_batch(pa.record_batch(columns, schema=schema))
+            yield _drain(sink)
+    yield _drain(sink)
+
+
+def _drain(buffer):
+    """
+    Returns the contents of an in-memory buffer and empties it.
+    """
+    value = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return value
+
+
+RENDERERS = {NDJSON: render_ndjson, CSV: render_csv, ARROW: render_arrow}
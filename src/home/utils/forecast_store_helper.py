@@ -0,0 +1,315 @@
+import threading
+from datetime import datetime, time, timedelta
+
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from home.models import ForecastData, ForecastMetaData, ForecastSeries
+from home.utils.cache_helper import aget_dataset_version, get_dataset_version
+from home.utils.series_helper import SERIES, get_storage_mode, unpack_series
+
+
+def forecast_store_enabled():
+    """
+    Checks whether forecasts are read from the in-memory store.
+
+    Series storage has no hourly rows to query, so it is always read through the store.
+
+    Returns:
+    - bool: True when FORECAST_STORE_ENABLED is set or the storage mode is 'series'.
+    """
+    return settings.FORECAST_STORE_ENABLED or get_storage_mode() == SERIES
+
+
+def normalize_location_name(location_name):
+    """
+    Normalizes a location name for case-insensitive matching.
+
+    Args:
+    - location_name (str): Name of the location.
+
+    Returns:
+    - str: Stripped and case-folded name, or None if the name is not a string.
+    """
+    if not isinstance(location_name, str):
+        return None
+    return location_name.strip().casefold()
+
+
+class ForecastSnapshot:
+    """
+    Immutable, NumPy-backed copy of the forecast dataset.
+
+    Hourly temperatures are kept in one C-contiguous float32 matrix with a row
+    per location, sharing a single regular time axis, so a point lookup is a
+    dictionary hit plus integer arithmetic. Hours missing for a location are NaN.
+
+    Attributes:
+    - version (int): Dataset version stamp the snapshot was loaded for.
+    - location_index (dict): Location names mapped to their row in temperatures.
+    - start (int): Epoch seconds of the first column of temperatures.
+    - interval (int): Seconds between two columns of temperatures.
+    - temperatures (numpy.ndarray): float32 array of shape (locations, hours).
+    """
+
+    def __init__(self, version, location_index, start, interval, temperatures):
+        self.version = version
+        self.location_index = location_index
+        self.start = start
+        self.interval = interval
+        self.temperatures = temperatures
+        self._names_by_normalized_name = {
+            normalize_location_name(location_name): location_name for location_name in location_index
+        }
+
+    def resolve_location(self, location_name):
+        """
+        Finds the stored name of a location, ignoring case and surrounding whitespace.
+
+        Args:
+        - location_name (str): Name of the location as requested.
+
+        Returns:
+        - str: Name of the location in the snapshot, or None if it does not exist.
+        """
+        return self._names_by_normalized_name.get(normalize_location_name(location_name))
+
+    def has_location(self, location_name):
+        """
+        Checks whether the snapshot holds a forecast for a location.
+
+        Args:
+        - location_name (str): Name of the location.
+
+        Returns:
+        - bool: True if the location exists.
+        """
+        return location_name in self.location_index
+
+    def temperature_at(self, location_name, moment):
+        """
+        Returns the forecast temperature of a location at a given moment.
+
+        Args:
+        - location_name (str): Name of the location.
+        - moment (datetime): Timezone-aware moment on the hourly grid.
+
+        Returns:
+        - float: Temperature in °C, or None when there is no forecast for that moment.
+        """
+        row = self.location_index.get(location_name)
+        offset = int(moment.timestamp()) - self.start
+        if row is None or self.interval == 0 or offset < 0 or offset % self.interval:
+            return None
+        column = offset // self.interval
+        if column >= self.temperatures.shape[1]:
+            return None
+        temperature = self.temperatures[row, column]
+        return None if np.isnan(temperature) else float(temperature)
+
+    def daily_aggregates(self, location_names, first_day, last_day, hours, aggregation, tzinfo):
+        """
+        Aggregates the temperatures of locations per local day over a range of hours.
+
+        The columns of the window are grouped into contiguous days and reduced for
+        all locations at once with ufunc.reduceat, ignoring missing hours.
+
+        Args:
+        - location_names (list): Names of locations held by the snapshot.
+        - first_day (date): First local day of the window.
+        - last_day (date): Last local day of the window, inclusive.
+        - hours (tuple): Local (start, end) hours to aggregate, end exclusive.
+        - aggregation (str): 'mean', 'max' or 'min'.
+        - tzinfo (tzinfo): Time zone the days and hours are expressed in.
+
+        Returns:
+        - dict: (location_name, date) tuples mapped to aggregated temperatures, for
+          the days on which the location has at least one forecast hour.
+        """
+        if self.interval == 0:
+            return {}
+        window_start = int(datetime.combine(first_day, time(), tzinfo).timestamp())
+        window_end = int(datetime.combine(last_day + timedelta(days=1), time(), tzinfo).timestamp())
+        first_column = max(0, -(-(window_start - self.start) // self.interval))
+        last_column = min(self.temperatures.shape[1], -(-(window_end - self.start) // self.interval))
+
+        moments = [
+            datetime.fromtimestamp(self.start + column * self.interval, tzinfo)
+            for column in range(first_column, last_column)
+        ]
+        columns = np.array([
+            column for column, moment in zip(range(first_column, last_column), moments)
+            if hours[0] <= moment.hour < hours[1]
+        ], dtype=np.int64)
+        if not len(columns):
+            return {}
+        days = [moments[column - first_column].date() for column in columns]
+
+        rows = [self.location_index[name] for name in location_names]
+        block = self.temperatures[np.ix_(rows, columns)].astype(np.float64)
+        valid = ~np.isnan(block)
+        # Days are contiguous on the time axis, so each one is a segment starting at these columns
+        starts = np.flatnonzero([index == 0 or days[index] != days[index - 1] for index in range(len(days))])
+
+        counts = np.add.reduceat(valid, starts, axis=1)
+        if aggregation == 'mean':
+            sums = np.add.reduceat(np.where(valid, block, 0.0), starts, axis=1)
+            values = np.divide(sums, counts, out=np.full(sums.shape, np.nan), where=counts > 0)
+        elif aggregation == 'max':
+            values = np.maximum.reduceat(np.where(valid, block, -np.inf), starts, axis=1)
+        else:
+            values = np.minimum.reduceat(np.where(valid, block, np.inf), starts, axis=1)
+
+        return {
+            (name, days[start]): float(values[row, segment])
+            for row, name in enumerate(location_names)
+            for segment, start in enumerate(starts)
+            if counts[row, segment]
+        }
+
+
+class ForecastStore:
+    """
+    Singleton class holding the process-local forecast snapshot.
+
+    The snapshot is loaded from the database on first use and reloaded whenever
+    the dataset version stamp published by run_forecast_update changes, so read
+    endpoints can serve forecasts without touching the database.
+    """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, '_initialized'):
+            self._initialized = True
+            self._lock = threading.Lock()
+            self._snapshot = None
+
+    def get_snapshot(self):
+        """
+        Returns the snapshot for the current dataset version, reloading it if needed.
+
+        Returns:
+        - ForecastSnapshot: Snapshot of the forecast dataset.
+        """
+        return self._get_snapshot(get_dataset_version())
+
+    async def aget_snapshot(self):
+        """
+        Async version of get_snapshot(), for async views.
+
+        The dataset version is read with the async cache API and the current
+        snapshot is returned as is; only a reload runs the loader in a worker thread.
+
+        Returns:
+        - ForecastSnapshot: Snapshot of the forecast dataset.
+        """
+        version = await aget_dataset_version()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        return await sync_to_async(self._get_snapshot)(version)
+
+    def _get_snapshot(self, version):
+        """
+        Returns the snapshot of a dataset version, reloading it if needed.
+
+        Args:
+        - version (int): Current dataset version stamp.
+
+        Returns:
+        - ForecastSnapshot: Snapshot of the forecast dataset.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        with self._lock:
+            # Another thread may have loaded this version while we waited for the lock
+            if self._snapshot is None or self._snapshot.version != version:
+                self._snapshot = self._load(version)
+            return self._snapshot
+
+    def _load(self, version):
+        """
+        Loads the forecast dataset from the database into NumPy arrays.
+
+        Args:
+        - version (int): Dataset version stamp being loaded.
+
+        Returns:
+        - ForecastSnapshot: The loaded snapshot.
+        """
+        # A refresh committing between the metadata and the data query can leave rows of
+        # metadata the first query did not see; read both again once, then skip such rows
+        for attempt in range(2):
+            meta_data = list(ForecastMetaData.objects.values_list('pk', 'location_name'))
+            location_index = {location_name: row for row, (_, location_name) in enumerate(meta_data)}
+            rows_by_id = {pk: row for row, (pk, _) in enumerate(meta_data)}
+            if get_storage_mode() == SERIES:
+                return self._load_series(version, location_index, rows_by_id)
+
+            points = list(
+                ForecastData.objects.exclude(date=None).exclude(temperature_2m=None)
+                .values_list('forecast_meta_data_id', 'date', 'temperature_2m')
+            )
+            if all(point[0] in rows_by_id for point in points):
+                break
+        points = [point for point in points if point[0] in rows_by_id]
+        if not points:
+            temperatures = np.empty((len(location_index), 0), dtype=np.float32)
+            return ForecastSnapshot(version, location_index, 0, 0, temperatures)
+
+        forecast_meta_data_ids, dates, values = zip(*points)
+        rows = np.fromiter((rows_by_id[pk] for pk in forecast_meta_data_ids), dtype=np.int64, count=len(points))
+        epochs = np.fromiter((date.timestamp() for date in dates), dtype=np.int64, count=len(points))
+
+        start = int(epochs.min())
+        steps = np.diff(np.unique(epochs))
+        interval = int(steps.min()) if len(steps) else 3600
+        columns = (epochs - start) // interval
+
+        temperatures = np.full((len(location_index), int(columns.max()) + 1), np.nan, dtype=np.float32)
+        temperatures[rows, columns] = np.asarray(values, dtype=np.float32)
+        return ForecastSnapshot(version, location_index, start, interval, temperatures)
+
+    def _load_series(self, version, location_index, rows_by_id):
+        """
+        Loads the packed forecast series into NumPy arrays, one row fetch per location.
+
+        Args:
+        - version (int): Dataset version stamp being loaded.
+        - location_index (dict): Location names mapped to their row in the snapshot.
+        - rows_by_id (dict): Forecast metadata IDs mapped to their row in the snapshot.
+
+        Returns:
+        - ForecastSnapshot: The loaded snapshot.
+        """
+        series = []
+        for forecast_meta_data_id, start, interval, variables, values in ForecastSeries.objects.values_list(
+                'forecast_meta_data_id', 'start', 'interval', 'variables', 'values'):
+            if forecast_meta_data_id in rows_by_id and 'temperature_2m' in variables:
+                temperatures = unpack_series(values, len(variables))[variables.index('temperature_2m')]
+                series.append((rows_by_id[forecast_meta_data_id], start, interval, temperatures))
+        series = [entry for entry in series if len(entry[3])]
+        if not series:
+            temperatures = np.empty((len(location_index), 0), dtype=np.float32)
+            return ForecastSnapshot(version, location_index, 0, 0, temperatures)
+
+        start = min(entry[1] for entry in series)
+        interval = min(entry[2] for entry in series)
+        end = max(entry[1] + entry[2] * len(entry[3]) for entry in series)
+        temperatures = np.full((len(location_index), -(-(end - start) // interval)), np.nan, dtype=np.float32)
+        for row, series_start, series_interval, values in series:
+            if series_interval == interval and (series_start - start) % interval == 0:
+                column = (series_start - start) // interval
+                temperatures[row, column:column + len(values)] = values
+            else:
+                columns = (series_start + series_interval * np.arange(len(values)) - start) // interval
+                temperatures[row, columns] = values
+        return ForecastSnapshot(version, location_index, start, interval, temperatures)
@@ -1,10 +1,18 @@
-import requests_cache
-from retry_requests import retry
-from home.utils.weather_data_helper import OpenMeteoApiClient, WeatherDataFactory
-from home.models import ForecastData, ForecastMetaData
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone as dt_timezone
+from home.utils.archive_helper import ForecastArchiveWriter, drop_expired_archive, start_archive_run
+from home.utils.bulk_write_helper import ForecastDataWriter
+from home.utils.cache_helper import publish_dataset_version
+from home.utils.http_cache_helper import prune_http_cache
+from home.utils.leaderboard_helper import build_leaderboards, compute_location_statistics, warm_leaderboard_cache
+from home.utils.series_helper import ROWS, ForecastSeriesWriter, get_storage_mode
+from home.utils.timing_helper import PhaseTimer
+from home.utils.weather_data_helper import OpenMeteoApiClient, WeatherDataFactory, build_session
+from home.models import ForecastArchiveRun, ForecastData, ForecastMetaData
 
-from datetime import datetime
-from django.core.cache import cache
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
 
 
 class ForecastUpdateCommand:
@@ -16,28 +24,109 @@ class ForecastUpdateCommand:
     Attributes:
     - districts_data (list): List of district data.
     - forecast_url (str): URL to fetch forecast data.
+    - batch_size (int): Number of districts fetched per API request.
+    - concurrency (int): Number of API requests allowed in flight at once.
+    - refresh_mode (str): Either 'incremental' or 'full'.
+    - storage_mode (str): 'rows' or 'series', see the FORECAST_STORAGE_MODE setting.
+    - archive_run_id (int): ID of the ForecastArchiveRun the fetched forecast is
+      appended to, or None when it is not archived.
+    - failed_locations (dict): Location names mapped to the error that prevented their update.
+    - rows_written (int): Number of forecast rows (hourly rows or series) written by the last execution.
+    - timer (PhaseTimer): Time spent in the prepare, fetch, parse, write, statistics
+      and cache_warm phases.
     """
 
-    def __init__(self, districts_data, forecast_url):
+    INCREMENTAL = 'incremental'
+    FULL = 'full'
+
+    def __init__(self, districts_data, forecast_url, batch_size=None, concurrency=None,
+                 refresh_mode=None, archive_run_id=None):
         """
         Initializes the ForecastUpdateCommand with districts_data and forecast_url.
 
         Args:
         - districts_data (list): List of district data.
         - forecast_url (str): URL to fetch forecast data.
+        - batch_size (int, optional): Number of districts fetched per API request.
+          Defaults to the FORECAST_FETCH_BATCH_SIZE setting.
+        - concurrency (int, optional): Number of API requests allowed in flight at once.
+          Defaults to the FORECAST_FETCH_CONCURRENCY setting.
+        - refresh_mode (str, optional): 'incremental' upserts the new forecast in place
+          and prunes rows outside the new window, 'full' deletes all forecast data
+          before reloading it. Defaults to the FORECAST_REFRESH_MODE setting.
+        - archive_run_id (int, optional): ID of the ForecastArchiveRun to append the
+          forecast to. prepare() starts a run when it is not given.
         """
         self.districts_data = districts_data
         self.forecast_url = forecast_url
+        self.batch_size = batch_size or settings.FORECAST_FETCH_BATCH_SIZE
+        self.concurrency = concurrency or settings.FORECAST_FETCH_CONCURRENCY
+        self.refresh_mode = refresh_mode or settings.FORECAST_REFRESH_MODE
+        if self.refresh_mode not in (self.INCREMENTAL, self.FULL):
+            raise ValueError(f"Unknown forecast refresh mode: {self.refresh_mode}")
+        self.storage_mode = get_storage_mode()
+        self.archive_run_id = archive_run_id
+        self.failed_locations = {}
+        self.rows_written = 0
+        self.timer = PhaseTimer()
 
     def execute(self):
         """
         Executes the forecast update command.
 
-        This method fetches weather data for each district,
-        saves it to the database, and clears the cache.
+        This method fetches weather data for each district, saves it to the
+        database, recomputes per-location statistics and leaderboards, and
+        publishes a new dataset version once the data is committed, which
+        invalidates every versioned cache entry.
+
+        In incremental mode existing rows stay readable for the whole refresh and
+        metadata IDs are kept; in full mode all forecast data is deleted first.
+        """
+        forecast_meta_data_list = self.prepare()
+        self.refresh(forecast_meta_data_list)
+        self.finalize()
+
+    def prepare(self):
+        """
+        Removes stale forecast data and makes sure every district has forecast metadata.
+
+        An archive run is started as well when FORECAST_ARCHIVE_ENABLED is on.
+
+        Returns:
+        - list: Forecast metadata instances, in the same order as districts_data.
         """
-        self._delete_existing_forecast_data()
-        self._fetch_and_save_weather_data()
+        with self.timer.measure('prepare'):
+            if self.refresh_mode == self.FULL:
+                self._delete_existing_forecast_data()
+            else:
+                self._delete_removed_locations()
+            if self.archive_run_id is None:
+                archive_run = start_archive_run(self.forecast_url)
+                self.archive_run_id = archive_run.pk if archive_run else None
+            return self._get_or_create_forecast_meta_data_list()
+
+    def refresh(self, forecast_meta_data_list):
+        """
+        Fetches and saves the forecast of a set of locations.
+
+        Locations are independent of each other, so the metadata returned by
+        prepare() can be split into shards refreshed by separate workers.
+
+        Args:
+        - forecast_meta_data_list (list): Forecast metadata instances to refresh.
+        """
+        self._fetch_and_save_weather_data(forecast_meta_data_list)
+
+    def finalize(self):
+        """
+        Recomputes statistics and leaderboards, drops archived runs past their
+        retention, and publishes a new dataset version once the surrounding
+        transaction commits.
+        """
+        leaderboards = self._update_statistics()
+        with self.timer.measure('write'):
+            drop_expired_archive()
+        transaction.on_commit(lambda: self._publish(leaderboards))
 
     def _delete_existing_forecast_data(self):
         """
@@ -45,67 +134,204 @@ class ForecastUpdateCommand:
         """
         ForecastData.objects.all().delete()
         ForecastMetaData.objects.all().delete()
-        cache.clear()
 
-    def _fetch_and_save_weather_data(self):
+    def _delete_removed_locations(self):
         """
-        Fetches weather data for each district and saves it to the database.
+        Deletes forecast data of locations that are no longer in the districts data.
         """
-        for district_data in self.districts_data:
-            forecast_meta_data = self._get_or_create_forecast_meta_data(district_data)
-            self._save_weather_data(forecast_meta_data)
+        location_names = [district_data['name'] for district_data in self.districts_data]
+        ForecastMetaData.objects.exclude(location_name__in=location_names).delete()
+
+    def _fetch_and_save_weather_data(self, forecast_meta_data_list):
+        """
+        Fetches weather data for each location and saves it to the database.
+
+        Districts are fetched in batches, one API request per batch_size districts.
+        Up to concurrency batches are fetched at once on a thread pool, while the
+        results are saved by the calling thread as soon as each batch completes,
+        so database access stays on a single connection. Hourly rows are buffered
+        and written in bulk. All requests share one session whose connection pool
+        holds a connection per worker thread.
+
+        Args:
+        - forecast_meta_data_list (list): Forecast metadata instances to refresh.
+        """
+        with build_session(pool_size=self.concurrency) as session:
+            self._fetch_and_save_with_session(session, forecast_meta_data_list)
+            prune_http_cache(session)
 
-    def _get_or_create_forecast_meta_data(self, district_data):
+    def _fetch_and_save_with_session(self, session, forecast_meta_data_list):
         """
-        Retrieves or creates forecast metadata for a district.
+        Fetches and saves the weather data of locations using a shared session.
 
         Args:
-        - district_data (dict): District data.
+        - session: Session object used for every API request of the refresh.
+        - forecast_meta_data_list (list): Forecast metadata instances to refresh.
+        """
+        weather_data_factory = WeatherDataFactory(
+            self.forecast_url,
+            OpenMeteoApiClient(session=session, batch_size=self.batch_size, timer=self.timer)
+        )
+        writer_class = ForecastDataWriter if self.storage_mode == ROWS else ForecastSeriesWriter
+        writer = writer_class(upsert=self.refresh_mode == self.INCREMENTAL)
+        archive_writer = None
+        if self.archive_run_id is not None:
+            archive_writer = ForecastArchiveWriter(ForecastArchiveRun.objects.get(pk=self.archive_run_id))
+        updated_meta_data_list = []
+        forecast_windows = {}
+        batches = [
+            forecast_meta_data_list[start:start + self.batch_size]
+            for start in range(0, len(forecast_meta_data_list), self.batch_size)
+        ]
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+            futures = {
+                executor.submit(self._fetch_weather_data, weather_data_factory, batch): batch
+                for batch in batches
+            }
+            for future in as_completed(futures):
+                batch = futures[future]
+                try:
+                    weather_data_list = future.result()
+                except Exception as e:
+                    for forecast_meta_data in batch:
+                        self.failed_locations[forecast_meta_data.location_name] = str(e)
+                    continue
+
+                with self.timer.measure('write'):
+                    for forecast_meta_data, weather_data in zip(batch, weather_data_list):
+                        window = self._save_weather_data(writer, forecast_meta_data, weather_data)
+                        if archive_writer is not None:
+                            archive_writer.add(forecast_meta_data, weather_data["time"], weather_data)
+                        if window is not None:
+                            forecast_windows.setdefault(window, []).append(forecast_meta_data.pk)
+                        updated_meta_data_list.append(forecast_meta_data)
+
+        with self.timer.measure('write'):
+            writer.flush()
+            if archive_writer is not None:
+                archive_writer.flush()
+            ForecastMetaData.objects.bulk_update(updated_meta_data_list, ['updated_at'])
+            # A series is replaced as a whole, so only hourly rows can outlive their window
+            if self.refresh_mode == self.INCREMENTAL and self.storage_mode == ROWS:
+                self._prune_outside_forecast_windows(forecast_windows)
+        self.rows_written = writer.rows_written
+
+    def _update_statistics(self):
+        """
+        Recomputes average temperatures and leaderboards from the saved forecast.
 
         Returns:
-        - ForecastMetaData: Forecast metadata instance.
+        - dict: The materialized leaderboards, as returned by build_leaderboards().
         """
-        latitude = float(district_data['lat'])
-        longitude = float(district_data['long'])
-        name = district_data['name']
-        return ForecastMetaData.objects.get_or_create(
-            latitude=latitude, longitude=longitude, location_name=name
-        )[0]
+        with self.timer.measure('statistics'):
+            statistics = compute_location_statistics()
+            forecast_meta_data_list = list(ForecastMetaData.objects.all())
+            for forecast_meta_data in forecast_meta_data_list:
+                forecast_meta_data.average_temperature = statistics.get(forecast_meta_data.pk, {}).get('mean')
+            ForecastMetaData.objects.bulk_update(forecast_meta_data_list, ['average_temperature'])
+            return build_leaderboards(statistics)
 
-    def _save_weather_data(self, forecast_meta_data):
+    def _publish(self, leaderboards):
         """
-        Saves weather data for a district.
+        Publishes a new dataset version and warms the leaderboard cache for it.
 
         Args:
-        - forecast_meta_data (ForecastMetaData): Forecast metadata instance.
+        - leaderboards (dict): The materialized leaderboards.
         """
-        weather_data_factory = WeatherDataFactory(self.forecast_url, OpenMeteoApiClient(session=self._get_retry_session()))
-        weather_data = weather_data_factory.get_weather_data(
-            float(forecast_meta_data.latitude),
-            float(forecast_meta_data.longitude),
-            forecast_meta_data.location_name
-        )
+        with self.timer.measure('cache_warm'):
+            publish_dataset_version()
+            warm_leaderboard_cache(leaderboards)
 
-        date_list = weather_data["date"]
-        temperature_list = weather_data["temperature_2m"]
-        average_temperature = sum(temperature_list) / len(temperature_list)
-        forecast_meta_data.average_temperature = average_temperature
-        forecast_meta_data.save()
+    def _prune_outside_forecast_windows(self, forecast_windows):
+        """
+        Deletes hourly rows that fall outside the newly fetched forecast window.
+
+        Locations sharing the same window are pruned with a single statement.
 
-        for date_str, temperature in zip(date_list, temperature_list):
-            date = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
-            ForecastData.objects.create(
-                forecast_meta_data=forecast_meta_data,
-                date=date,
-                temperature_2m=float(temperature),
-            )
+        Args:
+        - forecast_windows (dict): (first, last) epoch seconds tuples mapped to the
+          forecast metadata IDs fetched with that window.
+        """
+        for window, forecast_meta_data_ids in forecast_windows.items():
+            first_date, last_date = (datetime.fromtimestamp(epoch, tz=dt_timezone.utc) for epoch in window)
+            ForecastData.objects.filter(
+                forecast_meta_data_id__in=forecast_meta_data_ids
+            ).exclude(date__gte=first_date, date__lte=last_date).delete()
 
-    def _get_retry_session(self):
+    def _fetch_weather_data(self, weather_data_factory, forecast_meta_data_list):
         """
-        Returns a retry-enabled session for making API requests.
+        Fetches weather data for a batch of districts in a single API request.
+
+        Args:
+        - weather_data_factory (WeatherDataFactory): Factory used to fetch the data.
+        - forecast_meta_data_list (list): Forecast metadata instances of the batch.
 
         Returns:
-        - requests.Session: Retry-enabled session.
+        - list: Weather data for each district, in the same order as the batch.
+        """
+        return weather_data_factory.get_weather_data_batch([
+            {
+                "latitude": forecast_meta_data.latitude,
+                "longitude": forecast_meta_data.longitude,
+                "location_name": forecast_meta_data.location_name,
+            }
+            for forecast_meta_data in forecast_meta_data_list
+        ])
+
+    def _get_or_create_forecast_meta_data_list(self):
         """
-        cache_session = requests_cache.CachedSession('.cache', expire_after=3600)
-        return retry(cache_session, retries=5, backoff_factor=0.2)
+        Retrieves or creates forecast metadata for every district.
+
+        Metadata is matched on the location name, so existing rows keep their IDs
+        and only have their coordinates updated when they changed.
+
+        Returns:
+        - list: Forecast metadata instances, in the same order as districts_data.
+        """
+        existing = ForecastMetaData.objects.in_bulk(
+            [district_data['name'] for district_data in self.districts_data],
+            field_name='location_name',
+        )
+        forecast_meta_data_list, created, moved = [], [], []
+        for district_data in self.districts_data:
+            latitude = float(district_data['lat'])
+            longitude = float(district_data['long'])
+            forecast_meta_data = existing.get(district_data['name'])
+            if forecast_meta_data is None:
+                forecast_meta_data = ForecastMetaData(
+                    latitude=latitude, longitude=longitude, location_name=district_data['name'])
+                created.append(forecast_meta_data)
+            elif (forecast_meta_data.latitude, forecast_meta_data.longitude) != (latitude, longitude):
+                forecast_meta_data.latitude = latitude
+                forecast_meta_data.longitude = longitude
+                moved.append(forecast_meta_data)
+            forecast_meta_data_list.append(forecast_meta_data)
+
+        ForecastMetaData.objects.bulk_update(moved, ['latitude', 'longitude'])
+        ForecastMetaData.objects.bulk_create(created)
+        return forecast_meta_data_list
+
+    def _save_weather_data(self, writer, forecast_meta_data, weather_data):
+        """
+        Queues weather data of a district for writing.
+
+        The update time is set on the metadata instance, which is saved in bulk
+        once every district has been processed.
+
+        Args:
+        - writer (ForecastDataWriter or ForecastSeriesWriter): Writer buffering the forecast.
+        - forecast_meta_data (ForecastMetaData): Forecast metadata instance.
+        - weather_data (dict): Weather data fetched for the district.
+
+        Returns:
+        - tuple: First and last epoch seconds of the fetched forecast window, or
+          None when the forecast has no hours.
+        """
+        times = weather_data["time"]
+        forecast_meta_data.updated_at = timezone.now()
+
+        writer.add(forecast_meta_data, times, weather_data)
+        if not len(times):
+            return None
+        return int(times[0]), int(times[-1])
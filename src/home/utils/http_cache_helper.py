@@ -0,0 +1,133 @@
+import threading
+from datetime import timedelta
+
+import requests_cache
+from django.conf import settings
+from requests_cache.backends.base import BaseCache, DictStorage
+from home.utils.cache_helper import increment_counter
+from home.utils.http_cache_stats_helper import HTTP_CACHE_HITS_KEY, HTTP_CACHE_MISSES_KEY, HTTP_CACHE_REVALIDATED_KEY
+
+MEMORY = 'memory'
+FILESYSTEM = 'filesystem'
+REDIS = 'redis'
+BACKENDS = (MEMORY, FILESYSTEM, REDIS)
+
+_memory_cache = None
+_memory_cache_lock = threading.Lock()
+
+
+class LRUDictStorage(DictStorage):
+    """
+    In-memory response storage holding at most max_entries responses.
+
+    Reading or writing a response marks it as most recently used; once the
+    storage is full, the least recently used response is evicted.
+
+    Attributes:
+    - max_entries (int): Maximum number of stored responses.
+    """
+
+    def __init__(self, max_entries, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_entries = max_entries
+        self._lock = threading.RLock()
+
+    def __getitem__(self, key):
+        with self._lock:
+            item = super().__getitem__(key)
+            # Dicts keep insertion order, so re-inserting moves the key to the most recent end
+            self.data[key] = self.data.pop(key)
+            return item
+
+    def __setitem__(self, key, item):
+        with self._lock:
+            self.data.pop(key, None)
+            self.data[key] = item
+            while len(self.data) > self.max_entries:
+                del self.data[next(iter(self.data))]
+
+    def __delitem__(self, key):
+        with self._lock:
+            super().__delitem__(key)
+
+
+class LRUMemoryCache(BaseCache):
+    """
+    Process-local requests_cache backend with size-bounded LRU eviction.
+    """
+
+    def __init__(self, max_entries, **kwargs):
+        super().__init__(cache_name=MEMORY, **kwargs)
+        self.responses = LRUDictStorage(max_entries)
+
+
+class MeteredCachedSession(requests_cache.CachedSession):
+    """
+    CachedSession counting cache hits, misses and revalidations.
+
+    Counters are kept in the Django cache, so with a shared cache they add up
+    over every worker process.
+    """
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        if getattr(response, 'revalidated', False):
+            increment_counter(HTTP_CACHE_REVALIDATED_KEY)
+        elif getattr(response, 'from_cache', False):
+            increment_counter(HTTP_CACHE_HITS_KEY)
+        else:
+            increment_counter(HTTP_CACHE_MISSES_KEY)
+        return response
+
+
+def build_http_cache(backend=None):
+    """
+    Builds the requests_cache backend selected by the FORECAST_HTTP_CACHE_* settings.
+
+    Expired responses are kept for one more expiry period by every backend, so
+    they can be revalidated with If-None-Match/If-Modified-Since instead of being
+    downloaded again.
+
+    Args:
+    - backend (str, optional): 'memory', 'filesystem' or 'redis'. Defaults to the
+      FORECAST_HTTP_CACHE_BACKEND setting.
+
+    Returns:
+    - BaseCache: The cache backend.
+    """
+    global _memory_cache
+
+    backend = backend or settings.FORECAST_HTTP_CACHE_BACKEND
+    if backend == MEMORY:
+        # Shared by every session of the process, so responses outlive a single refresh
+        with _memory_cache_lock:
+            if _memory_cache is None:
+                _memory_cache = LRUMemoryCache(settings.FORECAST_HTTP_CACHE_MAX_ENTRIES)
+            return _memory_cache
+    if backend == FILESYSTEM:
+        # One file per response, so concurrent workers do not contend on a single database lock
+        return requests_cache.FileCache(settings.FORECAST_HTTP_CACHE_LOCATION)
+    if backend == REDIS:
+        from redis import Redis
+
+        return requests_cache.RedisCache(
+            namespace='weather_forecast_http_cache',
+            connection=Redis.from_url(settings.FORECAST_HTTP_CACHE_LOCATION or settings.REDIS_URL),
+            ttl_offset=settings.FORECAST_HTTP_CACHE_EXPIRE_AFTER,
+        )
+    raise ValueError(f"Unknown HTTP cache backend {backend!r}. Choose one of: {', '.join(BACKENDS)}.")
+
+
+def prune_http_cache(session):
+    """
+    Removes responses that are too old to be revalidated from a session's cache.
+
+    The memory backend evicts by size and the Redis backend by TTL; filesystem
+    caches are bounded by pruning them after every refresh.
+
+    Args:
+    - session (requests_cache.CachedSession): Session whose cache is pruned.
+    """
+    if isinstance(session.cache, requests_cache.FileCache):
+        session.cache.delete(older_than=timedelta(seconds=2 * settings.FORECAST_HTTP_CACHE_EXPIRE_AFTER))
+
@@ -0,0 +1,30 @@
+from django.conf import settings
+from home.utils.cache_helper import get_counters
+
+# Kept apart from http_cache_helper, so web processes can report the counters
+# without importing requests_cache
+HTTP_CACHE_HITS_KEY = 'forecast_http_cache_hits'
+HTTP_CACHE_MISSES_KEY = 'forecast_http_cache_misses'
+HTTP_CACHE_REVALIDATED_KEY = 'forecast_http_cache_revalidated'
+
+
+def get_http_cache_stats():
+    """
+    Returns the hit, miss and revalidation counters of the upstream HTTP cache.
+
+    Returns:
+    - dict: backend, hits, misses, revalidated and hit_rate (the share of requests
+      answered without downloading the response again).
+    """
+    counters = get_counters(HTTP_CACHE_HITS_KEY, HTTP_CACHE_MISSES_KEY, HTTP_CACHE_REVALIDATED_KEY)
+    hits = counters[HTTP_CACHE_HITS_KEY]
+    misses = counters[HTTP_CACHE_MISSES_KEY]
+    revalidated = counters[HTTP_CACHE_REVALIDATED_KEY]
+    total = hits + misses + revalidated
+    return {
+        "backend": settings.FORECAST_HTTP_CACHE_BACKEND,
+        "hits": hits,
+        "misses": misses,
+        "revalidated": revalidated,
+        "hit_rate": round((hits + revalidated) / total, 4) if total else None,
+    }
@@ -0,0 +1,268 @@
+import json
+from datetime import timezone
+
+import numpy as np
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Avg, Max, Min, Q
+from django.db.models.functions import ExtractHour
+from home.models import ForecastData, ForecastLeaderboard, ForecastMetaData, ForecastSeries
+from home.utils.cache_helper import aget_computed, aversioned_key, get_or_compute, set_many_computed, versioned_key
+from home.utils.series_helper import SERIES, get_storage_mode, series_times, unpack_series
+
+ORDERS = ('asc', 'desc')
+
+
+def get_metrics():
+    """
+    Returns the names of the metrics leaderboards are built for.
+
+    Returns:
+    - list: 'mean', 'min', 'max' and one 'hour_<H>' metric per FORECAST_LEADERBOARD_HOURS entry.
+    """
+    return ['mean', 'min', 'max'] + [f'hour_{hour}' for hour in settings.FORECAST_LEADERBOARD_HOURS]
+
+
+def compute_location_statistics():
+    """
+    Aggregates the hourly forecast of every location in a single GROUP BY query.
+
+    Hour metrics average the temperatures at that UTC hour over all forecast days.
+    With series storage the packed series are aggregated with NumPy instead.
+
+    Returns:
+    - dict: Forecast metadata IDs mapped to {metric: value}.
+    """
+    if get_storage_mode() == SERIES:
+        return _compute_series_statistics()
+
+    aggregates = {
+        'mean': Avg('temperature_2m'),
+        'min': Min('temperature_2m'),
+        'max': Max('temperature_2m'),
+    }
+    for hour in settings.FORECAST_LEADERBOARD_HOURS:
+        aggregates[f'hour_{hour}'] = Avg('temperature_2m', filter=Q(utc_hour=hour))
+
+    rows = (
+        ForecastData.objects.exclude(temperature_2m=None)
+        .annotate(utc_hour=ExtractHour('date', tzinfo=timezone.utc))
+        .values('forecast_meta_data_id')
+        .annotate(**aggregates)
+        .order_by()
+    )
+    return {
+        row.pop('forecast_meta_data_id'): row
+        for row in rows
+    }
+
+
+def _compute_series_statistics():
+    """
+    Aggregates the packed forecast series of every location.
+
+    Returns:
+    - dict: Forecast metadata IDs mapped to {metric: value}, like compute_location_statistics().
+    """
+    statistics = {}
+    series = ForecastSeries.objects.values_list('forecast_meta_data_id', 'start', 'interval', 'variables', 'values')
+    for forecast_meta_data_id, start, interval, variables, values in series.iterator():
+        if 'temperature_2m' not in variables:
+            continue
+        temperatures = unpack_series(values, len(variables))[variables.index('temperature_2m')].astype(np.float64)
+        valid = ~np.isnan(temperatures)
+        if not valid.any():
+            continue
+        utc_hours = series_times(start, interval, len(temperatures)) // 3600 % 24
+        row = {
+            'mean': float(temperatures[valid].mean()),
+            'min': float(temperatures[valid].min()),
+            'max': float(temperatures[valid].max()),
+        }
+        for hour in settings.FORECAST_LEADERBOARD_HOURS:
+            at_hour = valid & (utc_hours == hour)
+            row[f'hour_{hour}'] = float(temperatures[at_hour].mean()) if at_hour.any() else None
+        statistics[forecast_meta_data_id] = row
+    return statistics
+
+
+def build_leaderboards(statistics):
+    """
+    Ranks locations by every metric and order and stores the pre-serialized results.
+
+    Each leaderboard is kept as one JSON array in bytes together with the byte
+    offset at which every item ends, so the top N items can be served by slicing
+    without parsing or re-serializing anything.
+
+    Args:
+    - statistics (dict): Output of compute_location_statistics().
+
+    Returns:
+    - dict: (metric, order) tuples mapped to (payload, offsets) tuples.
+    """
+    locations = ForecastMetaData.objects.in_bulk(list(statistics))
+    leaderboards = {}
+    for metric in get_metrics():
+        ranked = sorted(
+            (
+                (values[metric], locations[pk].location_name, pk)
+                for pk, values in statistics.items()
+                if values[metric] is not None and pk in locations
+            ),
+            key=lambda item: (item[0], item[1]),
+        )
+        for order in ORDERS:
+            items = ranked if order == 'asc' else sorted(ranked, key=lambda item: (-item[0], item[1]))
+            leaderboards[(metric, order)] = _serialize(
+                [_leaderboard_item(locations[pk], statistics[pk], value) for value, _, pk in items])
+
+    ForecastLeaderboard.objects.bulk_create(
+        [
+            ForecastLeaderboard(metric=metric, order=order, payload=payload, offsets=offsets)
+            for (metric, order), (payload, offsets) in leaderboards.items()
+        ],
+        update_conflicts=True,
+        unique_fields=['metric', 'order'],
+        update_fields=['payload', 'offsets', 'updated_at'],
+    )
+    ForecastLeaderboard.objects.exclude(metric__in=get_metrics()).delete()
+    return leaderboards
+
+
+def warm_leaderboard_cache(leaderboards):
+    """
+    Stores leaderboards in the cache under the current dataset version.
+
+    Args:
+    - leaderboards (dict): (metric, order) tuples mapped to (payload, offsets) tuples.
+    """
+    set_many_computed({
+        _cache_key(metric, order): leaderboard
+        for (metric, order), leaderboard in leaderboards.items()
+    }, settings.FORECAST_LEADERBOARD_CACHE_TIMEOUT)
+
+
+def get_leaderboard(metric, order, limit):
+    """
+    Returns the top items of a leaderboard as JSON bytes.
+
+    Leaderboards are read from the cache, then from the ForecastLeaderboard table.
+    When neither has them (no refresh has materialized them yet) they are built
+    from the forecast data. Cache fills go through get_or_compute(), so a missing
+    or expiring leaderboard is loaded by a single caller at a time.
+
+    Args:
+    - metric (str): One of get_metrics().
+    - order (str): 'asc' or 'desc'.
+    - limit (int): Maximum number of items.
+
+    Returns:
+    - tuple: (JSON array bytes, source) where source is 'cache' or 'database'.
+    """
+    leaderboard, from_cache = get_or_compute(
+        _cache_key(metric, order),
+        lambda: _load_leaderboard(metric, order),
+        settings.FORECAST_LEADERBOARD_CACHE_TIMEOUT,
+    )
+    return _truncate(leaderboard, limit), 'cache' if from_cache else 'database'
+
+
+def _load_leaderboard(metric, order):
+    """
+    Reads a materialized leaderboard, building every leaderboard when none is stored yet.
+
+    Args:
+    - metric (str): One of get_metrics().
+    - order (str): 'asc' or 'desc'.
+
+    Returns:
+    - tuple: (JSON array bytes, end offset of every item).
+    """
+    row = ForecastLeaderboard.objects.filter(metric=metric, order=order).values_list('payload', 'offsets').first()
+    if row is not None:
+        return bytes(row[0]), row[1]
+    leaderboards, _ = get_or_compute(
+        versioned_key('leaderboards_build'),
+        lambda: build_leaderboards(compute_location_statistics()),
+        settings.FORECAST_LEADERBOARD_CACHE_TIMEOUT,
+    )
+    return leaderboards[(metric, order)]
+
+
+async def aget_leaderboard(metric, order, limit):
+    """
+    Async version of get_leaderboard(), for async views.
+
+    A fresh cached leaderboard is read with the async cache API; a miss or an
+    early refresh runs get_leaderboard() in a worker thread, so it goes through
+    the same single-caller cache fill.
+
+    Args:
+    - metric (str): One of get_metrics().
+    - order (str): 'asc' or 'desc'.
+    - limit (int): Maximum number of items.
+
+    Returns:
+    - tuple: (JSON array bytes, source) where source is 'cache' or 'database'.
+    """
+    leaderboard = await aget_computed(await aversioned_key(_cache_name(metric, order)))
+    if leaderboard is not None:
+        return _truncate(leaderboard, limit), 'cache'
+    return await sync_to_async(get_leaderboard)(metric, order, limit)
+
+
+def _truncate(leaderboard, limit):
+    """
+    Cuts a serialized leaderboard down to its first items.
+
+    Args:
+    - leaderboard (tuple): (JSON array bytes, end offset of every item).
+    - limit (int): Maximum number of items.
+
+    Returns:
+    - bytes: JSON array of at most limit items.
+    """
+    payload, offsets = leaderboard
+    if limit >= len(offsets):
+        return payload
+    return payload[:offsets[limit - 1]] + b']'
+
+
+def _cache_name(metric, order):
+    return f'leaderboard_{metric}_{order}'
+
+
+def _cache_key(metric, order):
+    return versioned_key(_cache_name(metric, order))
+
+
+def _leaderboard_item(forecast_meta_data, values, value):
+    return {
+        "id": forecast_meta_data.pk,
+        "location_name": forecast_meta_data.location_name,
+        "latitude": forecast_meta_data.latitude,
+        "longitude": forecast_meta_data.longitude,
+        "average_temperature": values['mean'],
+        "value": value,
+    }
+
+
+def _serialize(items):
+    """
+    Serializes leaderboard items into a JSON array and the end offset of every item.
+
+    Args:
+    - items (list): Leaderboard items.
+
+    Returns:
+    - tuple: (JSON array bytes, list of offsets just past each item).
+    """
+    payload = bytearray(b'[')
+    offsets = []
+    for index, item in enumerate(items):
+        if index:
+            payload += b','
+        payload += json.dumps(item, separators=(',', ':')).encode()
+        offsets.append(len(payload))
+    payload += b']'
+    return bytes(payload), offsets
@@ -0,0 +1,181 @@
+import math
+import threading
+
+import numpy as np
+from home.models import ForecastMetaData
+from home.utils.cache_helper import get_dataset_version
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def to_unit_vectors(latitudes, longitudes):
+    """
+    Converts coordinates in degrees to points on the unit sphere.
+
+    Straight-line distance between unit vectors grows monotonically with the
+    great-circle distance, so a Euclidean KD-tree finds the true nearest point
+    without any special handling around the poles or the antimeridian.
+
+    Args:
+    - latitudes (array-like): Latitudes in degrees.
+    - longitudes (array-like): Longitudes in degrees.
+
+    Returns:
+    - numpy.ndarray: Array of shape (n, 3) with x, y, z coordinates.
+    """
+    latitudes = np.radians(np.asarray(latitudes, dtype=np.float64))
+    longitudes = np.radians(np.asarray(longitudes, dtype=np.float64))
+    cos_latitudes = np.cos(latitudes)
+    return np.column_stack((
+        cos_latitudes * np.cos(longitudes),
+        cos_latitudes * np.sin(longitudes),
+        np.sin(latitudes),
+    ))
+
+
+class KDTree:
+    """
+    Minimal static 3-d tree for nearest-neighbour queries.
+
+    The tree is stored in flat lists indexed by node, which keeps queries free of
+    per-node object lookups.
+
+    Attributes:
+    - points (numpy.ndarray): Points the tree was built from, shape (n, 3).
+    """
+
+    def __init__(self, points):
+        """
+        Builds the tree from an array of points.
+
+        Args:
+        - points (numpy.ndarray): Points of shape (n, 3).
+        """
+        self.points = points
+        self._coordinates = points.tolist()
+        self._axis = []
+        self._left = []
+        self._right = []
+        self._index = []
+        self._root = self._build(list(range(len(points))), depth=0)
+
+    def _build(self, indices, depth):
+        if not indices:
+            return -1
+        axis = depth % 3
+        indices.sort(key=lambda index: self._coordinates[index][axis])
+        median = len(indices) // 2
+
+        node = len(self._index)
+        self._index.append(indices[median])
+        self._axis.append(axis)
+        self._left.append(-1)
+        self._right.append(-1)
+        self._left[node] = self._build(indices[:median], depth + 1)
+        self._right[node] = self._build(indices[median + 1:], depth + 1)
+        return node
+
+    def nearest(self, point):
+        """
+        Finds the point closest to the given point.
+
+        Args:
+        - point (sequence): Query point with 3 coordinates.
+
+        Returns:
+        - tuple: (index of the nearest point, Euclidean distance to it), or
+          (None, None) if the tree is empty.
+        """
+        best_index, best_distance = None, math.inf
+        # Each entry holds a node and the distance from the query to its region's splitting plane
+        stack = [(self._root, 0.0)]
+        while stack:
+            node, plane_distance = stack.pop()
+            if node == -1 or plane_distance >= best_distance:
+                continue
+            index = self._index[node]
+            coordinates = self._coordinates[index]
+            distance = math.dist(coordinates, point)
+            if distance < best_distance:
+                best_index, best_distance = index, distance
+
+            difference = point[self._axis[node]] - coordinates[self._axis[node]]
+            near, far = (self._left[node], self._right[node]) if difference < 0 else (self._right[node], self._left[node])
+            # The near side is popped first, so the far side is usually pruned by then
+            stack.append((far, abs(difference)))
+            stack.append((near, 0.0))
+
+        if best_index is None:
+            return None, None
+        return best_index, best_distance
+
+
+class NearestLocationFinder:
+    """
+    Singleton class answering "which forecast location is closest to (lat, lon)".
+
+    The KD-tree is built in memory from ForecastMetaData and rebuilt whenever the
+    dataset version changes, so lookups never touch the database.
+    """
+
+    _instance = None
+
+    def __new__(cls, *args, **kwargs):
+        if cls._instance is None:
+            cls._instance = super().__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not hasattr(self, '_initialized'):
+            self._initialized = True
+            self._lock = threading.Lock()
+            self._tree = None
+            self._locations = []
+            self._version = None
+
+    def find_nearest(self, latitude, longitude):
+        """
+        Finds the forecast location closest to the given coordinates.
+
+        Args:
+        - latitude (float): Latitude in degrees.
+        - longitude (float): Longitude in degrees.
+
+        Returns:
+        - dict: location_name, latitude, longitude and distance_km of the nearest
+          location, or None when there are no forecast locations.
+        """
+        tree, locations = self._get_index()
+        if not locations:
+            return None
+
+        index, chord = tree.nearest(to_unit_vectors([latitude], [longitude])[0].tolist())
+        location = locations[index]
+        return {
+            "location_name": location["location_name"],
+            "latitude": location["latitude"],
+            "longitude": location["longitude"],
+            "distance_km": round(2 * EARTH_RADIUS_KM * math.asin(min(chord / 2, 1.0)), 3),
+        }
+
+    def _get_index(self):
+        """
+        Returns the current KD-tree and its locations, rebuilding them when stale.
+
+        Returns:
+        - tuple: (KDTree, list of location dicts).
+        """
+        version = get_dataset_version()
+        with self._lock:
+            if self._version != version:
+                locations = list(
+                    ForecastMetaData.objects.exclude(latitude=None).exclude(longitude=None)
+                    .values('location_name', 'latitude', 'longitude')
+                )
+                self._tree = KDTree(to_unit_vectors(
+                    [location['latitude'] for location in locations],
+                    [location['longitude'] for location in locations],
+                ))
+                self._locations = locations
+                self._version = version
+            return self._tree, self._locations
@@ -0,0 +1,202 @@
+import hashlib
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Q
+from django.utils import timezone
+from home.models import ForecastRefreshJob
+
+
+def _lock_key(forecast_url):
+    """
+    Builds the cache key of the refresh lock of a forecast URL.
+
+    Args:
+    - forecast_url (str): URL the forecast is fetched from.
+
+    Returns:
+    - str: Cache key.
+    """
+    return f"forecast_refresh_lock:{hashlib.sha1(forecast_url.encode()).hexdigest()}"
+
+
+def _find_recent_job(forecast_url):
+    """
+    Finds a job that makes a new refresh of a forecast URL unnecessary.
+
+    That is a job still pending or running, or one that succeeded less than
+    FORECAST_REFRESH_MIN_INTERVAL seconds ago.
+
+    Args:
+    - forecast_url (str): URL the forecast is fetched from.
+
+    Returns:
+    - ForecastRefreshJob: The most recent such job, or None.
+    """
+    now = timezone.now()
+    in_flight = Q(
+        state__in=[ForecastRefreshJob.PENDING, ForecastRefreshJob.RUNNING],
+        created_at__gte=now - timedelta(seconds=settings.FORECAST_REFRESH_LOCK_TIMEOUT),
+    )
+    recently_succeeded = Q(
+        state=ForecastRefreshJob.SUCCEEDED,
+        finished_at__gte=now - timedelta(seconds=settings.FORECAST_REFRESH_MIN_INTERVAL),
+    )
+    return (
+        ForecastRefreshJob.objects.filter(in_flight | recently_succeeded, forecast_url=forecast_url)
+        .order_by('-created_at').first()
+    )
+
+
+def acquire_refresh_job(forecast_url):
+    """
+    Returns the job that should serve a refresh request, creating one only when needed.
+
+    Requests for a URL whose refresh is in flight, or finished less than
+    FORECAST_REFRESH_MIN_INTERVAL seconds ago, are coalesced into that job. A new
+    job takes a per-URL lock with cache.add(), which is atomic on a shared cache,
+    so concurrent requests cannot both start a refresh.
+
+    Args:
+    - forecast_url (str): URL the forecast is fetched from.
+
+    Returns:
+    - tuple: (ForecastRefreshJob, created) where created is False for an existing job.
+    """
+    lock_key = _lock_key(forecast_url)
+    existing_job = _find_recent_job(forecast_url)
+    if existing_job is None:
+        owner_id = cache.get(lock_key)
+        existing_job = ForecastRefreshJob.objects.filter(pk=owner_id).first() if owner_id else None
+    if existing_job is not None:
+        return existing_job, False
+
+    job = ForecastRefreshJob.objects.create(forecast_url=forecast_url)
+    if cache.add(lock_key, job.pk, timeout=settings.FORECAST_REFRESH_LOCK_TIMEOUT):
+        return job, True
+
+    owner_id = cache.get(lock_key)
+    owner = ForecastRefreshJob.objects.filter(pk=owner_id).first() if owner_id else None
+    if owner is not None:
+        # Another request took the lock after our checks
+        job.delete()
+        return owner, False
+
+    # The lock names a job that no longer exists, e.g. after the jobs were cleaned up; take it over
+    cache.set(lock_key, job.pk, timeout=settings.FORECAST_REFRESH_LOCK_TIMEOUT)
+    return job, True
+
+
+def _release_refresh_lock(job_id, timeout):
+    """
+    Releases or shortens the refresh lock of a job, if the job still holds it.
+
+    Args:
+    - job_id (int): ID of the ForecastRefreshJob.
+    - timeout (int): Seconds the lock is kept for; 0 releases it.
+    """
+    forecast_url = ForecastRefreshJob.objects.filter(pk=job_id).values_list('forecast_url', flat=True).first()
+    if forecast_url is None:
+        return
+    lock_key = _lock_key(forecast_url)
+    if cache.get(lock_key) == job_id:
+        if timeout:
+            cache.set(lock_key, job_id, timeout=timeout)
+        else:
+            cache.delete(lock_key)
+
+
+def _duration_updates(durations):
+    """
+    Builds the field updates adding phase durations to a job.
+
+    Args:
+    - durations (dict): Phase names mapped to seconds.
+
+    Returns:
+    - dict: Keyword arguments for QuerySet.update().
+    """
+    return {
+        f'{phase}_seconds': F(f'{phase}_seconds') + seconds
+        for phase, seconds in durations.items()
+        if phase in ForecastRefreshJob.PHASES
+    }
+
+
+def start_refresh_job(job_id, task_id, districts_total, durations):
+    """
+    Marks a refresh job as running once its districts are known.
+
+    Args:
+    - job_id (int): ID of the ForecastRefreshJob.
+    - task_id (str): ID of the Celery task running the refresh.
+    - districts_total (int): Number of districts being refreshed.
+    - durations (dict): Time spent preparing the refresh, by phase.
+    """
+    ForecastRefreshJob.objects.filter(pk=job_id).update(
+        state=ForecastRefreshJob.RUNNING,
+        task_id=task_id,
+        districts_total=districts_total,
+        started_at=timezone.now(),
+        **_duration_updates(durations),
+    )
+
+
+def record_refresh_shard(job_id, districts, rows_written, failed_locations, durations):
+    """
+    Adds the progress of a finished shard to a refresh job.
+
+    Counters are incremented in the database, so shards finishing at the same
+    time on different workers do not overwrite each other's progress.
+
+    Args:
+    - job_id (int): ID of the ForecastRefreshJob.
+    - districts (int): Number of districts in the shard.
+    - rows_written (int): Number of hourly rows the shard wrote.
+    - failed_locations (dict): Districts of the shard that could not be refreshed.
+    - durations (dict): Time spent by the shard, by phase.
+    """
+    ForecastRefreshJob.objects.filter(pk=job_id).update(
+        districts_done=F('districts_done') + districts - len(failed_locations),
+        districts_failed=F('districts_failed') + len(failed_locations),
+        rows_written=F('rows_written') + rows_written,
+        **_duration_updates(durations),
+    )
+
+
+def finish_refresh_job(job_id, failed_locations, durations):
+    """
+    Marks a refresh job as succeeded.
+
+    Its lock is kept for FORECAST_REFRESH_MIN_INTERVAL seconds, during which new
+    refresh requests for the same URL return this job.
+
+    Args:
+    - job_id (int): ID of the ForecastRefreshJob.
+    - failed_locations (dict): Every district that could not be refreshed.
+    - durations (dict): Time spent finalizing the refresh, by phase.
+    """
+    ForecastRefreshJob.objects.filter(pk=job_id).update(
+        state=ForecastRefreshJob.SUCCEEDED,
+        failed_locations=failed_locations,
+        finished_at=timezone.now(),
+        **_duration_updates(durations),
+    )
+    _release_refresh_lock(job_id, settings.FORECAST_REFRESH_MIN_INTERVAL)
+
+
+def fail_refresh_job(job_id, error):
+    """
+    Marks a refresh job as failed and releases its lock, so it can be retried at once.
+
+    Args:
+    - job_id (int): ID of the ForecastRefreshJob.
+    - error (str): Description of the failure.
+    """
+    ForecastRefreshJob.objects.filter(pk=job_id).update(
+        state=ForecastRefreshJob.FAILED,
+        error=error,
+        finished_at=timezone.now(),
+    )
+    _release_refresh_lock(job_id, 0)
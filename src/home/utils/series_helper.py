@@ -0,0 +1,142 @@
+import numpy as np
+from django.conf import settings
+from home.models import ForecastSeries
+
+ROWS = 'rows'
+SERIES = 'series'
+STORAGE_MODES = (ROWS, SERIES)
+
+# Byte order is fixed, so blobs read the same on every platform
+SERIES_DTYPE = np.dtype('<f4')
+
+
+def get_storage_mode():
+    """
+    Returns the configured forecast storage mode.
+
+    Returns:
+    - str: 'rows' (one ForecastData row per location and hour) or 'series'
+      (one ForecastSeries row per location).
+    """
+    storage_mode = settings.FORECAST_STORAGE_MODE
+    if storage_mode not in STORAGE_MODES:
+        raise ValueError(f"Unknown forecast storage mode {storage_mode!r}. Choose one of: {', '.join(STORAGE_MODES)}.")
+    return storage_mode
+
+
+def pack_series(times, values, variables):
+    """
+    Packs the hourly forecast of a location into a single float32 blob.
+
+    Args:
+    - times (numpy.ndarray): Regularly spaced timestamps, in epoch seconds.
+    - values (dict): Variable names mapped to values aligned with times.
+    - variables (list): Variables to pack, in the order they are stored.
+
+    Returns:
+    - tuple: (start, interval, bytes) of the packed series. An empty forecast packs
+      to an empty series starting at 0, which unpacks to zero hours.
+    """
+    times = np.asarray(times, dtype=np.int64)
+    steps = np.unique(np.diff(times))
+    if len(steps) > 1 or (len(steps) and steps[0] <= 0):
+        raise ValueError("Forecast series timestamps must be regularly spaced.")
+    interval = int(steps[0]) if len(steps) else 3600
+    matrix = np.stack([np.asarray(values[variable], dtype=SERIES_DTYPE) for variable in variables])
+    start = int(times[0]) if len(times) else 0
+    return start, interval, matrix.tobytes()
+
+
+def unpack_series(values, variable_count):
+    """
+    Decodes a packed series without copying it.
+
+    Args:
+    - values (bytes or memoryview): Blob written by pack_series().
+    - variable_count (int): Number of variables packed in the blob.
+
+    Returns:
+    - numpy.ndarray: Read-only float32 view of shape (variables, hours) over the blob.
+    """
+    return np.frombuffer(values, dtype=SERIES_DTYPE).reshape(variable_count, -1)
+
+
+def series_times(start, interval, length):
+    """
+    Rebuilds the timestamps of a packed series.
+
+    Args:
+    - start (int): Epoch seconds of the first value.
+    - interval (int): Seconds between two values.
+    - length (int): Number of values.
+
+    Returns:
+    - numpy.ndarray: int64 epoch seconds.
+    """
+    return start + interval * np.arange(length, dtype=np.int64)
+
+
+class ForecastSeriesWriter:
+    """
+    Buffers the forecast of locations as packed series and upserts them in bulk.
+
+    Each location is a single ForecastSeries row that is replaced as a whole on
+    every refresh, so the table holds one row per location and a full series is
+    read back with one row fetch.
+
+    Attributes:
+    - batch_size (int): Number of buffered hourly values that triggers a flush.
+    - variables (list): Hourly variables packed into every series.
+    - rows_written (int): Total number of series written so far.
+    """
+
+    def __init__(self, batch_size=None, upsert=True, variables=None):
+        """
+        Initializes the ForecastSeriesWriter with an empty buffer.
+
+        Args:
+        - batch_size (int, optional): Number of buffered hourly values that triggers
+          a flush. Defaults to the FORECAST_WRITE_BATCH_SIZE setting.
+        - upsert (bool, optional): Accepted for compatibility with ForecastDataWriter;
+          series are always replaced in place.
+        - variables (list, optional): Hourly variables packed into every series.
+          Defaults to the FORECAST_HOURLY_VARIABLES setting.
+        """
+        self.batch_size = batch_size or settings.FORECAST_WRITE_BATCH_SIZE
+        self.variables = list(variables or settings.FORECAST_HOURLY_VARIABLES)
+        self.rows_written = 0
+        self._series = []
+        self._buffered_values = 0
+
+    def add(self, forecast_meta_data, times, values):
+        """
+        Buffers the hourly forecast of a location, flushing when the buffer is full.
+
+        Args:
+        - forecast_meta_data (ForecastMetaData): Forecast metadata instance.
+        - times (numpy.ndarray): Hourly timestamps of the forecast, in epoch seconds.
+        - values (dict): Variable names mapped to hourly values aligned with times.
+        """
+        start, interval, packed = pack_series(times, values, self.variables)
+        self._series.append(ForecastSeries(
+            forecast_meta_data_id=forecast_meta_data.pk, start=start, interval=interval,
+            variables=self.variables, values=packed))
+        self._buffered_values += len(times)
+        if self._buffered_values >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes all buffered series to the database.
+        """
+        if not self._series:
+            return
+        ForecastSeries.objects.bulk_create(
+            self._series,
+            update_conflicts=True,
+            unique_fields=['forecast_meta_data'],
+            update_fields=['start', 'interval', 'variables', 'values', 'updated_at'],
+        )
+        self.rows_written += len(self._series)
+        self._series = []
+        self._buffered_values = 0
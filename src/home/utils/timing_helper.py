@@ -0,0 +1,44 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class PhaseTimer:
+    """
+    Thread-safe accumulator of the time spent in named phases.
+
+    Time measured concurrently by several threads is summed, so a phase may add
+    up to more seconds than the wall-clock time it spanned.
+
+    Attributes:
+    - durations (dict): Phase names mapped to the seconds spent in them.
+    """
+
+    def __init__(self):
+        self.durations = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def measure(self, phase):
+        """
+        Measures the time spent in the body of a with statement.
+
+        Args:
+        - phase (str): Name of the phase the time is added to.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(phase, time.perf_counter() - start)
+
+    def add(self, phase, seconds):
+        """
+        Adds time to a phase.
+
+        Args:
+        - phase (str): Name of the phase.
+        - seconds (float): Seconds spent in the phase.
+        """
+        with self._lock:
+            self.durations[phase] = self.durations.get(phase, 0.0) + seconds
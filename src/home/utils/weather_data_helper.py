@@ -1,8 +1,53 @@
+import numpy as np
 import openmeteo_requests
-import requests_cache
-import pandas as pd
-from retry_requests import retry
 from abc import ABC, abstractmethod
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3 import Retry
+from home.models import ForecastData
+from home.utils.http_cache_helper import MeteredCachedSession, build_http_cache
+from home.utils.timing_helper import PhaseTimer
+
+
+def build_session(pool_size, backend=None, expire_after=None, retries=5, backoff_factor=0.2):
+    """
+    Builds a cached, retrying HTTP session with a connection pool of a given size.
+
+    One session is meant to be shared by every request of a forecast refresh, so
+    the response cache is opened once and connections to the API host are kept
+    alive and reused instead of being re-established for every call.
+
+    Args:
+    - pool_size (int): Maximum number of connections kept open per host. Should
+      match the number of threads using the session.
+    - backend (str, optional): HTTP cache backend, see build_http_cache(). Defaults
+      to the FORECAST_HTTP_CACHE_BACKEND setting.
+    - expire_after (int, optional): Seconds responses stay fresh in the cache.
+      Defaults to the FORECAST_HTTP_CACHE_EXPIRE_AFTER setting.
+    - retries (int, optional): Maximum number of retries of a failed request.
+    - backoff_factor (float, optional): Factor of the exponential delay between retries.
+
+    Returns:
+    - MeteredCachedSession: The configured session.
+    """
+    if expire_after is None:
+        expire_after = settings.FORECAST_HTTP_CACHE_EXPIRE_AFTER
+    session = MeteredCachedSession(backend=build_http_cache(backend), expire_after=expire_after)
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=retries,
+            read=retries,
+            connect=retries,
+            backoff_factor=backoff_factor,
+            status_forcelist=(500, 502, 504),
+            allowed_methods=None,
+        ),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
 
 
 class WeatherApiClient(ABC):
@@ -40,6 +85,26 @@ class WeatherApiClient(ABC):
         """
         pass
 
+    def get_weather_data_batch(self, forecast_url, locations):
+        """
+        Retrieves weather data for several locations.
+
+        The default implementation fetches the locations one by one; clients whose
+        API supports multi-location requests should override it.
+
+        Args:
+        - forecast_url (str): The URL for fetching forecast data.
+        - locations (list): List of dicts with latitude, longitude and location_name keys.
+
+        Returns:
+        - list: Weather data for each location, in the same order as locations.
+        """
+        return [
+            self.get_weather_data(forecast_url, location["latitude"],
+                                  location["longitude"], location["location_name"])
+            for location in locations
+        ]
+
 
 class OpenMeteoApiClient(WeatherApiClient):
     """
@@ -49,8 +114,36 @@ class OpenMeteoApiClient(WeatherApiClient):
 
     Attributes:
     - session: Session object used for making HTTP requests to the weather API.
+    - batch_size (int): Maximum number of locations requested in a single API call.
+    - variables (list): Hourly variables requested in every API call.
+    - timer (PhaseTimer): Accumulates the time spent in the 'fetch' and 'parse' phases.
     """
 
+    DEFAULT_BATCH_SIZE = 50
+
+    def __init__(self, session, batch_size=None, timer=None, variables=None):
+        """
+        Initializes the OpenMeteoApiClient with a session object and a batch size.
+
+        Args:
+        - session: Session object for making HTTP requests, shared by every call.
+          See build_session().
+        - batch_size (int, optional): Maximum number of locations per API call.
+        - timer (PhaseTimer, optional): Timer the request and parsing times are added to.
+        - variables (list, optional): Hourly variables to request. Defaults to the
+          FORECAST_HOURLY_VARIABLES setting.
+        """
+        super().__init__(session)
+        self.batch_size = batch_size or self.DEFAULT_BATCH_SIZE
+        self.variables = list(variables or settings.FORECAST_HOURLY_VARIABLES)
+        unknown = [variable for variable in self.variables if variable not in ForecastData.HOURLY_VARIABLES]
+        if unknown:
+            raise ValueError(
+                f"Unknown hourly variables {', '.join(unknown)}. "
+                f"Choose from: {', '.join(ForecastData.HOURLY_VARIABLES)}.")
+        self.timer = timer or PhaseTimer()
+        self.openmeteo = openmeteo_requests.Client(session=session)
+
     def get_weather_data(self, forecast_url, latitude, longitude, location_name):
         """
         Retrieves weather data for a given location from the Open-Meteo API.
@@ -64,38 +157,94 @@ class OpenMeteoApiClient(WeatherApiClient):
         Returns:
         - dict: Weather data for the location.
         """
-        # Setup the Open-Meteo API client with cache and retry on error
-        cache_session = requests_cache.CachedSession('.cache', expire_after=3600)
-        retry_session = retry(cache_session, retries=5, backoff_factor=0.2)
-        openmeteo = openmeteo_requests.Client(session=retry_session)
+        location = {"latitude": latitude, "longitude": longitude, "location_name": location_name}
+        return self._fetch_locations(forecast_url, [location])[0]
+
+    def get_weather_data_batch(self, forecast_url, locations):
+        """
+        Retrieves weather data for several locations using multi-location requests.
+
+        Open-Meteo accepts comma-separated latitude/longitude lists and returns one
+        response per coordinate pair, in request order. Locations are requested in
+        chunks of batch_size, so N locations cost ceil(N / batch_size) round trips.
+
+        Args:
+        - forecast_url (str): The URL for fetching forecast data.
+        - locations (list): List of dicts with latitude, longitude and location_name keys.
+
+        Returns:
+        - list: Weather data for each location, in the same order as locations.
+        """
+        weather_data = []
+        for start in range(0, len(locations), self.batch_size):
+            chunk = locations[start:start + self.batch_size]
+            weather_data.extend(self._fetch_locations(forecast_url, chunk))
+        return weather_data
+
+    def _fetch_locations(self, forecast_url, locations):
+        """
+        Fetches weather data for a chunk of locations in a single API call.
 
-        # Make sure all required weather variables are listed here
+        Args:
+        - forecast_url (str): The URL for fetching forecast data.
+        - locations (list): List of dicts with latitude, longitude and location_name keys.
+
+        Returns:
+        - list: Weather data for each location, in the same order as locations.
+        """
+        # Every variable is requested at once and returned in the same order by Variables(i)
         params = {
-            "latitude": latitude,
-            "longitude": longitude,
-            "hourly": "temperature_2m"
+            "latitude": ",".join(str(location["latitude"]) for location in locations),
+            "longitude": ",".join(str(location["longitude"]) for location in locations),
+            "hourly": ",".join(self.variables)
         }
-        responses = openmeteo.weather_api(forecast_url, params=params)
+        with self.timer.measure("fetch"):
+            responses = self.openmeteo.weather_api(forecast_url, params=params)
+
+        if len(responses) != len(locations):
+            raise ValueError(
+                f"Expected {len(locations)} forecast responses, got {len(responses)}.")
+
+        # Responses are returned in the same order as the requested coordinates
+        with self.timer.measure("parse"):
+            return [
+                self._build_hourly_data(response, location["latitude"],
+                                        location["longitude"], location["location_name"])
+                for response, location in zip(responses, locations)
+            ]
+
+    def _build_hourly_data(self, response, latitude, longitude, location_name):
+        """
+        Converts a single Open-Meteo response into the hourly data dictionary.
 
-        # Process first location. Add a for-loop for multiple locations or weather models
-        response = responses[0]
+        Timestamps are kept as an int64 array of epoch seconds and the values of
+        each variable as the float32 array decoded from the response, so no
+        per-point datetime or string objects are created while parsing.
 
+        Args:
+        - response: Open-Meteo WeatherApiResponse for one location.
+        - latitude (float): Latitude of the location.
+        - longitude (float): Longitude of the location.
+        - location_name (str): Name of the location.
+
+        Returns:
+        - dict: Weather data for the location, with "time" holding epoch seconds and
+          one array per requested variable.
+        """
         # Process hourly data
         hourly = response.Hourly()
-        hourly_temperature_2m = hourly.Variables(0).ValuesAsNumpy()
+        if hourly.VariablesLength() != len(self.variables):
+            raise ValueError(
+                f"Expected {len(self.variables)} hourly variables, got {hourly.VariablesLength()}.")
 
         hourly_data = {
             "latitude": latitude,
             "longitude": longitude,
             "location_name": location_name,
-            "date": pd.date_range(
-                start=pd.to_datetime(hourly.Time(), unit="s", utc=True),
-                end=pd.to_datetime(hourly.TimeEnd(), unit="s", utc=True),
-                freq=pd.Timedelta(seconds=hourly.Interval()),
-                inclusive="left"
-            ).strftime("%Y-%m-%d %H:%M:%S"),
-            "temperature_2m": hourly_temperature_2m.tolist(),
+            "time": np.arange(hourly.Time(), hourly.TimeEnd(), hourly.Interval(), dtype=np.int64),
         }
+        for index, variable in enumerate(self.variables):
+            hourly_data[variable] = hourly.Variables(index).ValuesAsNumpy()
 
         return hourly_data
 
@@ -135,3 +284,15 @@ class WeatherDataFactory:
         - dict: Weather data for the location.
         """
         return self.api_client.get_weather_data(self.forecast_url, latitude, longitude, location_name)
+
+    def get_weather_data_batch(self, locations):
+        """
+        Retrieves weather data for several locations using the configured API client.
+
+        Args:
+        - locations (list): List of dicts with latitude, longitude and location_name keys.
+
+        Returns:
+        - list: Weather data for each location, in the same order as locations.
+        """
+        return self.api_client.get_weather_data_batch(self.forecast_url, locations)
@@ -1,3 +1,10 @@
 from .update_forcast_data import UpdateForecastData
 from .average_temperature import GetLowestAverageTemperatures
 from .compare_temperature import CompareTemperature
+from .compare_temperature_batch import CompareTemperatureBatch
+from .nearest_location import NearestLocation
+from .forecast_refresh_job import ForecastRefreshJobStatus
+from .export_forecast import ExportForecast
+from .http_cache_stats import HttpCacheStats
+from .async_average_temperature import AsyncGetLowestAverageTemperatures
+from .async_compare_temperature import AsyncCompareTemperature
@@ -0,0 +1,77 @@
+"""
+Module: async_average_temperature.py
+
+This module contains an async view class, AsyncGetLowestAverageTemperatures, for retrieving temperature leaderboards
+of the forecast locations under an ASGI server.
+
+Classes:
+- AsyncGetLowestAverageTemperatures: Async view class for retrieving ranked forecast locations.
+
+Dependencies:
+- Django
+- ..utils.leaderboard_helper: aget_leaderboard
+- .average_temperature: parse_leaderboard_query, render_leaderboard
+
+Usage:
+- Same query parameters and response as GET /api/get_average_temperature/. Django REST framework views are
+  synchronous, so this is a plain Django view for ASGI servers. Cache and database reads go through Django's
+  async APIs; with the bundled cache backends and the ORM these still run the blocking call in a worker
+  thread (sync_to_async), so the view changes how requests are scheduled, not how much I/O they do.
+
+Example API Call:
+GET http://0.0.0.0:8701/api/async/get_average_temperature/?metric=mean&order=asc&limit=2
+
+Response:
+{
+    "source": "cache",
+    "metric": "mean",
+    "order": "asc",
+    "data": [
+        {
+            "id": 3,
+            "location_name": "Location1",
+            "latitude": 23.6,
+            "longitude": 89.8,
+            "average_temperature": 20.5,
+            "value": 20.5
+        },
+        {
+            "id": 7,
+            "location_name": "Location2",
+            "latitude": 24.7,
+            "longitude": 90.4,
+            "average_temperature": 21.0,
+            "value": 21.0
+        }
+    ]
+}
+"""
+
+from django.http import HttpResponse, JsonResponse
+from django.views import View
+from rest_framework import status
+from ..utils.leaderboard_helper import aget_leaderboard
+from .average_temperature import parse_leaderboard_query, render_leaderboard
+
+
+class AsyncGetLowestAverageTemperatures(View):
+    """
+    Async view class for retrieving ranked forecast locations, by default the lowest average temperatures.
+    """
+
+    async def get(self, request):
+        """
+        Handles GET requests to retrieve a temperature leaderboard.
+
+        Args:
+        - request (HttpRequest): GET request with optional metric, order and limit query parameters.
+
+        Returns:
+        - HttpResponse: JSON response containing the ranked locations.
+        """
+        metric, order, limit, error = parse_leaderboard_query(request.GET)
+        if error is not None:
+            return JsonResponse({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        data, source = await aget_leaderboard(metric, order, limit)
+        return HttpResponse(render_leaderboard(data, source, metric, order), content_type='application/json')
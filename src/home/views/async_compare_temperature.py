@@ -0,0 +1,238 @@
+"""
+Module: async_compare_temperature.py
+
+This module contains an async view class, AsyncCompareTemperature, for comparing temperatures between present and
+destination locations under an ASGI server.
+
+Classes:
+- AsyncCompareTemperature: Async view class for comparing temperatures.
+
+Dependencies:
+- Django
+- json
+- ..models: ForecastData, ForecastMetaData
+- ..utils.cache_helper: aincrement_counter, aversioned_key
+- ..utils.forecast_store_helper: ForecastStore, forecast_store_enabled, normalize_location_name
+- .compare_temperature: build_cache_name, build_range_comparison, daily_temperatures_query, parse_range,
+  parse_travel_datetime, render_comparison
+
+Usage:
+- Same request body, response and comparison cache as POST /api/compare_temperature/, for both the travel_date
+  and the start_date/end_date forms. Django REST framework views are synchronous, so this is a plain Django
+  view for ASGI servers that awaits the cache (cache.aget) and the ORM (aget, async iteration). With the
+  bundled cache backends and the ORM these still run the blocking call in a worker thread (sync_to_async).
+
+Example API Call:
+POST http://0.0.0.0:8701/api/async/compare_temperature/
+Request Body:
+{
+  "present_location": "Dhaka",
+  "destination_location": "Gopalganj",
+  "travel_date": "2024-03-26"
+}
+
+Response:
+{
+    "Decision": "Your destination 'Gopalganj' has a cooler temperature (24.5°C) compared to present_location 'Dhaka' (28.3°C). It's suitable for travel. You should travel there",
+    "source": "memory"
+}
+"""
+
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.http import JsonResponse
+from django.utils import timezone as django_timezone
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from ..models import ForecastData, ForecastMetaData
+from ..utils.cache_helper import aincrement_counter, aversioned_key
+from ..utils.forecast_store_helper import ForecastStore, forecast_store_enabled, normalize_location_name
+from .compare_temperature import (CACHE_HITS_KEY, CACHE_MISSES_KEY, DAY_MODE, build_cache_name,
+                                  build_range_comparison, daily_temperatures_query, parse_range,
+                                  parse_travel_datetime, render_comparison)
+
+
+def json_response(data, status=status.HTTP_200_OK):
+    """
+    Builds a JSON response rendered like the Django REST framework views, with non-ASCII characters kept.
+
+    Args:
+    - data (dict): Response data.
+    - status (int, optional): HTTP status code.
+
+    Returns:
+    - JsonResponse: The response.
+    """
+    return JsonResponse(data, status=status, json_dumps_params={'ensure_ascii': False})
+
+
+class AsyncCompareTemperature(View):
+    """
+    Async view class for comparing the temperatures of two locations on a day or over a date range.
+    """
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        # Like the Django REST framework views, the API is not protected by session CSRF checks
+        return csrf_exempt(super().as_view(**initkwargs))
+
+    async def post(self, request):
+        """
+        Handles POST requests comparing the temperatures of two locations.
+
+        Args:
+        - request (HttpRequest): POST request with a JSON body.
+
+        Returns:
+        - JsonResponse: The decision, or the daily decisions of a date range.
+        """
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            data = None
+        if not isinstance(data, dict):
+            return json_response({"error": "Please provide a JSON object."}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Reject invalid ranges before their parameters become part of a cache key
+        if 'start_date' in data or 'end_date' in data:
+            error = parse_range(data)[3]
+            if error is not None:
+                return json_response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        cache_key = await aversioned_key(build_cache_name(data))
+        comparison = await cache.aget(cache_key)
+        if comparison is not None:
+            await aincrement_counter(CACHE_HITS_KEY)
+            response_data = render_comparison(comparison)
+            response_data['source'] = 'cache'
+            return json_response(response_data)
+        await aincrement_counter(CACHE_MISSES_KEY)
+
+        snapshot = await ForecastStore().aget_snapshot() if forecast_store_enabled() else None
+        locations = await self._resolve_locations(
+            snapshot, data.get('present_location'), data.get('destination_location'))
+        if locations is None:
+            return json_response({"error": "One or both of the provided locations do not exist."}, status=status.HTTP_404_NOT_FOUND)
+        present_location, destination_location = locations
+
+        if 'start_date' in data or 'end_date' in data:
+            result = await self._compare_range(snapshot, present_location, destination_location, data)
+        else:
+            result = await self._compare_day(snapshot, present_location, destination_location, data.get('travel_date'))
+        if isinstance(result, JsonResponse):
+            return result
+        comparison, source = result
+
+        await cache.aset(cache_key, comparison, 60 * 15)  # Cache for 15 minutes
+
+        response_data = render_comparison(comparison)
+        response_data['source'] = source
+        return json_response(response_data)
+
+    async def _resolve_locations(self, snapshot, present_location, destination_location):
+        """
+        Finds the stored names of both locations, ignoring case and surrounding whitespace.
+
+        Args:
+        - snapshot (ForecastSnapshot): Forecast store snapshot, or None to query the database.
+        - present_location (str): Name of the present location as requested.
+        - destination_location (str): Name of the destination location as requested.
+
+        Returns:
+        - tuple: Stored present and destination names, or None if either does not exist.
+        """
+        if snapshot is not None:
+            locations = (snapshot.resolve_location(present_location), snapshot.resolve_location(destination_location))
+            return None if None in locations else locations
+
+        requested = [location for location in (present_location, destination_location) if isinstance(location, str)]
+        if not requested:
+            return None
+        query = Q()
+        for location in requested:
+            query |= Q(location_name__iexact=location.strip())
+        names = {
+            normalize_location_name(location_name): location_name
+            async for location_name in ForecastMetaData.objects.filter(query).values_list('location_name', flat=True)
+        }
+        locations = (names.get(normalize_location_name(present_location)),
+                     names.get(normalize_location_name(destination_location)))
+        return None if None in locations else locations
+
+    async def _compare_day(self, snapshot, present_location, destination_location, travel_date):
+        """
+        Compares the temperatures of both locations at 14:00 UTC on the travel date.
+
+        Args:
+        - snapshot (ForecastSnapshot): Forecast store snapshot, or None to query the database.
+        - present_location (str): Stored name of the present location.
+        - destination_location (str): Stored name of the destination location.
+        - travel_date (str): Travel date in YYYY-MM-DD format.
+
+        Returns:
+        - tuple: (compact comparison, source), or an error JsonResponse.
+        """
+        travel_datetime = parse_travel_datetime(travel_date)
+        if travel_datetime is None:
+            return json_response({"error": "Invalid date format. Please provide date in YYYY-MM-DD format."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if snapshot is not None:
+            source = "memory"
+            present_temperature = snapshot.temperature_at(present_location, travel_datetime)
+            destination_temperature = snapshot.temperature_at(destination_location, travel_datetime)
+        else:
+            source = "database"
+            try:
+                present_forecast_data = await ForecastData.objects.aget(
+                    forecast_meta_data__location_name=present_location, date=travel_datetime)
+                destination_forecast_data = await ForecastData.objects.aget(
+                    forecast_meta_data__location_name=destination_location, date=travel_datetime)
+            except ForecastData.DoesNotExist:
+                present_forecast_data = destination_forecast_data = None
+            present_temperature = present_forecast_data and present_forecast_data.temperature_2m
+            destination_temperature = destination_forecast_data and destination_forecast_data.temperature_2m
+
+        if present_temperature is None or destination_temperature is None:
+            return json_response({"error": "No forecast data available for the specified date."}, status=status.HTTP_404_NOT_FOUND)
+        return (DAY_MODE, present_location, destination_location, present_temperature, destination_temperature), source
+
+    async def _compare_range(self, snapshot, present_location, destination_location, data):
+        """
+        Compares the daily aggregated daylight temperatures of both locations over a date range.
+
+        Args:
+        - snapshot (ForecastSnapshot): Forecast store snapshot, or None to query the database.
+        - present_location (str): Stored name of the present location.
+        - destination_location (str): Stored name of the destination location.
+        - data (dict): Request data with start_date, end_date and an optional aggregation.
+
+        Returns:
+        - tuple: (compact comparison, source), or an error JsonResponse.
+        """
+        start_date, end_date, aggregation, error = parse_range(data)
+        if error is not None:
+            return json_response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        locations = [present_location, destination_location]
+        hours = tuple(settings.FORECAST_DAYLIGHT_HOURS)
+        tzinfo = django_timezone.get_default_timezone()
+        if snapshot is not None:
+            source = "memory"
+            temperatures = snapshot.daily_aggregates(locations, start_date, end_date, hours, aggregation, tzinfo)
+        else:
+            source = "database"
+            temperatures = {
+                (location_name, day): value
+                async for location_name, day, value in daily_temperatures_query(
+                    locations, start_date, end_date, hours, aggregation, tzinfo)
+            }
+        if not temperatures:
+            return json_response({"error": "No forecast data available for the specified date."}, status=status.HTTP_404_NOT_FOUND)
+
+        comparison = build_range_comparison(present_location, destination_location, aggregation, hours,
+                                            start_date, end_date, temperatures)
+        return comparison, source
@@ -1,83 +1,130 @@
 """
 Module: get_lowest_average_temperatures.py
 
-This module contains an APIView class, GetLowestAverageTemperatures, for retrieving the lowest average temperatures from forecast metadata.
+This module contains an APIView class, GetLowestAverageTemperatures, for retrieving temperature leaderboards of the forecast locations.
 
 Classes:
-- GetLowestAverageTemperatures: APIView class for retrieving the lowest average temperatures.
+- GetLowestAverageTemperatures: APIView class for retrieving ranked forecast locations.
 
 Dependencies:
 - Django
 - Django Rest Framework
-- datetime
-- ..models: ForecastData, ForecastMetaData
-- ..serializer: ForecastMetaDataSerializer
-- json
+- ..utils.leaderboard_helper: get_leaderboard, get_metrics, ORDERS
 
 Usage:
 - Import GetLowestAverageTemperatures class and call its get method to retrieve the lowest average temperatures.
 
+Leaderboards are materialized when forecast data is updated, so a request is a single cache fetch
+of pre-serialized JSON bytes.
+
+Query Parameters:
+- metric: "mean" (default), "min", "max" or "hour_14" (average temperature at 14:00 UTC)
+- order: "asc" (default, coolest first) or "desc" (hottest first)
+- limit: Number of locations to return, 1 to 100 (default 10)
+
 Example API Call:
-GET http://0.0.0.0:8700/api/get_average_temperature/
+GET http://0.0.0.0:8700/api/get_average_temperature/?metric=mean&order=asc&limit=2
 
 Response:
 {
     "source": "cache",
+    "metric": "mean",
+    "order": "asc",
     "data": [
         {
+            "id": 3,
             "location_name": "Location1",
-            "average_temperature": 20.5
+            "latitude": 23.6,
+            "longitude": 89.8,
+            "average_temperature": 20.5,
+            "value": 20.5
         },
         {
+            "id": 7,
             "location_name": "Location2",
-            "average_temperature": 21.0
-        },
-        ...
+            "latitude": 24.7,
+            "longitude": 90.4,
+            "average_temperature": 21.0,
+            "value": 21.0
+        }
     ]
 }
 """
 
 # get_lowest_average_temperatures.py
 
-from django.core.cache import cache
+import json
+
+from django.http import HttpResponse
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from ..models import ForecastData, ForecastMetaData
-from ..serializer import ForecastMetaDataSerializer
-import json
+from ..utils.leaderboard_helper import ORDERS, get_leaderboard, get_metrics
+
+MAX_LIMIT = 100
+
+
+def parse_leaderboard_query(query_params):
+    """
+    Validates the query parameters of a leaderboard request.
+
+    Args:
+    - query_params (QueryDict): Query parameters of the request.
+
+    Returns:
+    - tuple: (metric, order, limit, error) where error is None or the message of an invalid parameter.
+    """
+    metric = query_params.get('metric', 'mean')
+    order = query_params.get('order', 'asc')
+    if metric not in get_metrics():
+        return metric, order, None, f"Invalid metric. Choose one of: {', '.join(get_metrics())}."
+    if order not in ORDERS:
+        return metric, order, None, "Invalid order. Choose 'asc' or 'desc'."
+    try:
+        limit = int(query_params.get('limit', 10))
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= MAX_LIMIT:
+        return metric, order, None, f"Invalid limit. Provide a number between 1 and {MAX_LIMIT}."
+    return metric, order, limit, None
+
+
+def render_leaderboard(data, source, metric, order):
+    """
+    Builds the response body of a leaderboard.
+
+    Args:
+    - data (bytes): Pre-serialized JSON array of the ranked locations.
+    - source (str): 'cache' or 'database'.
+    - metric (str): Metric of the leaderboard.
+    - order (str): Order of the leaderboard.
+
+    Returns:
+    - bytes: JSON response body.
+    """
+    header = json.dumps({"source": source, "metric": metric, "order": order})
+    # Splice the pre-serialized leaderboard into the response without decoding it
+    return header[:-1].encode() + b', "data": ' + data + b'}'
+
 
 class GetLowestAverageTemperatures(APIView):
     """
-    APIView class for retrieving the lowest average temperatures from forecast metadata.
+    APIView class for retrieving ranked forecast locations, by default the lowest average temperatures.
     """
 
     def get(self, request):
         """
-        Handles GET requests to retrieve the lowest average temperatures.
+        Handles GET requests to retrieve a temperature leaderboard.
+
+        Args:
+        - request (Request): GET request with optional metric, order and limit query parameters.
 
         Returns:
-        - Response: JSON response containing the lowest 10 average temperatures.
+        - HttpResponse: JSON response containing the ranked locations.
         """
-        cache_key = 'lowest_average_temperatures'
-        cached_data = cache.get(cache_key)
-        
-        if cached_data:
-            # Deserialize cached data
-            cached_data = json.loads(cached_data)
-            source = "cache"
-            return Response({"source": source, "data": cached_data})
-        else:
-            lowest_temperatures = ForecastMetaData.objects.exclude(
-                average_temperature=None).order_by('average_temperature')[:10]
-
-            serializer = ForecastMetaDataSerializer(lowest_temperatures, many=True)
-            data = serializer.data
-
-            # Serialize data before caching
-            cache.set(cache_key, json.dumps(data), 60 * 15)  # Cache for 15 minutes
-
-            source = "database"
-
-            return Response({"source": source, "data": data})
+        metric, order, limit, error = parse_leaderboard_query(request.query_params)
+        if error is not None:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
 
+        data, source = get_leaderboard(metric, order, limit)
+        return HttpResponse(render_leaderboard(data, source, metric, order), content_type='application/json')
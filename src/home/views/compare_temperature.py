@@ -11,9 +11,12 @@ Dependencies:
 - Django Rest Framework
 - datetime
 - ..models: ForecastData, ForecastMetaData
+- ..utils.cache_helper: get_counters, increment_counter, versioned_key
+- ..utils.forecast_store_helper: ForecastStore, forecast_store_enabled, normalize_location_name
 
 Usage:
 - Import CompareTemperature class and call its post method to compare temperatures between present and destination locations.
+- Location names are matched case-insensitively. Send a GET request to read the hit and miss counters of the comparison cache.
 
 Example API Call:
 POST http://0.0.0.0:8700/api/compare_temperature/
@@ -28,6 +31,35 @@ Response:
 {
     "Decision": "Your destination 'Gopalganj' has a cooler temperature (24.5°C) compared to present_location 'Dhaka' (28.3°C). It's suitable for travel. You should travel there"
 }
+
+Date-range comparisons replace travel_date with start_date and end_date (at most MAX_RANGE_DAYS days) and
+an optional aggregation ('mean', 'max' or 'min', default 'mean') over the FORECAST_DAYLIGHT_HOURS of every day:
+{
+  "present_location": "Dhaka",
+  "destination_location": "Gopalganj",
+  "start_date": "2024-03-26",
+  "end_date": "2024-03-27",
+  "aggregation": "max"
+}
+
+Response:
+{
+    "aggregation": "max",
+    "daylight_hours": [6, 18],
+    "days": [
+        {"date": "2024-03-26", "present_temperature": 33.1, "destination_temperature": 31.8, "Decision": "Your destination 'Gopalganj' has a cooler temperature (31.8°C) compared to present_location 'Dhaka' (33.1°C). It's suitable for travel. You should travel there"},
+        {"date": "2024-03-27", "error": "No forecast data available for the specified date."}
+    ]
+}
+
+GET http://0.0.0.0:8700/api/compare_temperature/
+
+Response:
+{
+    "hits": 412,
+    "misses": 88,
+    "hit_rate": 0.824
+}
 """
 
 # views.py
@@ -35,62 +67,449 @@ Response:
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.conf import settings
 from django.core.cache import cache
-from datetime import datetime
+from django.db.models import Avg, Max, Min, Q
+from django.db.models.functions import ExtractHour, TruncDate
+from django.utils import timezone as django_timezone
+from datetime import date, datetime, timedelta, timezone
+import hashlib
+import json
 from ..models import ForecastData, ForecastMetaData
+from ..utils.cache_helper import get_counters, increment_counter, versioned_key
+from ..utils.forecast_store_helper import ForecastStore, forecast_store_enabled, normalize_location_name
+
+AGGREGATIONS = {'mean': Avg, 'max': Max, 'min': Min}
+MAX_RANGE_DAYS = 16
+DAY_MODE = 'day'
+RANGE_MODE = 'range'
+CACHE_HITS_KEY = 'compare_temperature_cache_hits'
+CACHE_MISSES_KEY = 'compare_temperature_cache_misses'
+
+
+def build_decision(present_location, destination_location, present_temperature, destination_temperature):
+    """
+    Builds the travel decision for a pair of locations.
+
+    Args:
+    - present_location (str): Name of the present location.
+    - destination_location (str): Name of the destination location.
+    - present_temperature (float): Temperature at the present location.
+    - destination_temperature (float): Temperature at the destination location.
+
+    Returns:
+    - str: The travel decision.
+    """
+    if present_temperature > destination_temperature:
+        return f'''Your destination '{destination_location}' has a cooler temperature ({destination_temperature}°C) compared to present_location '{present_location}' ({present_temperature}°C). It's suitable for travel. You should travel there'''
+    return f'''Your destination '{destination_location}' does not have a cooler temperature ({destination_temperature}°C) compared to present_location '{present_location}' ({present_temperature}°C). It's not suitable for travel. You should not travel there'''
+
+
+def parse_date(value):
+    """
+    Parses a date in YYYY-MM-DD format.
+
+    Args:
+    - value (str): Date string.
+
+    Returns:
+    - date: The parsed date, or None if the value is invalid.
+    """
+    try:
+        return datetime.strptime(value, "%Y-%m-%d").date()
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_travel_datetime(travel_date):
+    """
+    Parses the travel date and sets the time to 14:00:00 UTC.
+
+    Args:
+    - travel_date (str): Travel date in YYYY-MM-DD format.
+
+    Returns:
+    - datetime: The travel moment, or None if the date is invalid.
+    """
+    travel_day = parse_date(travel_date)
+    if travel_day is None:
+        return None
+    return datetime(travel_day.year, travel_day.month, travel_day.day, 14, tzinfo=timezone.utc)  # Set the time to 14:00:00 UTC
+
+
+def build_cache_key(data):
+    """
+    Builds the cache key of a comparison request.
+
+    Args:
+    - data (dict): Request data.
+
+    Returns:
+    - str: Cache key bound to the current dataset version.
+    """
+    return versioned_key(build_cache_name(data))
+
+
+def build_cache_name(data):
+    """
+    Builds the unversioned cache key name of a comparison request.
+
+    Location names are normalized and dates parsed, so requests that differ only
+    in case, whitespace or key order share an entry, and the key is hashed to
+    keep its length fixed.
+
+    Args:
+    - data (dict): Request data.
+
+    Returns:
+    - str: Cache key name.
+    """
+    def normalize_date(value):
+        parsed = parse_date(value)
+        return parsed.isoformat() if parsed is not None else str(value)
+
+    parts = [
+        normalize_location_name(data.get('present_location')),
+        normalize_location_name(data.get('destination_location')),
+    ]
+    if 'start_date' in data or 'end_date' in data:
+        parts += [RANGE_MODE, normalize_date(data.get('start_date')), normalize_date(data.get('end_date')),
+                  str(data.get('aggregation', 'mean'))]
+    else:
+        parts += [DAY_MODE, normalize_date(data.get('travel_date'))]
+    digest = hashlib.sha1(json.dumps(parts).encode()).hexdigest()
+    return f"compare_temperature:{digest}"
+
+
+def parse_range(data):
+    """
+    Validates the dates and aggregation of a date-range comparison request.
+
+    Args:
+    - data (dict): Request data with start_date, end_date and an optional aggregation.
+
+    Returns:
+    - tuple: (start_date, end_date, aggregation, error) where error is None or the
+      message of an invalid parameter.
+    """
+    start_date = parse_date(data.get('start_date'))
+    end_date = parse_date(data.get('end_date'))
+    aggregation = data.get('aggregation', 'mean')
+    if start_date is None or end_date is None:
+        return start_date, end_date, aggregation, "Invalid date format. Please provide date in YYYY-MM-DD format."
+    if not 0 <= (end_date - start_date).days < MAX_RANGE_DAYS:
+        return start_date, end_date, aggregation, f"end_date must be on or after start_date and the range may span at most {MAX_RANGE_DAYS} days."
+    if not isinstance(aggregation, str) or aggregation not in AGGREGATIONS:
+        return start_date, end_date, aggregation, f"Invalid aggregation. Choose one of: {', '.join(AGGREGATIONS)}."
+    return start_date, end_date, aggregation, None
+
+
+def daily_temperatures_query(locations, start_date, end_date, hours, aggregation, tzinfo):
+    """
+    Builds the GROUP BY query aggregating the daylight temperatures of locations per local day.
+
+    Args:
+    - locations (list): Names of the locations.
+    - start_date (date): First local day of the range.
+    - end_date (date): Last local day of the range, inclusive.
+    - hours (tuple): Local (start, end) hours to aggregate, end exclusive.
+    - aggregation (str): 'mean', 'max' or 'min'.
+    - tzinfo (tzinfo): Time zone the days and hours are expressed in.
+
+    Returns:
+    - QuerySet: (location_name, day, value) tuples.
+    """
+    window_start = datetime.combine(start_date, datetime.min.time(), tzinfo)
+    window_end = datetime.combine(end_date + timedelta(days=1), datetime.min.time(), tzinfo)
+    return (
+        ForecastData.objects.filter(
+            forecast_meta_data__location_name__in=locations,
+            date__gte=window_start, date__lt=window_end,
+        )
+        .exclude(temperature_2m=None)
+        .annotate(day=TruncDate('date', tzinfo=tzinfo), local_hour=ExtractHour('date', tzinfo=tzinfo))
+        .filter(local_hour__gte=hours[0], local_hour__lt=hours[1])
+        .values('forecast_meta_data__location_name', 'day')
+        .annotate(value=AGGREGATIONS[aggregation]('temperature_2m'))
+        .values_list('forecast_meta_data__location_name', 'day', 'value')
+        .order_by()
+    )
+
+
+def build_range_comparison(present_location, destination_location, aggregation, hours, start_date, end_date,
+                           temperatures):
+    """
+    Builds the compact comparison of a date range from daily aggregated temperatures.
+
+    Args:
+    - present_location (str): Stored name of the present location.
+    - destination_location (str): Stored name of the destination location.
+    - aggregation (str): 'mean', 'max' or 'min'.
+    - hours (tuple): Local (start, end) hours that were aggregated.
+    - start_date (date): First day of the range.
+    - end_date (date): Last day of the range, inclusive.
+    - temperatures (dict): (location_name, date) tuples mapped to aggregated temperatures.
+
+    Returns:
+    - tuple: Compact comparison, rendered by render_comparison().
+    """
+    daily_temperatures = []
+    for offset in range((end_date - start_date).days + 1):
+        day = start_date + timedelta(days=offset)
+        present_temperature = temperatures.get((present_location, day))
+        destination_temperature = temperatures.get((destination_location, day))
+        if present_temperature is None or destination_temperature is None:
+            daily_temperatures.append(None)
+        else:
+            daily_temperatures.append((round(present_temperature, 2), round(destination_temperature, 2)))
+    return (RANGE_MODE, present_location, destination_location, aggregation, hours,
+            start_date.toordinal(), tuple(daily_temperatures))
+
+
+def render_comparison(comparison):
+    """
+    Builds the response data of a compact comparison.
+
+    Comparisons are cached as tuples of names and temperatures rather than as
+    rendered responses; the decision texts are rebuilt on every hit.
+
+    Args:
+    - comparison (tuple): Compact comparison built by CompareTemperature.
+
+    Returns:
+    - dict: Response data without the source.
+    """
+    if comparison[0] == DAY_MODE:
+        _, present_location, destination_location, present_temperature, destination_temperature = comparison
+        return {"Decision": build_decision(present_location, destination_location, present_temperature, destination_temperature)}
+
+    _, present_location, destination_location, aggregation, hours, start_ordinal, daily_temperatures = comparison
+    days = []
+    for offset, temperatures in enumerate(daily_temperatures):
+        day = date.fromordinal(start_ordinal + offset).isoformat()
+        if temperatures is None:
+            days.append({"date": day, "error": "No forecast data available for the specified date."})
+            continue
+        present_temperature, destination_temperature = temperatures
+        days.append({
+            "date": day,
+            "present_temperature": present_temperature,
+            "destination_temperature": destination_temperature,
+            "Decision": build_decision(present_location, destination_location, present_temperature, destination_temperature),
+        })
+    return {"aggregation": aggregation, "daylight_hours": list(hours), "days": days}
+
 
 class CompareTemperature(APIView):
+    def get(self, request):
+        """
+        Returns the hit and miss counters of the comparison cache.
+
+        Args:
+        - request (Request): GET request.
+
+        Returns:
+        - Response: JSON response with hits, misses and hit_rate.
+        """
+        counters = get_counters(CACHE_HITS_KEY, CACHE_MISSES_KEY)
+        hits, misses = counters[CACHE_HITS_KEY], counters[CACHE_MISSES_KEY]
+        hit_rate = round(hits / (hits + misses), 4) if hits + misses else None
+        return Response({"hits": hits, "misses": misses, "hit_rate": hit_rate}, status=status.HTTP_200_OK)
+
     def post(self, request):
-        present_location = request.data.get('present_location')
-        destination_location = request.data.get('destination_location')
-
-        cache_key = f"compare_temperature_{present_location}_{destination_location}"
-
-        # Check if data exists in cache
-        cached_response = cache.get(cache_key)
-        if cached_response:
-            # Check if request data matches cached data
-            if cached_response.get('request_data') == request.data:
-                cached_response['response_data']['source'] = 'cache'
-                return Response(cached_response['response_data'])
-
-        try:
-            present_location_obj = ForecastMetaData.objects.get(
-                location_name=present_location)
-                
-            destination_location_obj = ForecastMetaData.objects.get(
-                location_name=destination_location)
-        except ForecastMetaData.DoesNotExist:
+        # Reject invalid ranges before their parameters become part of a cache key
+        if 'start_date' in request.data or 'end_date' in request.data:
+            error = parse_range(request.data)[3]
+            if error is not None:
+                return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        cache_key = build_cache_key(request.data)
+
+        # Check if the comparison exists in cache
+        comparison = cache.get(cache_key)
+        if comparison is not None:
+            increment_counter(CACHE_HITS_KEY)
+            response_data = render_comparison(comparison)
+            response_data['source'] = 'cache'
+            return Response(response_data)
+        increment_counter(CACHE_MISSES_KEY)
+
+        locations = self._resolve_locations(
+            request.data.get('present_location'), request.data.get('destination_location'))
+        if locations is None:
             return Response({"error": f"One or both of the provided locations do not exist."}, status=status.HTTP_404_NOT_FOUND)
+        present_location, destination_location = locations
+
+        if 'start_date' in request.data or 'end_date' in request.data:
+            result = self._compare_range(present_location, destination_location, request.data)
+        else:
+            result = self._compare_day(present_location, destination_location, request.data.get('travel_date'))
+        if isinstance(result, Response):
+            return result
+        comparison, source = result
 
-        travel_date = request.data.get('travel_date')
+        cache.set(cache_key, comparison, 60 * 15)  # Cache for 15 minutes
+
+        response_data = render_comparison(comparison)
+        response_data['source'] = source
+        return Response(response_data, status=status.HTTP_200_OK)
+
+    def _resolve_locations(self, present_location, destination_location):
+        """
+        Finds the stored names of both locations, ignoring case and surrounding whitespace.
+
+        Args:
+        - present_location (str): Name of the present location as requested.
+        - destination_location (str): Name of the destination location as requested.
+
+        Returns:
+        - tuple: Stored present and destination names, or None if either does not exist.
+        """
+        if forecast_store_enabled():
+            snapshot = ForecastStore().get_snapshot()
+            locations = (snapshot.resolve_location(present_location), snapshot.resolve_location(destination_location))
+        else:
+            requested = [location for location in (present_location, destination_location) if isinstance(location, str)]
+            query = Q()
+            for location in requested:
+                query |= Q(location_name__iexact=location.strip())
+            names = {
+                normalize_location_name(location_name): location_name
+                for location_name in ForecastMetaData.objects.filter(query).values_list('location_name', flat=True)
+            } if requested else {}
+            locations = (names.get(normalize_location_name(present_location)),
+                         names.get(normalize_location_name(destination_location)))
+        return None if None in locations else locations
 
-        try:
-            travel_datetime = datetime.strptime(travel_date, "%Y-%m-%d")
-            travel_datetime = travel_datetime.replace(hour=14)  # Set the time to 14:00:00
-        except ValueError:
+    def _compare_day(self, present_location, destination_location, travel_date):
+        """
+        Compares the temperatures of both locations at 14:00 UTC on the travel date.
+
+        Args:
+        - present_location (str): Stored name of the present location.
+        - destination_location (str): Stored name of the destination location.
+        - travel_date (str): Travel date in YYYY-MM-DD format.
+
+        Returns:
+        - tuple: (compact comparison, source), or an error Response.
+        """
+        if forecast_store_enabled():
+            source = "memory"
+            temperatures = self._get_temperatures_from_store(present_location, destination_location, travel_date)
+        else:
+            source = "database"
+            temperatures = self._get_temperatures_from_database(present_location, destination_location, travel_date)
+
+        if isinstance(temperatures, Response):
+            return temperatures
+        return (DAY_MODE, present_location, destination_location) + tuple(temperatures), source
+
+    def _compare_range(self, present_location, destination_location, data):
+        """
+        Compares the daily aggregated daylight temperatures of both locations over a date range.
+
+        Args:
+        - present_location (str): Stored name of the present location.
+        - destination_location (str): Stored name of the destination location.
+        - data (dict): Request data with start_date, end_date and an optional aggregation.
+
+        Returns:
+        - tuple: (compact comparison, source), or an error Response.
+        """
+        start_date, end_date, aggregation, error = parse_range(data)
+        if error is not None:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+        locations = [present_location, destination_location]
+        hours = tuple(settings.FORECAST_DAYLIGHT_HOURS)
+        tzinfo = django_timezone.get_default_timezone()
+        if forecast_store_enabled():
+            source = "memory"
+            temperatures = ForecastStore().get_snapshot().daily_aggregates(
+                locations, start_date, end_date, hours, aggregation, tzinfo)
+        else:
+            source = "database"
+            temperatures = self._get_daily_temperatures_from_database(
+                locations, start_date, end_date, hours, aggregation, tzinfo)
+        if not temperatures:
+            return Response({"error": f"No forecast data available for the specified date."}, status=status.HTTP_404_NOT_FOUND)
+
+        comparison = build_range_comparison(present_location, destination_location, aggregation, hours,
+                                            start_date, end_date, temperatures)
+        return comparison, source
+
+    def _get_daily_temperatures_from_database(self, locations, start_date, end_date, hours, aggregation, tzinfo):
+        """
+        Aggregates the daylight temperatures of locations per local day in a single GROUP BY query.
+
+        Args:
+        - locations (list): Names of the locations.
+        - start_date (date): First local day of the range.
+        - end_date (date): Last local day of the range, inclusive.
+        - hours (tuple): Local (start, end) hours to aggregate, end exclusive.
+        - aggregation (str): 'mean', 'max' or 'min'.
+        - tzinfo (tzinfo): Time zone the days and hours are expressed in.
+
+        Returns:
+        - dict: (location_name, date) tuples mapped to aggregated temperatures.
+        """
+        rows = daily_temperatures_query(locations, start_date, end_date, hours, aggregation, tzinfo)
+        return {(location_name, day): value for location_name, day, value in rows}
+
+    def _get_temperatures_from_store(self, present_location, destination_location, travel_date):
+        """
+        Looks up both temperatures in the in-process forecast store.
+
+        Args:
+        - present_location (str): Name of the present location.
+        - destination_location (str): Name of the destination location.
+        - travel_date (str): Travel date in YYYY-MM-DD format.
+
+        Returns:
+        - tuple: Present and destination temperatures, or an error Response.
+        """
+        snapshot = ForecastStore().get_snapshot()
+        if not (snapshot.has_location(present_location) and snapshot.has_location(destination_location)):
+            return Response({"error": f"One or both of the provided locations do not exist."}, status=status.HTTP_404_NOT_FOUND)
+
+        travel_datetime = parse_travel_datetime(travel_date)
+        if travel_datetime is None:
             return Response({"error": "Invalid date format. Please provide date in YYYY-MM-DD format."}, status=status.HTTP_400_BAD_REQUEST)
 
-        try:
-            present_forecast_data = ForecastData.objects.get(
-                forecast_meta_data=present_location_obj, date=travel_datetime)
-            destination_forecast_data = ForecastData.objects.get(
-                forecast_meta_data=destination_location_obj, date=travel_datetime)
-        except ForecastData.DoesNotExist:
+        present_temperature = snapshot.temperature_at(present_location, travel_datetime)
+        destination_temperature = snapshot.temperature_at(destination_location, travel_datetime)
+        if present_temperature is None or destination_temperature is None:
             return Response({"error": f"No forecast data available for the specified date."}, status=status.HTTP_404_NOT_FOUND)
 
-        if present_forecast_data.temperature_2m > destination_forecast_data.temperature_2m:
-            decision = f'''Your destination '{destination_location}' has a cooler temperature ({destination_forecast_data.temperature_2m}°C) compared to present_location '{present_location}' ({present_forecast_data.temperature_2m}°C). It's suitable for travel. You should travel there'''
-        else:
-            decision = f'''Your destination '{destination_location}' does not have a cooler temperature ({destination_forecast_data.temperature_2m}°C) compared to present_location '{present_location}' ({present_forecast_data.temperature_2m}°C). It's not suitable for travel. You should not travel there'''
+        return present_temperature, destination_temperature
 
-        response_data = {"Decision": decision, "source": "database"}
+    def _get_temperatures_from_database(self, present_location, destination_location, travel_date):
+        """
+        Looks up both temperatures with a single ORM query.
 
-        # Cache the response along with request data
-        cache.set(cache_key, {'request_data': request.data, 'response_data': response_data}, 60 * 15)  # Cache for 15 minutes
-        
-        return Response(response_data, status=status.HTTP_200_OK)
+        Both names were already resolved by _resolve_locations(), so the forecast
+        rows are fetched by name without reading the metadata again.
 
+        Args:
+        - present_location (str): Stored name of the present location.
+        - destination_location (str): Stored name of the destination location.
+        - travel_date (str): Travel date in YYYY-MM-DD format.
 
+        Returns:
+        - tuple: Present and destination temperatures, or an error Response.
+        """
+        travel_datetime = parse_travel_datetime(travel_date)
+        if travel_datetime is None:
+            return Response({"error": "Invalid date format. Please provide date in YYYY-MM-DD format."}, status=status.HTTP_400_BAD_REQUEST)
 
+        temperatures = dict(
+            ForecastData.objects.filter(
+                forecast_meta_data__location_name__in=[present_location, destination_location], date=travel_datetime)
+            .values_list('forecast_meta_data__location_name', 'temperature_2m')
+        )
+        present_temperature = temperatures.get(present_location)
+        destination_temperature = temperatures.get(destination_location)
+        if present_temperature is None or destination_temperature is None:
+            return Response({"error": f"No forecast data available for the specified date."}, status=status.HTTP_404_NOT_FOUND)
 
+        return present_temperature, destination_temperature
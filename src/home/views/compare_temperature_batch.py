@@ -0,0 +1,195 @@
+"""
+Module: compare_temperature_batch.py
+
+This module contains an APIView class, CompareTemperatureBatch, for comparing temperatures of many present/destination pairs in one request.
+
+Classes:
+- CompareTemperatureBatch: APIView class for batch temperature comparisons.
+
+Dependencies:
+- Django
+- Django Rest Framework
+- ..models: ForecastData, ForecastMetaData
+- ..utils.forecast_store_helper: ForecastStore, forecast_store_enabled, normalize_location_name
+- .compare_temperature: build_decision, parse_travel_datetime
+
+Usage:
+- Send a POST request with a list of comparisons. Every item is answered in request order, with either a
+  decision or an error, using at most two database queries for the whole batch.
+- Location names are matched case-insensitively, as in single comparisons.
+
+Example API Call:
+POST http://0.0.0.0:8700/api/compare_temperature/batch/
+Request Body:
+{
+  "items": [
+    {"present_location": "Dhaka", "destination_location": "Gopalganj", "travel_date": "2024-03-26"},
+    {"present_location": "Dhaka", "destination_location": "Atlantis", "travel_date": "2024-03-26"}
+  ]
+}
+
+Response:
+{
+    "source": "database",
+    "results": [
+        {"Decision": "Your destination 'Gopalganj' has a cooler temperature (24.5°C) compared to present_location 'Dhaka' (28.3°C). It's suitable for travel. You should travel there"},
+        {"error": "One or both of the provided locations do not exist.", "status": 404}
+    ]
+}
+"""
+
+from django.db.models import Q
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from ..models import ForecastData, ForecastMetaData
+from ..utils.forecast_store_helper import ForecastStore, forecast_store_enabled, normalize_location_name
+from .compare_temperature import build_decision, parse_travel_datetime
+
+MAX_BATCH_SIZE = 100
+
+
+class CompareTemperatureBatch(APIView):
+    """
+    APIView class for comparing temperatures of many location pairs and dates at once.
+    """
+
+    def post(self, request):
+        """
+        Handles POST requests with a list of temperature comparisons.
+
+        Args:
+        - request (Request): POST request with an "items" list of comparisons.
+
+        Returns:
+        - Response: JSON response with one result per item, in request order.
+        """
+        items = request.data.get('items') if isinstance(request.data, dict) else None
+        if not isinstance(items, list) or not items:
+            return Response({"error": "Please provide a non-empty list of comparisons in 'items'."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > MAX_BATCH_SIZE:
+            return Response({"error": f"A batch may contain at most {MAX_BATCH_SIZE} comparisons."}, status=status.HTTP_400_BAD_REQUEST)
+
+        comparisons = [self._parse_item(item) for item in items]
+        valid_comparisons = [comparison for comparison in comparisons if 'error' not in comparison]
+
+        if forecast_store_enabled():
+            source = "memory"
+            location_names, temperatures = self._lookup_in_store(valid_comparisons)
+        else:
+            source = "database"
+            location_names, temperatures = self._lookup_in_database(valid_comparisons)
+
+        results = [self._resolve(comparison, location_names, temperatures) for comparison in comparisons]
+        return Response({"source": source, "results": results}, status=status.HTTP_200_OK)
+
+    def _parse_item(self, item):
+        """
+        Extracts the locations and travel moment of a single comparison.
+
+        Args:
+        - item (dict): Comparison with present_location, destination_location and travel_date.
+
+        Returns:
+        - dict: Parsed comparison, or an error result.
+        """
+        if not isinstance(item, dict):
+            return {"error": "Each comparison must be an object.", "status": status.HTTP_400_BAD_REQUEST}
+        if not (isinstance(item.get('present_location'), str) and isinstance(item.get('destination_location'), str)):
+            return {"error": "present_location and destination_location must be strings.", "status": status.HTTP_400_BAD_REQUEST}
+        return {
+            "present_location": item.get('present_location'),
+            "destination_location": item.get('destination_location'),
+            "travel_datetime": parse_travel_datetime(item.get('travel_date')),
+        }
+
+    def _lookup_in_store(self, comparisons):
+        """
+        Looks up every requested temperature in the in-process forecast store.
+
+        Args:
+        - comparisons (list): Parsed comparisons.
+
+        Returns:
+        - tuple: (dict mapping normalized to stored location names, dict mapping
+          (stored location name, moment) to temperature).
+        """
+        snapshot = ForecastStore().get_snapshot()
+        location_names, temperatures = {}, {}
+        for comparison in comparisons:
+            for location in (comparison['present_location'], comparison['destination_location']):
+                location_name = snapshot.resolve_location(location)
+                if location_name is None:
+                    continue
+                location_names[normalize_location_name(location)] = location_name
+                if comparison['travel_datetime'] is not None:
+                    temperature = snapshot.temperature_at(location_name, comparison['travel_datetime'])
+                    if temperature is not None:
+                        temperatures[(location_name, comparison['travel_datetime'])] = temperature
+        return location_names, temperatures
+
+    def _lookup_in_database(self, comparisons):
+        """
+        Looks up every requested temperature with two set-based queries.
+
+        Args:
+        - comparisons (list): Parsed comparisons.
+
+        Returns:
+        - tuple: (dict mapping normalized to stored location names, dict mapping
+          (stored location name, moment) to temperature).
+        """
+        requested = {
+            normalize_location_name(location): location.strip()
+            for comparison in comparisons
+            for location in (comparison['present_location'], comparison['destination_location'])
+        }
+        travel_datetimes = {
+            comparison['travel_datetime'] for comparison in comparisons if comparison['travel_datetime'] is not None
+        }
+
+        query = Q()
+        for location in requested.values():
+            query |= Q(location_name__iexact=location)
+        names_by_id = dict(
+            ForecastMetaData.objects.filter(query).values_list('pk', 'location_name')) if requested else {}
+        temperatures = {}
+        if names_by_id and travel_datetimes:
+            forecast_data = ForecastData.objects.filter(
+                forecast_meta_data_id__in=list(names_by_id), date__in=travel_datetimes
+            ).values_list('forecast_meta_data_id', 'date', 'temperature_2m')
+            for forecast_meta_data_id, date, temperature in forecast_data:
+                temperatures[(names_by_id[forecast_meta_data_id], date)] = temperature
+        location_names = {normalize_location_name(location_name): location_name for location_name in names_by_id.values()}
+        return location_names, temperatures
+
+    def _resolve(self, comparison, location_names, temperatures):
+        """
+        Builds the result of a single comparison from the looked-up temperatures.
+
+        Args:
+        - comparison (dict): Parsed comparison, or an error result.
+        - location_names (dict): Normalized names of the locations that exist mapped to their stored names.
+        - temperatures (dict): (stored location name, moment) tuples mapped to temperatures.
+
+        Returns:
+        - dict: Either {"Decision": ...} or {"error": ..., "status": ...}.
+        """
+        if 'error' in comparison:
+            return comparison
+
+        present_location = location_names.get(normalize_location_name(comparison['present_location']))
+        destination_location = location_names.get(normalize_location_name(comparison['destination_location']))
+        if present_location is None or destination_location is None:
+            return {"error": "One or both of the provided locations do not exist.", "status": status.HTTP_404_NOT_FOUND}
+
+        travel_datetime = comparison['travel_datetime']
+        if travel_datetime is None:
+            return {"error": "Invalid date format. Please provide date in YYYY-MM-DD format.", "status": status.HTTP_400_BAD_REQUEST}
+
+        present_temperature = temperatures.get((present_location, travel_datetime))
+        destination_temperature = temperatures.get((destination_location, travel_datetime))
+        if present_temperature is None or destination_temperature is None:
+            return {"error": "No forecast data available for the specified date.", "status": status.HTTP_404_NOT_FOUND}
+
+        return {"Decision": build_decision(present_location, destination_location, present_temperature, destination_temperature)}
@@ -0,0 +1,143 @@
+"""
+Module: export_forecast.py
+
+This module contains an APIView class, ExportForecast, for downloading the full hourly forecast series.
+
+Classes:
+- ExportForecast: APIView class for streaming forecast exports.
+
+Dependencies:
+- Django
+- Django Rest Framework
+- ..models: ForecastData, ForecastMetaData
+- ..utils.export_helper: CONTENT_TYPES, EXPORT_FORMATS, RENDERERS, arrow_available, iter_forecast_rows
+- ..utils.forecast_store_helper: normalize_location_name
+- .compare_temperature: parse_date
+
+Usage:
+- Send a GET request with the format in the path: "ndjson" (one JSON object per line), "csv" or "arrow"
+  (Arrow IPC stream, requires the optional pyarrow package).
+- The body is streamed while rows are read from a server-side cursor, so memory use stays flat regardless of
+  the size of the export.
+
+Query Parameters:
+- location: Location to export, repeatable or comma-separated, case-insensitive (default: every location)
+- start_date, end_date: First and last day to export, inclusive, in YYYY-MM-DD format (local days)
+- variables: Comma-separated hourly variables to export (default: every stored variable)
+
+Example API Call:
+GET http://0.0.0.0:8700/api/export_forecast/ndjson/?location=Dhaka&start_date=2024-03-26&end_date=2024-03-26&variables=temperature_2m
+
+Response:
+{"location_name": "Dhaka", "date": "2024-03-26T00:00:00+00:00", "temperature_2m": 24.1}
+{"location_name": "Dhaka", "date": "2024-03-26T01:00:00+00:00", "temperature_2m": 23.8}
+...
+"""
+
+from datetime import datetime, timedelta
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone as django_timezone
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from ..models import ForecastData, ForecastMetaData
+from ..utils.export_helper import ARROW, CONTENT_TYPES, EXPORT_FORMATS, RENDERERS, arrow_available, iter_forecast_rows
+from ..utils.forecast_store_helper import normalize_location_name
+from .compare_temperature import parse_date
+
+
+class ExportForecast(APIView):
+    """
+    APIView class for streaming the hourly forecast of locations as NDJSON, CSV or Arrow.
+    """
+
+    def get(self, request, export_format):
+        """
+        Handles GET requests to export the hourly forecast.
+
+        Args:
+        - request (Request): GET request with optional location, start_date, end_date and variables query parameters.
+        - export_format (str): 'ndjson', 'csv' or 'arrow'.
+
+        Returns:
+        - StreamingHttpResponse: The export, or an error Response.
+        """
+        if export_format not in EXPORT_FORMATS:
+            return Response({"error": f"Invalid format. Choose one of: {', '.join(EXPORT_FORMATS)}."}, status=status.HTTP_404_NOT_FOUND)
+        if export_format == ARROW and not arrow_available():
+            return Response({"error": "Arrow exports require the pyarrow package."}, status=status.HTTP_501_NOT_IMPLEMENTED)
+
+        variables = ForecastData.HOURLY_VARIABLES
+        if 'variables' in request.query_params:
+            variables = [variable.strip() for variable in request.query_params['variables'].split(',') if variable.strip()]
+            unknown_variables = [variable for variable in variables if variable not in ForecastData.HOURLY_VARIABLES]
+            if not variables or unknown_variables:
+                return Response({"error": f"Invalid variables. Choose from: {', '.join(ForecastData.HOURLY_VARIABLES)}."}, status=status.HTTP_400_BAD_REQUEST)
+
+        window = self._parse_window(request.query_params)
+        if isinstance(window, Response):
+            return window
+        start, end = window
+
+        forecast_meta_data_ids = self._resolve_locations(request.query_params)
+        if isinstance(forecast_meta_data_ids, Response):
+            return forecast_meta_data_ids
+
+        rows = iter_forecast_rows(forecast_meta_data_ids, variables, start, end)
+        response = StreamingHttpResponse(RENDERERS[export_format](rows, variables), content_type=CONTENT_TYPES[export_format])
+        response['Content-Disposition'] = f'attachment; filename="forecast.{export_format}"'
+        return response
+
+    def _parse_window(self, query_params):
+        """
+        Converts the start_date and end_date query parameters to a window of moments.
+
+        Args:
+        - query_params (QueryDict): Query parameters of the request.
+
+        Returns:
+        - tuple: (start, end) timezone-aware datetimes, end exclusive, either None when
+          not given, or an error Response.
+        """
+        tzinfo = django_timezone.get_default_timezone()
+        start = end = None
+        if 'start_date' in query_params:
+            start_date = parse_date(query_params['start_date'])
+            if start_date is None:
+                return Response({"error": "Invalid date format. Please provide date in YYYY-MM-DD format."}, status=status.HTTP_400_BAD_REQUEST)
+            start = datetime.combine(start_date, datetime.min.time(), tzinfo)
+        if 'end_date' in query_params:
+            end_date = parse_date(query_params['end_date'])
+            if end_date is None:
+                return Response({"error": "Invalid date format. Please provide date in YYYY-MM-DD format."}, status=status.HTTP_400_BAD_REQUEST)
+            end = datetime.combine(end_date + timedelta(days=1), datetime.min.time(), tzinfo)
+        if start is not None and end is not None and end <= start:
+            return Response({"error": "end_date must be on or after start_date."}, status=status.HTTP_400_BAD_REQUEST)
+        return start, end
+
+    def _resolve_locations(self, query_params):
+        """
+        Finds the forecast metadata of the requested locations, ignoring case and surrounding whitespace.
+
+        Args:
+        - query_params (QueryDict): Query parameters of the request.
+
+        Returns:
+        - list: Forecast metadata IDs, None when no location was requested, or an error Response.
+        """
+        requested = {
+            normalize_location_name(name): name.strip()
+            for value in query_params.getlist('location') for name in value.split(',') if name.strip()
+        }
+        if not requested:
+            return None
+
+        found = {
+            normalize_location_name(location_name): pk
+            for pk, location_name in ForecastMetaData.objects.values_list('pk', 'location_name')
+        }
+        unknown_locations = [name for normalized_name, name in requested.items() if normalized_name not in found]
+        if unknown_locations:
+            return Response({"error": f"Unknown locations: {', '.join(unknown_locations)}."}, status=status.HTTP_404_NOT_FOUND)
+        return [found[normalized_name] for normalized_name in requested]
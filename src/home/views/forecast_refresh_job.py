@@ -0,0 +1,65 @@
+"""
+Module: forecast_refresh_job.py
+
+This module contains an APIView class, ForecastRefreshJobStatus, for following the progress of a forecast refresh.
+
+Classes:
+- ForecastRefreshJobStatus: APIView class reporting the state of a forecast refresh job.
+
+Dependencies:
+- Django Rest Framework
+- ..models: ForecastRefreshJob
+- ..serializer: ForecastRefreshJobSerializer
+
+Usage:
+- Send a GET request with the job_id returned by POST /api/update_forcast_data/.
+- Durations are in seconds, summed over every shard and worker thread, so they show
+  where refresh time goes rather than how long the refresh took end to end.
+
+Example API Call:
+GET http://0.0.0.0:8700/api/forecast_refresh_jobs/12/
+
+Response:
+{
+    "id": 12,
+    "forecast_url": "https://api.open-meteo.com/v1/forecast",
+    "state": "running",
+    "task_id": "8f1c2b6e-5d0a-4a53-9a51-0e2f8c4f3b1d",
+    "districts": {"done": 48, "failed": 0, "total": 64},
+    "rows_written": 18432,
+    "durations": {"prepare": 0.041, "fetch": 3.212, "parse": 0.388, "write": 1.905, "statistics": 0.0, "cache_warm": 0.0},
+    "failed_locations": {},
+    "error": null,
+    "created_at": "2024-04-01T06:00:00.120000+06:00",
+    "started_at": "2024-04-01T06:00:00.310000+06:00",
+    "finished_at": null
+}
+"""
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from ..models import ForecastRefreshJob
+from ..serializer import ForecastRefreshJobSerializer
+
+
+class ForecastRefreshJobStatus(APIView):
+    """
+    APIView class for reading the state, progress and timings of a forecast refresh.
+    """
+
+    def get(self, request, job_id):
+        """
+        Handles GET requests for the status of a forecast refresh job.
+
+        Args:
+        - request (Request): GET request object.
+        - job_id (int): ID of the ForecastRefreshJob.
+
+        Returns:
+        - Response: JSON response with the job status.
+        """
+        job = ForecastRefreshJob.objects.filter(pk=job_id).first()
+        if job is None:
+            return Response({"error": "Forecast refresh job not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(ForecastRefreshJobSerializer(job).data, status=status.HTTP_200_OK)
@@ -0,0 +1,46 @@
+"""
+Module: http_cache_stats.py
+
+This module contains an APIView class, HttpCacheStats, for reading the metrics of the upstream HTTP response cache.
+
+Classes:
+- HttpCacheStats: APIView class reporting the upstream HTTP cache counters.
+
+Dependencies:
+- Django Rest Framework
+- ..utils.http_cache_stats_helper: get_http_cache_stats
+
+Usage:
+- Send a GET request to read the hit, miss and revalidation counters of the HTTP cache used by forecast
+  refreshes to fetch the Open-Meteo API. The backend is chosen with the FORECAST_HTTP_CACHE_BACKEND setting.
+
+Example API Call:
+GET http://0.0.0.0:8700/api/http_cache_stats/
+
+Response:
+{
+    "http_cache": {"backend": "redis", "hits": 64, "misses": 2, "revalidated": 62, "hit_rate": 0.9844}
+}
+"""
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from ..utils.http_cache_stats_helper import get_http_cache_stats
+
+
+class HttpCacheStats(APIView):
+    """
+    APIView class for reading the hit, miss and revalidation counters of the upstream HTTP cache.
+    """
+
+    def get(self, request):
+        """
+        Handles GET requests for the upstream HTTP cache metrics.
+
+        Args:
+        - request (Request): GET request object.
+
+        Returns:
+        - Response: JSON response with the HTTP cache counters.
+        """
+        return Response({"http_cache": get_http_cache_stats()})
@@ -0,0 +1,62 @@
+"""
+Module: nearest_location.py
+
+This module contains an APIView class, NearestLocation, for finding the forecast location closest to a GPS position.
+
+Classes:
+- NearestLocation: APIView class for nearest forecast location lookups.
+
+Dependencies:
+- Django Rest Framework
+- ..utils.nearest_location_helper: NearestLocationFinder
+
+Usage:
+- Send a GET request with latitude and longitude query parameters.
+
+Example API Call:
+GET http://0.0.0.0:8700/api/nearest_location/?latitude=23.81&longitude=90.41
+
+Response:
+{
+    "location_name": "Dhaka",
+    "latitude": 23.7115253,
+    "longitude": 90.4111451,
+    "distance_km": 10.998
+}
+"""
+
+from rest_framework.views import APIView
+from rest_framework.response import Response
+from rest_framework import status
+from ..utils.nearest_location_helper import NearestLocationFinder
+
+
+class NearestLocation(APIView):
+    """
+    APIView class for finding the forecast location closest to given coordinates.
+    """
+
+    def get(self, request):
+        """
+        Handles GET requests to find the nearest forecast location.
+
+        Args:
+        - request (Request): GET request with latitude and longitude query parameters.
+
+        Returns:
+        - Response: JSON response with the nearest location and its distance in kilometres.
+        """
+        try:
+            latitude = float(request.query_params['latitude'])
+            longitude = float(request.query_params['longitude'])
+        except (KeyError, ValueError):
+            return Response({"error": "Please provide numeric latitude and longitude query parameters."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+            return Response({"error": "Latitude must be within [-90, 90] and longitude within [-180, 180]."}, status=status.HTTP_400_BAD_REQUEST)
+
+        nearest_location = NearestLocationFinder().find_nearest(latitude, longitude)
+        if nearest_location is None:
+            return Response({"error": "No forecast locations are available."}, status=status.HTTP_404_NOT_FOUND)
+
+        return Response(nearest_location, status=status.HTTP_200_OK)
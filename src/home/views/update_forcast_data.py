@@ -17,17 +17,33 @@ Example:
 
 Response:
 - 200 OK: {
-    "message": "Forecast data update started. Please wait while the update completes. You can see the status in the terminal."
+    "message": "Forecast data update started. Please wait while the update completes. You can follow its progress at status_url.",
+    "job_id": 12,
+    "status_url": "/api/forecast_refresh_jobs/12/",
+    "deduplicated": false
+}
+- 200 OK, when a refresh of the same forecast_url is already running or finished less than
+  FORECAST_REFRESH_MIN_INTERVAL seconds ago: {
+    "message": "A forecast data update for this URL is already in progress or was just completed. You can follow it at status_url.",
+    "job_id": 12,
+    "status_url": "/api/forecast_refresh_jobs/12/",
+    "deduplicated": true
 }
 - 400 Bad Request: {
     "error": "Forecast URL is missing. Please provide a forecast URL."
 }
+- 503 Service Unavailable, when the refresh could not be queued: {
+    "error": "Forecast data update could not be queued. Please try again later.",
+    "job_id": 12
+}
 """
 
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
+from django.urls import reverse
 from ..tasks import run_forecast_update
+from ..utils.refresh_job_helper import acquire_refresh_job, fail_refresh_job
 
 class UpdateForecastData(APIView):
     """
@@ -42,6 +58,7 @@ class UpdateForecastData(APIView):
         Handles POST requests to update forecast data.
 
         This method initiates a Celery task to update forecast data for districts.
+        Concurrent requests for the same forecast URL are coalesced into one refresh job.
 
         Args:
         - request (Request): POST request object containing the forecast URL.
@@ -53,8 +70,26 @@ class UpdateForecastData(APIView):
         forecast_url = request_data.get('forecast_url')
 
         if forecast_url:
-            # Initiate Celery task to update forecast data
-            task = run_forecast_update.delay(forecast_url)
-            return Response({"message": "Forecast data update started. Please wait while the update completes. You can see the status in the terminal."})
+            # Initiate Celery task to update forecast data, unless a refresh of the URL is already tracked
+            job, created = acquire_refresh_job(forecast_url)
+            if created:
+                try:
+                    run_forecast_update.delay(forecast_url, job.pk)
+                except Exception as e:
+                    # Release the job's lock, so the refresh is not deduplicated to a job that never runs
+                    fail_refresh_job(job.pk, f"Could not queue the refresh: {e}")
+                    return Response({
+                        "error": "Forecast data update could not be queued. Please try again later.",
+                        "job_id": job.pk,
+                    }, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+                message = "Forecast data update started. Please wait while the update completes. You can follow its progress at status_url."
+            else:
+                message = "A forecast data update for this URL is already in progress or was just completed. You can follow it at status_url."
+            return Response({
+                "message": message,
+                "job_id": job.pk,
+                "status_url": reverse('forecast_refresh_job', args=[job.pk]),
+                "deduplicated": not created,
+            })
         else:
             return Response({"error": "Forecast URL is missing. Please provide a forecast URL."}, status=status.HTTP_400_BAD_REQUEST)